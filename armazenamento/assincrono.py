@@ -0,0 +1,182 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+
+from armazenamento.unidade_trabalho import transacao
+
+# Marca colocada na fila para pedir que a thread de gravação termine
+_PARAR = object()
+
+
+class LogAssincrono:
+    """
+    ⚡ LOG ASSÍNCRONO
+
+    Envolve outro log (segmentado, JSON ou SQLite) para que quem registra
+    uma entrada não espere a gravação em disco:
+    - anexar() só coloca a entrada numa fila com tamanho máximo
+    - uma thread em segundo plano junta as entradas da fila e grava
+      tudo de uma vez ("group commit"), a cada "lote" entradas ou
+      a cada "intervalo" segundos, o que vier primeiro
+
+    Quando a fila está cheia, a política escolhida decide o que fazer:
+    - "bloquear": quem registra espera abrir espaço na fila
+    - "descartar": a entrada é perdida (e contada em self.descartadas)
+    - "disco": a entrada vai para um arquivo de transbordo, que a thread
+      grava no log assim que a fila esvaziar
+    """
+
+    POLITICAS = ("bloquear", "descartar", "disco")
+
+    def __init__(self, log, tamanho_fila=10000, lote=100, intervalo=0.005,
+                 politica="bloquear", arquivo_transbordo=None):
+        if politica not in self.POLITICAS:
+            raise ValueError(f"Política de fila cheia desconhecida: {politica}")
+        if politica == "disco" and not arquivo_transbordo:
+            raise ValueError("A política 'disco' precisa de um arquivo de transbordo")
+
+        self.log = log
+        self.lote = lote
+        self.intervalo = intervalo
+        self.politica = politica
+        self.arquivo_transbordo = arquivo_transbordo
+        self.descartadas = 0
+        self.lotes_gravados = 0
+        self._fila = queue.Queue(maxsize=tamanho_fila)
+        self._trava_transbordo = threading.Lock()
+        self._fechado = False
+
+        self._thread = threading.Thread(target=self._gravar_em_segundo_plano,
+                                        name="auditoria-assincrona", daemon=True)
+        self._thread.start()
+        atexit.register(self.fechar)  # Não perde o que ainda estiver na fila
+
+    @property
+    def escritas(self):
+        return self.log.escritas
+
+    # ------------------------------------------------------------------
+    # Produção (quem registra)
+    # ------------------------------------------------------------------
+
+    def anexar(self, entrada):
+        """
+        📎 Coloca a entrada na fila e volta na hora.
+        """
+        if self.politica == "bloquear":
+            self._fila.put(entrada)
+            return
+        try:
+            self._fila.put_nowait(entrada)
+        except queue.Full:
+            if self.politica == "descartar":
+                self.descartadas += 1
+            else:
+                self._transbordar(entrada)
+
+    def _transbordar(self, entrada):
+        with self._trava_transbordo:
+            with open(self.arquivo_transbordo, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+
+    # ------------------------------------------------------------------
+    # Consumo (thread de gravação)
+    # ------------------------------------------------------------------
+
+    def _gravar_em_segundo_plano(self):
+        self._recuperar_transbordo()  # Sobras de uma execução anterior
+        while True:
+            entrada = self._fila.get()
+            lote = [entrada]
+            prazo = time.monotonic() + self.intervalo
+            while entrada is not _PARAR and len(lote) < self.lote:
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    entrada = self._fila.get(timeout=restante)
+                except queue.Empty:
+                    break
+                lote.append(entrada)
+
+            parar = lote[-1] is _PARAR
+            entradas = lote[:-1] if parar else lote
+            try:
+                if entradas:
+                    self._gravar_lote(entradas)
+                if self._fila.empty():
+                    self._recuperar_transbordo()
+            finally:
+                for _ in lote:
+                    self._fila.task_done()
+            if parar:
+                return
+
+    def _gravar_lote(self, entradas):
+        # Dentro de uma transação, o log grava todas as entradas de uma vez
+        with transacao():
+            for entrada in entradas:
+                self.log.anexar(entrada)
+        self.lotes_gravados += 1
+
+    def _recuperar_transbordo(self):
+        """
+        📥 Grava no log as entradas que foram para o arquivo de transbordo.
+        """
+        if not self.arquivo_transbordo:
+            return
+        with self._trava_transbordo:
+            if not os.path.exists(self.arquivo_transbordo):
+                return
+            with open(self.arquivo_transbordo, 'r', encoding='utf-8') as f:
+                entradas = []
+                for linha in f:
+                    try:
+                        entradas.append(json.loads(linha))
+                    except ValueError:
+                        continue  # Linha incompleta: o programa caiu no meio da escrita
+            if entradas:
+                self._gravar_lote(entradas)
+            os.remove(self.arquivo_transbordo)
+
+    # ------------------------------------------------------------------
+    # Leitura e fechamento
+    # ------------------------------------------------------------------
+
+    def descarregar(self):
+        """
+        💾 Espera a fila esvaziar e tudo estar gravado.
+        """
+        if not self._fechado:
+            self._fila.join()
+        self.log.descarregar()
+
+    def ultimos(self, quantidade):
+        self.descarregar()
+        return self.log.ultimos(quantidade)
+
+    def consultar(self, *args, **kwargs):
+        self.descarregar()
+        return self.log.consultar(*args, **kwargs)
+
+    def __iter__(self):
+        self.descarregar()
+        return iter(self.log)
+
+    def __len__(self):
+        self.descarregar()
+        return len(self.log)
+
+    def fechar(self):
+        """
+        🔒 Grava o que estiver na fila, para a thread e fecha o log.
+        """
+        if self._fechado:
+            return
+        self._fila.put(_PARAR)
+        self._thread.join()
+        self._fechado = True
+        self.log.fechar()
@@ -0,0 +1,262 @@
+from contextlib import contextmanager
+import json
+import os
+import threading
+import time
+
+from armazenamento.repositorio import RepositorioJSON
+from armazenamento.travas import DISPONIVEL, trava_de_arquivo
+
+_AUSENTE = object()  # Campo que não existe no registro
+
+
+def _juntar_valor(base, meu, deles):
+    """
+    Junta um campo que os dois processos alteraram. Retorna
+    (valor, houve_conflito).
+    """
+    if type(base) is int and type(meu) is int and type(deles) is int:
+        # Contadores (saldo, pontos, usado...): soma as duas variações
+        return deles + (meu - base), False
+    if (isinstance(base, list) and isinstance(meu, list) and isinstance(deles, list)
+            and meu[:len(base)] == base and deles[:len(base)] == base):
+        # Listas em que os dois só anexaram: ficam os itens novos dos dois
+        return deles + meu[len(base):], False
+    return meu, True  # Sem como juntar: fica o valor deste processo
+
+
+def _juntar_registro(base, meu, deles):
+    """
+    🔀 Junta as alterações deste processo (base -> meu) com as do outro
+    (base -> deles), campo a campo. Retorna (registro, conflitos).
+    """
+    if meu == base:
+        return deles, 0
+    if deles == meu:
+        return meu, 0
+    if not (isinstance(base, dict) and isinstance(meu, dict) and isinstance(deles, dict)):
+        return meu, 1  # Criado ou apagado dos dois lados: fica o deste processo
+
+    juntado = dict(deles)
+    conflitos = 0
+    for campo in set(base) | set(meu):
+        anterior = base.get(campo, _AUSENTE)
+        valor = meu.get(campo, _AUSENTE)
+        if valor == anterior:
+            continue  # Só o outro processo mexeu (ou ninguém)
+        if valor is _AUSENTE:
+            juntado.pop(campo, None)
+        elif deles.get(campo, _AUSENTE) == anterior:
+            juntado[campo] = valor
+        else:
+            juntado[campo], conflito = _juntar_valor(anterior, valor, deles.get(campo))
+            conflitos += conflito
+    return juntado, conflitos
+
+
+class RepositorioCompartilhado(RepositorioJSON):
+    """
+    🤝 REPOSITÓRIO JSON COMPARTILHADO ENTRE PROCESSOS
+
+    O mesmo arquivo JSON do backend "json", mas para vários processos
+    usando a mesma pasta data/ ao mesmo tempo. Ao lado do arquivo fica
+    um contador de versão (ex: data/usuarios.versao), incrementado a cada
+    gravação. O arquivo de versão também é a trava (fcntl.flock) que os
+    processos seguram para gravar.
+
+    Antes de gravar, o repositório confere a versão. Se outro processo
+    gravou depois da última leitura, a cópia em memória está velha: o
+    arquivo é relido e só os registros que o outro processo alterou são
+    trocados. Os registros que os dois alteraram são juntados campo a
+    campo (contadores somam as duas variações; listas ficam com os itens
+    novos dos dois). Assim um depósito feito num terminal não some quando
+    o outro grava.
+
+    Juntar não basta para operações que conferem um valor antes de
+    alterar (ex: saldo suficiente para um saque): para elas existe
+    exclusivo(), que atualiza a memória e segura a trava durante o bloco
+    inteiro.
+
+    Limitação: a trava do arquivo vale para o processo inteiro (o flock
+    é do descritor, não da thread), então as threads de um mesmo
+    processo também passam uma por vez, por _trava_processo. As travas
+    por conta do UsuarioManager continuam valendo, mas neste modo duas
+    operações em contas diferentes do mesmo processo não rodam em
+    paralelo: para muitas sessões num processo só (ex: o servidor), use
+    outro backend.
+    """
+
+    def __init__(self, arquivo, arquivo_versao):
+        if not DISPONIVEL:
+            raise RuntimeError("O armazenamento compartilhado precisa de fcntl (Linux ou macOS)")
+        self.arquivo_versao = arquivo_versao
+        self.versao = 0           # Versão do arquivo que está em memória
+        self.recargas = 0         # Quantas vezes a memória estava velha e foi atualizada
+        self.conflitos = 0        # Campos alterados pelos dois lados sem como juntar
+        self.espera = 0.0         # Segundos esperando outros processos soltarem a trava
+        self._trava_processo = threading.RLock()  # Threads deste processo, uma por vez
+        self._profundidade = 0    # Quantos blocos travados estão abertos nesta thread
+
+        os.makedirs(os.path.dirname(arquivo_versao) or ".", exist_ok=True)
+        self._descritor = os.open(arquivo_versao, os.O_RDWR | os.O_CREAT, 0o644)
+        super().__init__(arquivo)
+
+    # ------------------------------------------------------------------
+    # Trava e versão
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def _travado(self):
+        """
+        Segura a trava do arquivo. A mesma thread pode travar de novo
+        (só o bloco de fora pede a trava ao sistema).
+        """
+        with self._trava_processo:
+            if self._profundidade:
+                self._profundidade += 1
+                try:
+                    yield
+                finally:
+                    self._profundidade -= 1
+                return
+
+            inicio = time.perf_counter()
+            with trava_de_arquivo(self._descritor):
+                self.espera += time.perf_counter() - inicio
+                self._profundidade = 1
+                try:
+                    yield
+                finally:
+                    self._profundidade = 0
+
+    def _versao_no_disco(self):
+        return int(os.pread(self._descritor, 32, 0) or 0)
+
+    def _gravar_versao(self, versao):
+        conteudo = f"{versao}\n".encode('utf-8')
+        os.pwrite(self._descritor, conteudo, 0)
+        os.ftruncate(self._descritor, len(conteudo))
+
+    def _ler_disco(self):
+        """
+        Lê o arquivo JSON e retorna duas cópias independentes dos
+        registros: uma para a memória e outra para guardar como base.
+        Retorna (None, None) se não existir ou estiver corrompido.
+        """
+        try:
+            with open(self.arquivo, 'r', encoding='utf-8') as f:
+                texto = f.read()
+            return json.loads(texto), json.loads(texto)
+        except (OSError, ValueError):
+            return None, None
+
+    def _carregar(self):
+        with self._travado():
+            self.versao = self._versao_no_disco()
+            registros, base = self._ler_disco()
+            self._base = base or {}  # Os registros como estão no disco
+            return registros or {}
+
+    # ------------------------------------------------------------------
+    # Atualização
+    # ------------------------------------------------------------------
+
+    def _atualizar(self):
+        """
+        🔄 Com a trava: se outro processo gravou, relê o arquivo e junta
+        com a memória. Retorna True se a memória estava velha.
+        """
+        versao = self._versao_no_disco()
+        if versao == self.versao:
+            return False
+
+        deles, nova_base = self._ler_disco()
+        if deles is None:
+            self.versao = versao  # Arquivo ilegível: fica com o que há em memória
+            return False
+        base, self._base = self._base, nova_base
+
+        for chave in set(base) | set(deles):
+            anterior = base.get(chave)
+            outro = deles.get(chave)
+            if outro == anterior:
+                continue  # O outro processo não mexeu neste registro
+            meu = self.registros.get(chave)
+            registro, conflitos = _juntar_registro(anterior, meu, outro)
+            self.conflitos += conflitos
+            if registro is meu:
+                continue
+            if registro is None:
+                del self.registros[chave]
+            elif isinstance(meu, dict):
+                # Troca o conteúdo sem trocar o dicionário: quem já tem o registro em mãos vê a versão nova
+                meu.clear()
+                meu.update(registro)
+            else:
+                self.registros[chave] = registro
+            self.esquecer(chave)
+            self._atualizar_indices(chave)
+
+        self.versao = versao
+        self.recargas += 1
+        return True
+
+    def sincronizar(self):
+        """
+        🔄 Traz para a memória o que outros processos gravaram. Quando
+        ninguém gravou, custa só a leitura do arquivo de versão.
+        """
+        if self._versao_no_disco() == self.versao:
+            return
+        with self._travado():
+            self._atualizar()
+
+    @contextmanager
+    def exclusivo(self):
+        """
+        🔐 BLOCO EXCLUSIVO
+
+        Atualiza a memória e trava o arquivo para os outros processos
+        até o fim do bloco, quando o que mudou é gravado (mesmo dentro
+        de uma transação maior, para não soltar a trava com alterações
+        pendentes):
+
+            with usuarios.exclusivo():
+                if usuarios[nome]["saldo"] >= valor:
+                    usuarios[nome]["saldo"] -= valor
+                    usuarios.salvar(nome, ["saldo"])
+        """
+        with self._travado():
+            externo = self._profundidade == 1
+            if externo:
+                self._atualizar()
+            try:
+                yield
+            finally:
+                if externo:
+                    self.descarregar()
+
+    # ------------------------------------------------------------------
+    # Gravação
+    # ------------------------------------------------------------------
+
+    def descarregar(self):
+        with self._travado():
+            if not self._pendente:
+                return
+            self._pendente = False
+            self._atualizar()
+
+            texto = self._serializar()
+            with open(self.arquivo + ".tmp", 'w', encoding='utf-8') as f:
+                f.write(texto)
+            # Troca o arquivo inteiro de uma vez: ninguém lê um JSON pela metade
+            os.replace(self.arquivo + ".tmp", self.arquivo)
+            self.versao += 1
+            self._gravar_versao(self.versao)
+            self._base = json.loads(texto)
+            self.escritas += 1
+
+    def fechar(self):
+        self.descarregar()
+        os.close(self._descritor)
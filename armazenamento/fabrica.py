@@ -0,0 +1,87 @@
+"""
+🏭 FÁBRICA DE REPOSITÓRIOS
+
+Escolhe o backend de armazenamento de acordo com utils/config.py,
+para que os managers não precisem saber onde os dados ficam.
+"""
+
+from armazenamento.assincrono import LogAssincrono
+from armazenamento.compartilhado import RepositorioCompartilhado
+from armazenamento.indexado import RepositorioIndexado
+from armazenamento.repositorio import LogJSON, RepositorioJSON, RepositorioJournal
+from armazenamento.segmentos import LogSegmentado
+from armazenamento.shards import RepositorioShards
+from armazenamento.sqlite import LogSQLite, RepositorioSQLite
+from utils import config
+
+
+def abrir_repositorio(nome, backend=None):
+    """
+    🗄️ ABRIR REPOSITÓRIO
+
+    Abre o repositório "nome" (usuarios, cartoes, emprestimos,
+    investimentos) no backend configurado:
+    - "json": data/<nome>.json, regravado a cada alteração
+    - "compartilhado": data/<nome>.json + data/<nome>.versao, para vários
+      processos na mesma pasta data/
+    - "journal": data/<nome>.json + data/<nome>.journal
+    - "shards": vários arquivos pequenos em data/<nome>/
+    - "indexado": data/<nome>.dat + data/<nome>.idx, lidos sob demanda
+    - "sqlite": tabela <nome> no banco SQLite
+    """
+    backend = backend or config.ARMAZENAMENTO
+    arquivo_json = f"data/{nome}.json"
+
+    if backend == "sqlite":
+        return RepositorioSQLite(config.ARQUIVO_SQLITE, nome, arquivo_json=arquivo_json)
+    if backend == "journal":
+        return RepositorioJournal(arquivo_json, f"data/{nome}.journal",
+                                  limite_compactacao=config.JOURNAL_LIMITE_COMPACTACAO)
+    if backend == "shards":
+        return RepositorioShards(f"data/{nome}", config.NUM_SHARDS, arquivo_json=arquivo_json)
+    if backend == "indexado":
+        return RepositorioIndexado(f"data/{nome}.dat", f"data/{nome}.idx",
+                                   capacidade_cache=config.CACHE_REGISTROS, arquivo_json=arquivo_json)
+    if backend == "json":
+        return RepositorioJSON(arquivo_json)
+    if backend == "compartilhado":
+        return RepositorioCompartilhado(arquivo_json, f"data/{nome}.versao")
+    raise ValueError(f"Backend de armazenamento desconhecido: {backend}")
+
+
+def abrir_log(nome, backend=None, assincrono=None):
+    """
+    📜 ABRIR LOG
+
+    Abre um log de entradas (ex: auditoria) no backend configurado:
+    - "segmentado": segmentos JSON lines em data/<nome>/, só anexando
+    - "json": data/<nome>.json com as últimas 1000 entradas, regravado a cada entrada
+    - "sqlite": tabela <nome> no banco SQLite
+
+    Com assincrono=True (ou LOG_ASSINCRONO ligado), as entradas passam
+    por uma fila e são gravadas em lotes por uma thread em segundo plano.
+    """
+    if assincrono is None:
+        assincrono = config.LOG_ASSINCRONO
+    log = _abrir_log(nome, backend or config.ARMAZENAMENTO_LOGS, assincrono)
+    if not assincrono:
+        return log
+    return LogAssincrono(log, config.LOG_TAMANHO_FILA, config.LOG_TAMANHO_LOTE,
+                         config.LOG_INTERVALO_MS / 1000, politica=config.LOG_FILA_CHEIA,
+                         arquivo_transbordo=f"data/{nome}.transbordo")
+
+
+def _abrir_log(nome, backend, assincrono):
+    arquivo_json = f"data/{nome}.json"
+
+    if backend == "segmentado":
+        return LogSegmentado(f"data/{nome}", config.LOG_TAMANHO_SEGMENTO, config.LOG_DURACAO_SEGMENTO,
+                             comprimir=config.LOG_COMPRIMIR, retencao_dias=config.LOG_RETENCAO_DIAS,
+                             arquivo_json=arquivo_json)
+    if backend == "sqlite":
+        # Gravado por outra thread no modo assíncrono: usa uma conexão própria
+        return LogSQLite(config.ARQUIVO_SQLITE, nome, arquivo_json=arquivo_json,
+                         conexao_propria=assincrono)
+    if backend == "json":
+        return LogJSON(arquivo_json)
+    raise ValueError(f"Backend de log desconhecido: {backend}")
@@ -0,0 +1,303 @@
+from collections import Counter, OrderedDict
+import json
+import os
+import threading
+
+from armazenamento.repositorio import Repositorio
+
+
+class RepositorioIndexado(Repositorio):
+    """
+    📇 REPOSITÓRIO INDEXADO (CARREGAMENTO SOB DEMANDA)
+
+    Os registros ficam num arquivo de dados com um registro por linha.
+    Na inicialização só o índice é lido: para cada chave, a posição
+    (offset) e o tamanho da linha no arquivo de dados. O registro completo
+    só é lido quando alguém pede por ele (ex: no login).
+
+    Os registros usados recentemente ficam num cache LRU; quando o cache
+    enche, o usado há mais tempo é descartado da memória. Um registro
+    que uma thread leu e ainda não salvou não é descartado: outra sessão
+    enchendo o cache não faz a alteração dela se perder.
+
+    Salvar um registro anexa a versão nova no fim do arquivo de dados e
+    uma linha nova no índice. As versões antigas viram "lixo", que é
+    removido pela compactação ao fechar.
+
+    Arquivos em disco (ex: usuarios):
+    - data/usuarios.dat: {"k": chave, "v": registro} por linha
+    - data/usuarios.idx: [chave, offset, tamanho] por linha (a última vale)
+    """
+
+    def __init__(self, arquivo_dados, arquivo_indice, capacidade_cache=1000, arquivo_json=None):
+        super().__init__()
+        self.arquivo_dados = arquivo_dados
+        self.arquivo_indice = arquivo_indice
+        self.capacidade_cache = max(capacidade_cache, 2)  # Uma transferência usa 2 registros
+        self.escritas = 0
+        self.indice = {}             # chave -> (offset, tamanho)
+        self._cache = OrderedDict()  # chave -> registro, do menos ao mais recente
+        self._sujos = set()
+        self._em_uso = {}            # thread -> chaves lidas e ainda não salvas por ela
+        self._presos = Counter()     # chave -> quantas threads estão usando o registro
+        self._bytes_lixo = 0         # Bytes ocupados por versões antigas
+        self._trava = threading.RLock()
+
+        if os.path.exists(self.arquivo_indice):
+            self._ler_indice()
+        else:
+            self._importar_json(arquivo_json)
+
+        self._dados = open(self.arquivo_dados, 'a+b')
+        self._arquivo_indice = open(self.arquivo_indice, 'a', encoding='utf-8')
+
+    def _ler_indice(self):
+        """
+        📇 Lê só o índice (chave -> posição), sem tocar nos registros.
+        """
+        with open(self.arquivo_indice, 'r', encoding='utf-8') as f:
+            for linha in f:
+                try:
+                    chave, offset, tamanho = json.loads(linha)
+                except ValueError:
+                    break  # Última linha incompleta: o programa caiu no meio da escrita
+                anterior = self.indice.pop(chave, None)
+                if anterior:
+                    self._bytes_lixo += anterior[1]
+                if tamanho:
+                    self.indice[chave] = (offset, tamanho)
+
+    def _importar_json(self, arquivo_json):
+        """
+        📥 Na primeira vez, copia o arquivo JSON antigo para o formato indexado.
+        """
+        registros = {}
+        if arquivo_json and os.path.exists(arquivo_json):
+            try:
+                with open(arquivo_json, 'r', encoding='utf-8') as f:
+                    registros = json.load(f)
+            except:
+                registros = {}
+        self._reescrever(registros.items())
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def _ler_registro(self, chave):
+        offset, tamanho = self.indice[chave]
+        self._dados.seek(offset)
+        return json.loads(self._dados.read(tamanho))["v"]
+
+    def _obter(self, chave):
+        with self._trava:
+            if chave in self._cache:
+                self._cache.move_to_end(chave)
+                self._usar(chave)
+                return self._cache[chave]
+            registro = self._ler_registro(chave)  # KeyError se não existir
+            self._cache[chave] = registro
+            self._usar(chave)
+            self._liberar_cache()
+            return registro
+
+    def _usar(self, chave):
+        """
+        📌 Prende o registro no cache até esta thread salvá-lo. Uma thread
+        só prende os últimos "capacidade_cache" registros que leu sem
+        salvar (os mais antigos eram só consultas).
+        """
+        em_uso = self._em_uso.setdefault(threading.get_ident(), OrderedDict())
+        if chave in em_uso:
+            em_uso.move_to_end(chave)
+            return
+        em_uso[chave] = None
+        self._presos[chave] += 1
+        if len(em_uso) > self.capacidade_cache:
+            self._soltar(em_uso, next(iter(em_uso)))
+
+    def _soltar(self, em_uso, chave):
+        del em_uso[chave]
+        self._presos[chave] -= 1
+        if not self._presos[chave]:
+            del self._presos[chave]
+
+    def _liberar_cache(self):
+        """
+        🧹 Descarta os registros menos usados quando o cache passa do limite.
+        Registros com alterações não gravadas, ou em uso por alguma
+        thread, nunca são descartados.
+        """
+        excesso = len(self._cache) - self.capacidade_cache
+        for chave in list(self._cache):
+            if excesso <= 0:
+                break
+            if chave not in self._sujos and chave not in self._presos:
+                del self._cache[chave]
+                self.esquecer(chave)
+                excesso -= 1
+
+    def __contains__(self, chave):
+        return chave in self.indice
+
+    def __len__(self):
+        return len(self.indice)
+
+    def __iter__(self):
+        return iter(list(self.indice))
+
+    def items(self):
+        """
+        🔁 Percorre os registros lendo um por vez do disco.
+        Quem já está no cache é usado direto, sem ler de novo.
+
+        Os registros que não estavam no cache são lidos só para a
+        iteração e não ficam guardados: para alterar um registro, use
+        repositorio[chave] antes de salvar (salvar uma chave que não está
+        no cache levanta KeyError, em vez de perder a alteração).
+        """
+        for chave in list(self.indice):
+            with self._trava:
+                registro = self._cache.get(chave)
+                if registro is None:
+                    registro = self._ler_registro(chave)
+            yield chave, registro
+
+    def values(self):
+        for _, registro in self.items():
+            yield registro
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def salvar(self, chave=None, campos=None):
+        """
+        💾 Como Repositorio.salvar, mas só aceita registros que estão no
+        cache: um dicionário lido por items() (ou descartado do cache)
+        não é o que seria gravado, e a alteração se perderia em silêncio.
+        """
+        with self._trava:
+            if chave is not None and self.indice.get(chave) and chave not in self._cache:
+                raise KeyError(f"O registro {chave!r} não está em memória: "
+                               f"leia com repositorio[chave] antes de alterar e salvar")
+            super().salvar(chave, campos)
+
+            # Salvo (ou marcado para o fim da transação): o registro não precisa mais ficar preso
+            em_uso = self._em_uso.get(threading.get_ident(), {})
+            for solta in ([chave] if chave is not None else list(em_uso)):
+                if solta in em_uso:
+                    self._soltar(em_uso, solta)
+
+    def __setitem__(self, chave, registro):
+        with self._trava:
+            self._cache[chave] = registro
+            self._cache.move_to_end(chave)
+            self._usar(chave)
+            self._sujos.add(chave)
+            if chave not in self.indice:
+                self.indice[chave] = None  # Reservado até a gravação
+
+    def __delitem__(self, chave):
+        with self._trava:
+            if chave not in self.indice:
+                raise KeyError(chave)
+            self._cache.pop(chave, None)
+            self._sujos.add(chave)
+            posicao = self.indice.pop(chave)
+            if posicao:
+                self._bytes_lixo += posicao[1]
+
+    def _marcar(self, chave, campos):
+        with self._trava:
+            if chave is None:
+                self._sujos.update(self._cache)
+            else:
+                self._sujos.add(chave)
+
+    def descarregar(self):
+        """
+        💾 Anexa a versão nova dos registros alterados no arquivo de dados
+        e a posição deles no índice.
+        """
+        with self._trava:
+            if not self._sujos:
+                return
+
+            self._dados.seek(0, os.SEEK_END)
+            offset = self._dados.tell()
+            blocos = []
+            linhas_indice = []
+
+            for chave in self._sujos:
+                if chave not in self.indice:
+                    linhas_indice.append(json.dumps([chave, 0, 0], ensure_ascii=False) + "\n")
+                    continue
+                bloco = (json.dumps({"k": chave, "v": self._cache[chave]}, ensure_ascii=False,
+                                    separators=(",", ":")) + "\n").encode('utf-8')
+                anterior = self.indice[chave]
+                if anterior:
+                    self._bytes_lixo += anterior[1]
+                self.indice[chave] = (offset, len(bloco))
+                linhas_indice.append(json.dumps([chave, offset, len(bloco)], ensure_ascii=False) + "\n")
+                blocos.append(bloco)
+                offset += len(bloco)
+
+            self._dados.write(b"".join(blocos))
+            self._dados.flush()
+            self._arquivo_indice.write("".join(linhas_indice))
+            self._arquivo_indice.flush()
+            self.escritas += 1
+            self._sujos.clear()
+            self._liberar_cache()
+
+    # ------------------------------------------------------------------
+    # Compactação
+    # ------------------------------------------------------------------
+
+    def _reescrever(self, registros):
+        """
+        Grava do zero o arquivo de dados e o índice só com os registros atuais.
+        """
+        indice = {}
+        offset = 0
+        with open(self.arquivo_dados + ".tmp", 'wb') as dados, \
+                open(self.arquivo_indice + ".tmp", 'w', encoding='utf-8') as arquivo_indice:
+            for chave, registro in registros:
+                bloco = (json.dumps({"k": chave, "v": registro}, ensure_ascii=False,
+                                    separators=(",", ":")) + "\n").encode('utf-8')
+                dados.write(bloco)
+                arquivo_indice.write(json.dumps([chave, offset, len(bloco)], ensure_ascii=False) + "\n")
+                indice[chave] = (offset, len(bloco))
+                offset += len(bloco)
+
+        os.replace(self.arquivo_dados + ".tmp", self.arquivo_dados)
+        os.replace(self.arquivo_indice + ".tmp", self.arquivo_indice)
+        self.indice = indice
+        self._bytes_lixo = 0
+
+    def compactar(self):
+        """
+        🧹 COMPACTAR
+
+        Remove as versões antigas dos registros, reescrevendo os arquivos.
+        """
+        with self._trava:
+            self.descarregar()
+            registros = list(self.items())
+            self._dados.close()
+            self._arquivo_indice.close()
+            self._reescrever(registros)
+            self._dados = open(self.arquivo_dados, 'a+b')
+            self._arquivo_indice = open(self.arquivo_indice, 'a', encoding='utf-8')
+
+    def fechar(self):
+        """
+        🔒 Grava o que estiver pendente e compacta se houver mais lixo
+        do que dados úteis.
+        """
+        with self._trava:
+            self.descarregar()
+            tamanho = self._dados.seek(0, os.SEEK_END)
+            if self._bytes_lixo > tamanho // 2:
+                self.compactar()
@@ -0,0 +1,78 @@
+class IndiceSecundario:
+    """
+    🗂️ ÍNDICE SECUNDÁRIO
+
+    Mantém em memória, para um campo dos registros, quais chaves têm
+    cada valor. Exemplo com o campo "usuario" nos cartões:
+
+        "Marco Gizoni" -> ["4000123412341234", "4000987698769876"]
+
+    Assim achar os registros de um valor custa só o número de registros
+    com aquele valor, sem percorrer o repositório inteiro.
+
+    Opcionalmente o índice é particionado por um segundo campo (ex:
+    "status" nos empréstimos): as chaves de cada valor ficam separadas
+    por partição, e dá para pedir só as de uma partição ("ativo") ou
+    todas as chaves de uma partição, de qualquer valor.
+
+    O índice é montado uma vez (construir) e depois atualizado registro
+    a registro (atualizar) sempre que o repositório salva uma chave.
+    """
+
+    def __init__(self, campo, particao=None):
+        self.campo = campo
+        self.particao = particao
+        self._chaves = {}     # valor -> partição -> {chave: None} (dicionário usado como conjunto ordenado)
+        self._por_parte = {}  # partição -> {chave: None}
+        self._posicao = {}    # chave -> (valor, partição) em que a chave está no índice
+
+    def construir(self, itens):
+        """
+        🏗️ Monta o índice a partir de pares (chave, registro).
+        """
+        self._chaves.clear()
+        self._por_parte.clear()
+        self._posicao.clear()
+        for chave, registro in itens:
+            self.atualizar(chave, registro)
+
+    def atualizar(self, chave, registro):
+        """
+        🔄 Coloca a chave no grupo do valor (e partição) atual do registro
+        (registro None = a chave foi apagada e sai do índice).
+        """
+        if chave in self._posicao:
+            valor, parte = self._posicao.pop(chave)
+            partes = self._chaves[valor]
+            del partes[parte][chave]
+            if not partes[parte]:
+                del partes[parte]
+            if not partes:
+                del self._chaves[valor]
+            del self._por_parte[parte][chave]
+            if not self._por_parte[parte]:
+                del self._por_parte[parte]
+
+        if registro is not None:
+            valor = registro.get(self.campo)
+            parte = registro.get(self.particao) if self.particao else None
+            self._posicao[chave] = (valor, parte)
+            self._chaves.setdefault(valor, {}).setdefault(parte, {})[chave] = None
+            self._por_parte.setdefault(parte, {})[chave] = None
+
+    def chaves(self, valor, parte=None):
+        """
+        🔎 Chaves dos registros com o valor informado. Num índice
+        particionado, "parte" limita a uma partição (ex: "ativo").
+        """
+        partes = self._chaves.get(valor, {})
+        if parte is not None:
+            return list(partes.get(parte, ()))
+        return [chave for grupo in partes.values() for chave in grupo]
+
+    def chaves_da_particao(self, parte):
+        """
+        📂 Todas as chaves de uma partição, de qualquer valor
+        (ex: todos os empréstimos ativos do banco).
+        """
+        return list(self._por_parte.get(parte, ()))
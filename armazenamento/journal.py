@@ -0,0 +1,256 @@
+import json
+import os
+import threading
+
+from armazenamento.unidade_trabalho import adiar_escrita
+
+
+class Journal:
+    """
+    📒 JOURNAL (LOG DE ESCRITA ANTECIPADA)
+
+    Em vez de reescrever o arquivo inteiro a cada alteração, o journal
+    anexa uma linha curta descrevendo só o que mudou. Os dados completos
+    ficam num "snapshot" (o arquivo JSON de sempre) e, de tempos em tempos,
+    uma thread em segundo plano junta as linhas do journal no snapshot.
+
+    Para carregar, basta ler o snapshot e reaplicar o journal por cima.
+
+    Todas as operações são idempotentes (aplicar duas vezes dá o mesmo
+    resultado), então se o programa cair no meio de uma compactação
+    nada é duplicado ao reaplicar o journal.
+    """
+
+    def __init__(self, arquivo_snapshot, arquivo_journal, limite_compactacao=1000):
+        """
+        🏗️ CONSTRUTOR
+
+        Recebe o arquivo do snapshot, o arquivo do journal e quantas
+        linhas o journal pode acumular antes de ser compactado.
+        """
+        self.arquivo_snapshot = arquivo_snapshot
+        self.arquivo_journal = arquivo_journal
+        self.arquivo_selado = arquivo_journal + ".1"  # Journal "congelado" esperando compactação
+        self.limite_compactacao = limite_compactacao
+
+        self.registros_pendentes = 0  # Linhas no journal ativo
+        self.escritas = 0             # Quantas vezes o journal foi gravado
+        self._buffer = []             # Linhas esperando o fim da transação
+        self._trava = threading.Lock()
+        self._compactacao = None      # Thread de compactação em andamento
+        self._arquivo = None          # Arquivo do journal aberto para anexar
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def carregar(self):
+        """
+        📂 CARREGAR ESTADO
+
+        Lê o snapshot e reaplica o journal selado (se uma compactação
+        anterior não terminou) e o journal ativo.
+        """
+        estado = self._ler_snapshot()
+        self._aplicar_arquivo(estado, self.arquivo_selado)
+        self.registros_pendentes = self._aplicar_arquivo(estado, self.arquivo_journal)
+
+        # Sobrou um journal selado de uma execução anterior: termina a compactação
+        if os.path.exists(self.arquivo_selado):
+            self._iniciar_compactacao()
+
+        return estado
+
+    def _ler_snapshot(self):
+        if os.path.exists(self.arquivo_snapshot):
+            try:
+                with open(self.arquivo_snapshot, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except:
+                return {}
+        return {}
+
+    def _aplicar_arquivo(self, estado, arquivo):
+        """
+        🔁 REAPLICAR JOURNAL
+
+        Aplica cada linha do arquivo sobre o estado e retorna quantas
+        linhas foram aplicadas. Uma última linha incompleta (o programa
+        caiu no meio da escrita) é ignorada.
+        """
+        if not os.path.exists(arquivo):
+            return 0
+
+        aplicados = 0
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    break
+                self._aplicar(estado, registro)
+                aplicados += 1
+        return aplicados
+
+    @staticmethod
+    def _aplicar(estado, registro):
+        op = registro["op"]
+        chave = registro["k"]
+
+        if op == "put":
+            estado[chave] = registro["v"]
+        elif op == "del":
+            estado.pop(chave, None)
+        elif chave in estado:
+            if op == "set":
+                estado[chave][registro["c"]] = registro["v"]
+            elif op == "add":
+                lista = estado[chave].setdefault(registro["c"], [])
+                # Só anexa se ainda não foi aplicado (mantém a idempotência)
+                if len(lista) == registro["i"]:
+                    lista.append(registro["v"])
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def inserir(self, chave, registro):
+        """
+        ➕ Grava um registro completo (ex: usuário recém-cadastrado).
+        """
+        self._escrever({"op": "put", "k": chave, "v": registro})
+
+    def definir(self, chave, campo, valor):
+        """
+        ✏️ Grava o novo valor de um único campo (ex: saldo).
+        """
+        self._escrever({"op": "set", "k": chave, "c": campo, "v": valor})
+
+    def anexar(self, chave, campo, indice, valor):
+        """
+        📎 Grava um item anexado a uma lista (ex: histórico).
+
+        O índice é a posição do item na lista, usada para não
+        duplicar o item se o journal for reaplicado.
+        """
+        self._escrever({"op": "add", "k": chave, "c": campo, "i": indice, "v": valor})
+
+    def remover(self, chave):
+        """
+        🗑️ Grava a remoção de um registro.
+        """
+        self._escrever({"op": "del", "k": chave})
+
+    def _escrever(self, registro):
+        linha = json.dumps(registro, ensure_ascii=False, separators=(",", ":"))
+
+        with self._trava:
+            self._buffer.append(linha + "\n")
+
+        # Dentro de uma transação, as linhas vão juntas num único flush
+        if adiar_escrita(self, self.descarregar):
+            return
+        self.descarregar()
+
+    def descarregar(self):
+        """
+        🚿 DESCARREGAR
+
+        Grava de uma vez todas as linhas acumuladas no buffer.
+        """
+        with self._trava:
+            if not self._buffer:
+                return
+            if self._arquivo is None:
+                self._arquivo = open(self.arquivo_journal, 'a', encoding='utf-8')
+            self._arquivo.write("".join(self._buffer))
+            self._arquivo.flush()
+            self.registros_pendentes += len(self._buffer)
+            self.escritas += 1
+            self._buffer = []
+            precisa_compactar = self.registros_pendentes >= self.limite_compactacao
+
+        if precisa_compactar:
+            self._iniciar_compactacao()
+
+    # ------------------------------------------------------------------
+    # Compactação
+    # ------------------------------------------------------------------
+
+    def _iniciar_compactacao(self):
+        """
+        🧹 INICIAR COMPACTAÇÃO EM SEGUNDO PLANO
+
+        "Sela" o journal ativo (renomeia para .1) e começa um journal
+        novo. Uma thread junta o journal selado no snapshot sem travar
+        as operações do usuário.
+        """
+        with self._trava:
+            if self._compactacao is not None and self._compactacao.is_alive():
+                return  # Já existe uma compactação rodando
+
+            if not os.path.exists(self.arquivo_selado):
+                if not os.path.exists(self.arquivo_journal):
+                    return
+                if self._arquivo is not None:
+                    self._arquivo.close()
+                    self._arquivo = None
+                os.replace(self.arquivo_journal, self.arquivo_selado)
+                self.registros_pendentes = 0
+
+            self._compactacao = threading.Thread(target=self._compactar_selado, name="journal-compactacao")
+            self._compactacao.start()
+
+    def _compactar_selado(self):
+        """
+        Lê o snapshot do disco, aplica o journal selado e grava o
+        resultado como novo snapshot. Não mexe no estado em memória.
+        """
+        estado = self._ler_snapshot()
+        self._aplicar_arquivo(estado, self.arquivo_selado)
+        self._gravar_snapshot(estado)
+        os.remove(self.arquivo_selado)
+
+    def _gravar_snapshot(self, estado):
+        temporario = self.arquivo_snapshot + ".tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            json.dump(estado, f, indent=2, ensure_ascii=False)
+        os.replace(temporario, self.arquivo_snapshot)  # Troca atômica
+
+    def checkpoint(self, estado):
+        """
+        💾 CHECKPOINT
+
+        Grava o estado completo como snapshot e zera o journal.
+        É o equivalente a um "salvar tudo".
+        """
+        self.aguardar()
+        with self._trava:
+            self._gravar_snapshot(estado)
+            if self._arquivo is not None:
+                self._arquivo.close()
+                self._arquivo = None
+            for arquivo in (self.arquivo_selado, self.arquivo_journal):
+                if os.path.exists(arquivo):
+                    os.remove(arquivo)
+            self.registros_pendentes = 0
+            self._buffer = []  # Já está no snapshot
+
+    def aguardar(self):
+        """
+        ⏳ Espera a compactação em andamento terminar.
+        """
+        compactacao = self._compactacao
+        if compactacao is not None:
+            compactacao.join()
+
+    def fechar(self):
+        """
+        🔒 Grava o que sobrou no buffer, espera a compactação e fecha o journal.
+        """
+        self.descarregar()
+        self.aguardar()
+        with self._trava:
+            if self._arquivo is not None:
+                self._arquivo.close()
+                self._arquivo = None
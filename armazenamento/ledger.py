@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import struct
+import threading
+
+from armazenamento.travas import trava_de_arquivo
+from armazenamento.unidade_trabalho import adiar_escrita
+
+# Cada posição no índice ocupa 8 bytes (inteiro sem sinal, little-endian)
+_POSICAO = struct.Struct("<Q")
+_LOTE_POSICOES = 1024  # Quantas posições são lidas do .idx de cada vez
+
+
+class Ledger:
+    """
+    📒 LEDGER (LIVRO-RAZÃO) DE TRANSAÇÕES
+
+    Guarda o histórico de cada conta em arquivos próprios, fora do
+    registro do usuário, só anexando no final (nunca reescreve nada):
+    - <conta>.log: uma transação por linha
+    - <conta>.idx: a posição (offset) de cada linha no .log, 8 bytes cada
+
+    Como cada posição tem tamanho fixo, dá para achar a n-ésima transação
+    a partir do fim só fazendo conta: as últimas 20 transações são lidas
+    sem passar pelo resto do arquivo. Toda leitura vai direto à posição
+    guardada no .idx, então uma linha órfã no .log (de uma gravação
+    interrompida) nunca é lida.
+
+    Os arquivos ficam em subpastas (pelos 2 primeiros caracteres do hash
+    do nome da conta) para não acumular milhões de arquivos numa pasta só.
+    """
+
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        self.escritas = 0
+        self._pendentes = {}  # thread -> {conta -> entradas esperando o fim da transação dela}
+        self._trava = threading.Lock()
+
+    def _caminhos(self, conta):
+        nome = hashlib.sha1(conta.encode('utf-8')).hexdigest()
+        pasta = os.path.join(self.diretorio, nome[:2])
+        return os.path.join(pasta, nome + ".log"), os.path.join(pasta, nome + ".idx")
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def anexar(self, conta, entrada):
+        """
+        📎 Anexa uma transação no ledger da conta.
+
+        Dentro de uma transação, as entradas são gravadas juntas no final.
+        Cada thread tem as suas pendências: o fim da transação de uma
+        sessão não grava o histórico que outra ainda está montando.
+        """
+        with self._trava:
+            pendentes = self._pendentes.setdefault(threading.get_ident(), {})
+            pendentes.setdefault(conta, []).append(entrada)
+        if adiar_escrita(self, self.descarregar):
+            return
+        self.descarregar()
+
+    def descarregar(self, todas_as_threads=False):
+        """
+        💾 Grava as entradas pendentes desta thread (com
+        todas_as_threads=True, as de todas, ex: ao fechar): primeiro as
+        linhas no .log, depois as posições no .idx. Se o programa cair
+        entre os dois, a linha fica órfã no .log, mas nenhuma posição
+        do .idx aponta para ela e as próximas entradas entram depois dela.
+        """
+        with self._trava:
+            if todas_as_threads:
+                por_thread, self._pendentes = list(self._pendentes.values()), {}
+            else:
+                por_thread = [self._pendentes.pop(threading.get_ident(), {})]
+            pendentes = {}
+            for contas in por_thread:
+                for conta, entradas in contas.items():
+                    pendentes.setdefault(conta, []).extend(entradas)
+
+            for conta, entradas in pendentes.items():
+                arquivo_log, arquivo_idx = self._caminhos(conta)
+                os.makedirs(os.path.dirname(arquivo_log), exist_ok=True)
+
+                # O .log fica travado até o .idx ser gravado: outro processo
+                # anexando na mesma conta espera, e as posições não se misturam
+                with open(arquivo_log, 'ab') as log, trava_de_arquivo(log):
+                    offset = log.seek(0, os.SEEK_END)
+                    posicoes = []
+                    blocos = []
+                    for entrada in entradas:
+                        bloco = (json.dumps(entrada, ensure_ascii=False) + "\n").encode('utf-8')
+                        posicoes.append(_POSICAO.pack(offset))
+                        blocos.append(bloco)
+                        offset += len(bloco)
+                    log.write(b"".join(blocos))
+                    log.flush()
+
+                    with open(arquivo_idx, 'ab') as idx:
+                        idx.write(b"".join(posicoes))
+                self.escritas += 1
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    def _pendentes_da_thread(self, conta):
+        # Entradas desta thread ainda não gravadas (a transação dela está aberta)
+        with self._trava:
+            return list(self._pendentes.get(threading.get_ident(), {}).get(conta, ()))
+
+    def _no_disco(self, conta):
+        # Quantas transações da conta já estão gravadas (tamanho do índice / 8)
+        arquivo_log, arquivo_idx = self._caminhos(conta)
+        if not os.path.exists(arquivo_idx):
+            if not os.path.exists(arquivo_log):
+                return 0
+            self._reconstruir_indice(arquivo_log, arquivo_idx)
+        return os.path.getsize(arquivo_idx) // _POSICAO.size
+
+    def contar(self, conta):
+        """
+        🔢 Quantas transações a conta tem. As leituras juntam o que está
+        gravado com as entradas pendentes desta thread, sem gravar nada.
+        """
+        return self._no_disco(conta) + len(self._pendentes_da_thread(conta))
+
+    def _ler_posicoes(self, conta, primeira, quantidade):
+        """
+        Lê as entradas de número primeira..primeira+quantidade-1, cada
+        uma na posição que o .idx guarda para ela.
+        """
+        if quantidade <= 0:
+            return
+        arquivo_log, arquivo_idx = self._caminhos(conta)
+        with open(arquivo_idx, 'rb') as idx, open(arquivo_log, 'rb') as log:
+            idx.seek(primeira * _POSICAO.size)
+            while quantidade > 0:
+                lote = min(quantidade, _LOTE_POSICOES)
+                for (offset,) in _POSICAO.iter_unpack(idx.read(lote * _POSICAO.size)):
+                    log.seek(offset)
+                    yield json.loads(log.readline())
+                quantidade -= lote
+
+    def ultimos(self, conta, quantidade):
+        """
+        🔚 Retorna as últimas transações da conta, da mais antiga para a
+        mais nova, lendo só o final dos arquivos.
+        """
+        pendentes = self._pendentes_da_thread(conta)
+        no_disco = self._no_disco(conta)
+        quantidade = min(quantidade, no_disco + len(pendentes))
+        if quantidade <= 0:
+            return []
+        do_disco = max(quantidade - len(pendentes), 0)
+        gravadas = list(self._ler_posicoes(conta, no_disco - do_disco, do_disco))
+        return gravadas + pendentes[len(pendentes) - (quantidade - do_disco):]
+
+    def ler(self, conta):
+        """
+        📜 Percorre todas as transações da conta, uma por vez.
+        """
+        pendentes = self._pendentes_da_thread(conta)
+        yield from self._ler_posicoes(conta, 0, self._no_disco(conta))
+        yield from pendentes
+
+    # ------------------------------------------------------------------
+    # Migrações
+    # ------------------------------------------------------------------
+
+    def reescrever(self, conta, entradas):
+        """
+        ✏️ Troca todo o ledger da conta pelas entradas informadas.
+        Só para migrações: no uso normal o ledger nunca é reescrito.
+        """
+        self.descarregar()
+        arquivo_log, arquivo_idx = self._caminhos(conta)
+        os.makedirs(os.path.dirname(arquivo_log), exist_ok=True)
+        with self._trava:
+            offset = 0
+            with open(arquivo_log + ".tmp", 'wb') as log, open(arquivo_idx + ".tmp", 'wb') as idx:
+                for entrada in entradas:
+                    bloco = (json.dumps(entrada, ensure_ascii=False) + "\n").encode('utf-8')
+                    log.write(bloco)
+                    idx.write(_POSICAO.pack(offset))
+                    offset += len(bloco)
+            # O .idx antigo sai antes da troca do .log: se o programa cair no
+            # meio, o .idx que faltar é refeito a partir do .log que ficou
+            # (ver contar()), e a migração roda de novo (quem migra só grava
+            # a VERSAO no fim)
+            if os.path.exists(arquivo_idx):
+                os.remove(arquivo_idx)
+            os.replace(arquivo_log + ".tmp", arquivo_log)
+            os.replace(arquivo_idx + ".tmp", arquivo_idx)
+
+    def _reconstruir_indice(self, arquivo_log, arquivo_idx):
+        """
+        🔧 Refaz o .idx percorrendo o .log linha a linha. Só acontece se
+        reescrever() foi interrompido entre a troca dos dois arquivos.
+        """
+        with self._trava:
+            offset = 0
+            with open(arquivo_log, 'rb') as log, open(arquivo_idx + ".tmp", 'wb') as idx:
+                for linha in log:
+                    idx.write(_POSICAO.pack(offset))
+                    offset += len(linha)
+            os.replace(arquivo_idx + ".tmp", arquivo_idx)
+
+    def versao(self):
+        """
+        🏷️ Versão do formato das entradas (gravada em <diretório>/VERSAO).
+        """
+        arquivo = os.path.join(self.diretorio, "VERSAO")
+        if not os.path.exists(arquivo):
+            return 1
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            return int(f.read().strip() or 1)
+
+    def gravar_versao(self, versao):
+        os.makedirs(self.diretorio, exist_ok=True)
+        with open(os.path.join(self.diretorio, "VERSAO"), 'w', encoding='utf-8') as f:
+            f.write(f"{versao}\n")
+
+    def fechar(self):
+        self.descarregar(todas_as_threads=True)
@@ -0,0 +1,393 @@
+from collections.abc import MutableMapping
+from contextlib import nullcontext
+import json
+import os
+import threading
+
+from armazenamento.indices import IndiceSecundario
+from armazenamento.journal import Journal
+from armazenamento.unidade_trabalho import adiar_escrita
+
+
+def _assinatura(registro):
+    # Resumo do conteúdo do registro, para saber se ele mudou desde a última gravação
+    return hash(json.dumps(registro, sort_keys=True, ensure_ascii=False, default=str))
+
+
+class Repositorio(MutableMapping):
+    """
+    🗄️ REPOSITÓRIO (BASE)
+
+    Um repositório guarda registros (dicionários) identificados por uma
+    chave: usuários pelo nome, cartões pelo número, empréstimos e
+    investimentos pelo id. Para os managers ele funciona como um
+    dicionário comum:
+
+        cartao = self.cartoes[numero]
+        cartao["usado"] += valor
+        self.cartoes.salvar(numero)
+
+    Como os dados são gravados (um arquivo JSON, um journal, uma tabela
+    SQLite...) fica a cargo de cada implementação: elas implementam
+    _obter() em vez de __getitem__.
+
+    Cada registro lido guarda uma assinatura do seu conteúdo. Se salvar()
+    for chamado para um registro que não mudou desde que foi lido (ou
+    gravado), nada é gravado e a chamada conta em "escritas_evitadas"
+    (as gravações feitas contam em "escritas").
+
+    Também pode manter índices secundários (criar_indice), atualizados
+    a cada salvar().
+    """
+
+    def __init__(self):
+        self.escritas_evitadas = 0  # salvar() chamados sem nada para gravar
+        self._assinaturas = {}      # chave -> assinatura do registro como está gravado
+        self._indices = {}          # campo -> IndiceSecundario
+
+    def __getitem__(self, chave):
+        registro = self._obter(chave)
+        if chave not in self._assinaturas:
+            self._assinaturas[chave] = _assinatura(registro)
+        return registro
+
+    def _obter(self, chave):
+        raise NotImplementedError
+
+    def salvar(self, chave=None, campos=None):
+        """
+        💾 SALVAR
+
+        Avisa que o registro da chave mudou. Se souber quais campos
+        mudaram, passe a lista em "campos" para gravar só o necessário.
+        Sem chave, grava tudo.
+
+        Se o registro não mudou desde a última leitura ou gravação,
+        não grava nada.
+
+        Dentro de uma transação a gravação fica para o final da operação.
+        """
+        if chave is not None and not self._mudou(chave):
+            self.escritas_evitadas += 1
+            return
+        self._atualizar_indices(chave)
+        self._marcar(chave, campos)
+        if adiar_escrita(self, self.descarregar):
+            return
+        self.descarregar()
+
+    def _mudou(self, chave):
+        """
+        🔍 Compara o registro com a assinatura de quando foi lido ou gravado
+        (e já guarda a nova). Registros novos, apagados ou nunca lidos por
+        self[chave] contam como alterados.
+        """
+        if chave not in self:
+            self._assinaturas.pop(chave, None)
+            return True
+        anterior = self._assinaturas.get(chave)
+        atual = _assinatura(self._obter(chave))
+        self._assinaturas[chave] = atual
+        return atual != anterior
+
+    def esquecer(self, chave):
+        """
+        Descarta a assinatura de um registro que saiu da memória.
+        """
+        self._assinaturas.pop(chave, None)
+
+    def anexar(self, chave, campo, valor):
+        """
+        📎 ANEXAR
+
+        Adiciona um item numa lista do registro (ex: histórico) e grava.
+        """
+        self[chave].setdefault(campo, []).append(valor)
+        self.salvar(chave, [campo])
+
+    def chaves_do_usuario(self, usuario):
+        """
+        🔎 CHAVES DO USUÁRIO
+
+        Retorna as chaves dos registros que pertencem a um usuário.
+        Com um índice no campo "usuario" (criar_indice), só olha os
+        registros dele; sem índice, percorre tudo.
+        """
+        if "usuario" in self._indices:
+            return self._indices["usuario"].chaves(usuario)
+        return [chave for chave, registro in self.items() if registro.get("usuario") == usuario]
+
+    # ------------------------------------------------------------------
+    # Índices secundários
+    # ------------------------------------------------------------------
+
+    def criar_indice(self, campo, particao=None):
+        """
+        🗂️ CRIAR ÍNDICE
+
+        Monta um índice em memória campo -> chaves (ex: usuario ->
+        números dos cartões), percorrendo os registros uma vez. Depois
+        disso o índice é atualizado a cada salvar(chave).
+
+        Com "particao" (ex: "status"), as chaves de cada valor ficam
+        separadas pelo valor desse segundo campo.
+        """
+        indice = IndiceSecundario(campo, particao)
+        indice.construir(self._percorrer())
+        self._indices[campo] = indice
+        return indice
+
+    def _percorrer(self):
+        """
+        Pares (chave, registro) para montar índices. Backends que guardam
+        em memória tudo o que leem podem devolver uma leitura mais leve.
+        """
+        return self.items()
+
+    def _atualizar_indices(self, chave):
+        if not self._indices:
+            return
+        if chave is None:
+            # "Salvar tudo": qualquer registro pode ter mudado
+            for indice in self._indices.values():
+                indice.construir(self._percorrer())
+            return
+        registro = self._obter(chave) if chave in self else None
+        for indice in self._indices.values():
+            indice.atualizar(chave, registro)
+
+    # ------------------------------------------------------------------
+    # Vários processos na mesma pasta data/
+    # ------------------------------------------------------------------
+
+    def sincronizar(self):
+        """
+        🔄 Traz para a memória o que outros processos gravaram. Só o
+        backend "compartilhado" faz algo aqui; nos outros, cada processo
+        vê apenas o que ele mesmo carregou.
+        """
+
+    def exclusivo(self):
+        """
+        🔐 Bloco em que nenhum outro processo grava no repositório. Só o
+        backend "compartilhado" trava algo (ver RepositorioCompartilhado).
+        """
+        return nullcontext()
+
+    def _marcar(self, chave, campos):
+        raise NotImplementedError
+
+    def descarregar(self):
+        raise NotImplementedError
+
+    def fechar(self):
+        """
+        🔒 Grava o que estiver pendente e libera os recursos.
+        """
+        self.descarregar()
+
+
+class RepositorioJSON(Repositorio):
+    """
+    📄 REPOSITÓRIO EM ARQUIVO JSON
+
+    O comportamento de sempre: todos os registros ficam em memória e
+    qualquer alteração regrava o arquivo JSON inteiro (uma thread por
+    vez, quando várias sessões gravam ao mesmo tempo).
+    """
+
+    def __init__(self, arquivo):
+        super().__init__()
+        self.arquivo = arquivo
+        self.escritas = 0       # Quantas vezes o arquivo foi regravado
+        self._pendente = False  # Há alterações ainda não gravadas
+        self._trava = threading.Lock()
+        self.registros = self._carregar()
+
+    def _carregar(self):
+        """
+        📂 Lê o arquivo. Se não existir ou estiver corrompido, começa vazio.
+        """
+        if os.path.exists(self.arquivo):
+            try:
+                with open(self.arquivo, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except:
+                return {}
+        return {}
+
+    def _obter(self, chave):
+        return self.registros[chave]
+
+    def __setitem__(self, chave, registro):
+        self.registros[chave] = registro
+
+    def __delitem__(self, chave):
+        del self.registros[chave]
+
+    def __contains__(self, chave):
+        return chave in self.registros
+
+    def __iter__(self):
+        return iter(self.registros)
+
+    def __len__(self):
+        return len(self.registros)
+
+    def items(self):
+        return self.registros.items()
+
+    def values(self):
+        return self.registros.values()
+
+    def _marcar(self, chave, campos):
+        self._pendente = True
+
+    def descarregar(self):
+        with self._trava:
+            if not self._pendente:
+                return
+            # Desmarca antes de gravar: o que mudar durante a gravação marca de novo
+            self._pendente = False
+            texto = self._serializar()
+            with open(self.arquivo, 'w', encoding='utf-8') as f:
+                f.write(texto)
+            self.escritas += 1
+
+    def _serializar(self):
+        while True:
+            try:
+                return json.dumps(self.registros, indent=2, ensure_ascii=False)
+            except RuntimeError:
+                continue  # Outra thread incluiu um registro (ou campo) no meio: tenta de novo
+
+
+class RepositorioJournal(RepositorioJSON):
+    """
+    📒 REPOSITÓRIO COM JOURNAL
+
+    Os registros ficam em memória como no JSON, mas cada alteração vira
+    uma linha curta no journal em vez de regravar o arquivo inteiro.
+    O arquivo JSON passa a ser o snapshot que o journal compacta.
+    """
+
+    def __init__(self, arquivo, arquivo_journal, limite_compactacao=1000):
+        Repositorio.__init__(self)  # Sem o __init__ do JSON: "escritas" vem do journal
+        self.arquivo = arquivo
+        self.journal = Journal(arquivo, arquivo_journal, limite_compactacao)
+        self.registros = self.journal.carregar()
+
+    @property
+    def escritas(self):
+        return self.journal.escritas  # O journal conta as próprias escritas
+
+    def _marcar(self, chave, campos):
+        if chave is None:
+            # "Salvar tudo": grava um snapshot completo e zera o journal
+            self.journal.checkpoint(self.registros)
+        elif chave not in self.registros:
+            self.journal.remover(chave)
+        elif campos is None:
+            self.journal.inserir(chave, self.registros[chave])
+        else:
+            for campo in campos:
+                self.journal.definir(chave, campo, self.registros[chave][campo])
+
+    def anexar(self, chave, campo, valor):
+        lista = self.registros[chave].setdefault(campo, [])
+        lista.append(valor)
+        self.journal.anexar(chave, campo, len(lista) - 1, valor)
+
+    def descarregar(self):
+        self.journal.descarregar()
+
+    def fechar(self):
+        self.journal.fechar()
+
+
+def combina_filtro(entrada, usuario=None, acao=None, inicio=None, fim=None):
+    """
+    🔎 Diz se uma entrada de log passa pelos filtros de uma consulta.
+
+    inicio e fim são textos ISO (ex: "2025-09-25T18:00:00"), comparados
+    direto com o campo "timestamp" da entrada; os dois limites entram.
+    """
+    if usuario is not None and entrada.get("usuario") != usuario:
+        return False
+    if acao is not None and entrada.get("acao") != acao:
+        return False
+    timestamp = entrada.get("timestamp") or ""
+    if inicio is not None and timestamp < inicio:
+        return False
+    if fim is not None and timestamp > fim:
+        return False
+    return True
+
+
+class LogJSON:
+    """
+    📜 LOG EM ARQUIVO JSON
+
+    Guarda uma lista de entradas (ex: auditoria) num arquivo JSON,
+    mantendo só as últimas "limite" entradas.
+    """
+
+    def __init__(self, arquivo, limite=1000):
+        self.arquivo = arquivo
+        self.limite = limite
+        self.escritas = 0
+        self.entradas = self._carregar()
+
+    def _carregar(self):
+        if os.path.exists(self.arquivo):
+            try:
+                with open(self.arquivo, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except:
+                return []
+        return []
+
+    def anexar(self, entrada):
+        """
+        📎 Adiciona uma entrada no final do log e grava.
+        """
+        self.entradas.append(entrada)
+
+        # Mantém apenas as últimas entradas para não ocupar muito espaço
+        if len(self.entradas) > self.limite:
+            self.entradas = self.entradas[-self.limite:]
+
+        if adiar_escrita(self, self.descarregar):
+            return
+        self.descarregar()
+
+    def ultimos(self, quantidade):
+        """
+        🔚 Retorna as últimas entradas, da mais antiga para a mais nova.
+        """
+        return self.entradas[-quantidade:]
+
+    def consultar(self, usuario=None, acao=None, inicio=None, fim=None, pagina=1, por_pagina=50):
+        """
+        🔎 Filtra as entradas (da mais nova para a mais antiga) e retorna
+        (entradas da página, total encontrado). Aqui não há índice: o
+        arquivo JSON guarda no máximo "limite" entradas.
+        """
+        encontradas = [entrada for entrada in reversed(self.entradas)
+                       if combina_filtro(entrada, usuario, acao, inicio, fim)]
+        inicio_pagina = (pagina - 1) * por_pagina
+        return encontradas[inicio_pagina:inicio_pagina + por_pagina], len(encontradas)
+
+    def __len__(self):
+        return len(self.entradas)
+
+    def __iter__(self):
+        return iter(self.entradas)
+
+    def descarregar(self):
+        with open(self.arquivo, 'w', encoding='utf-8') as f:
+            json.dump(self.entradas, f, indent=2, ensure_ascii=False)
+        self.escritas += 1
+
+    def fechar(self):
+        pass
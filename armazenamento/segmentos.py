@@ -0,0 +1,440 @@
+from array import array
+import gzip
+import json
+import os
+import threading
+import time
+
+from armazenamento.repositorio import combina_filtro
+from armazenamento.unidade_trabalho import adiar_escrita
+
+# Tamanho do bloco lido de cada vez ao percorrer um segmento de trás para frente
+_BLOCO_LEITURA = 64 * 1024
+
+
+class IndiceSegmento:
+    """
+    🗂️ ÍNDICES SECUNDÁRIOS DE UM SEGMENTO
+
+    Para cada valor de "usuario", "acao" e "hora" (o timestamp cortado
+    na hora, ex: "2025-09-25T18"), guarda os números das linhas do
+    segmento que têm aquele valor. Assim uma consulta sabe quais linhas
+    servem (e quantas são) sem ler o segmento.
+
+    Os números ficam em array('I') (4 bytes cada) para ocupar pouca memória.
+    """
+
+    CAMPOS = ("usuario", "acao", "hora")
+
+    def __init__(self):
+        self.linhas = 0        # Quantas linhas o segmento tem
+        self.invalidas = []    # Linhas que não são JSON válido
+        self.valores = {campo: {} for campo in self.CAMPOS}
+
+    def adicionar(self, entrada):
+        numero = self.linhas
+        self.linhas += 1
+        if entrada is None:
+            self.invalidas.append(numero)
+            return
+        chaves = {
+            "usuario": entrada.get("usuario"),
+            "acao": entrada.get("acao"),
+            "hora": str(entrada.get("timestamp") or "")[:13] or None,
+        }
+        for campo, valor in chaves.items():
+            if valor is not None:
+                self.valores[campo].setdefault(str(valor), array('I')).append(numero)
+
+    def para_json(self):
+        return {
+            "linhas": self.linhas,
+            "invalidas": self.invalidas,
+            "valores": {campo: {valor: linhas.tolist() for valor, linhas in valores.items()}
+                        for campo, valores in self.valores.items()},
+        }
+
+    @classmethod
+    def de_json(cls, dados):
+        indice = cls()
+        indice.linhas = dados["linhas"]
+        indice.invalidas = dados["invalidas"]
+        for campo, valores in dados["valores"].items():
+            indice.valores[campo] = {valor: array('I', linhas) for valor, linhas in valores.items()}
+        return indice
+
+    def candidatas(self, usuario=None, acao=None, inicio=None, fim=None):
+        """
+        🔎 Retorna (certas, incertas): as linhas que com certeza passam
+        pelos filtros e as que caem numa hora só em parte dentro do
+        período (essas precisam ter o timestamp conferido).
+        """
+        conjuntos = []
+        if usuario is not None:
+            conjuntos.append(set(self.valores["usuario"].get(usuario, ())))
+        if acao is not None:
+            conjuntos.append(set(self.valores["acao"].get(acao, ())))
+
+        incertas = set()
+        if inicio is not None or fim is not None:
+            certas_periodo = set()
+            for hora, linhas in self.valores["hora"].items():
+                if (inicio is not None and hora < inicio[:13]) or (fim is not None and hora > fim[:13]):
+                    continue  # Hora inteira fora do período
+                if hora == (inicio or "")[:13] or hora == (fim or "")[:13]:
+                    incertas.update(linhas)  # Hora na borda do período
+                else:
+                    certas_periodo.update(linhas)
+            conjuntos.append(certas_periodo | incertas)
+
+        if conjuntos:
+            certas = set.intersection(*conjuntos)
+        else:
+            certas = set(range(self.linhas)) - set(self.invalidas)
+        incertas &= certas
+        return certas - incertas, incertas
+
+
+class LogSegmentado:
+    """
+    📚 LOG SEGMENTADO (JSON LINES)
+
+    Guarda entradas de log (ex: auditoria) numa pasta, dividida em
+    arquivos menores chamados segmentos, com uma entrada JSON por linha.
+
+    - Gravar só anexa linhas no fim do segmento aberto (nada é reescrito)
+    - O segmento é fechado quando passa do tamanho máximo ou fica aberto
+      por tempo demais, e um novo é iniciado
+    - Segmentos fechados podem ser comprimidos com gzip
+    - Segmentos fechados mais antigos que a retenção são apagados
+
+    Estrutura em disco (ex: data/auditoria/):
+    - seg_000001_<início>.jsonl.gz, seg_000002_<início>.jsonl.gz, ...: fechados
+    - seg_000003_<início>.jsonl: o segmento aberto (sempre o de maior número)
+    - seg_000001_<início>.idx, ...: índices de cada segmento fechado
+
+    <início> é o horário (epoch) em que o segmento foi aberto.
+
+    O índice do segmento aberto fica em memória e é gravado quando o
+    segmento é fechado. consultar() usa os índices para filtrar por
+    usuário, ação e período e paginar sem ler os segmentos que não têm
+    entradas da página pedida.
+
+    Limitação: só um processo pode usar a pasta. Dois processos têm
+    cada um o seu índice em memória e a sua ideia de qual é o segmento
+    aberto, e a rotação de um não é vista pelo outro (os dois podem
+    fechar e recriar segmentos com o mesmo número). Com o armazenamento
+    "compartilhado", use SOLABANK_ARMAZENAMENTO_LOGS=sqlite.
+    """
+
+    def __init__(self, diretorio, tamanho_maximo=1024 * 1024, duracao_maxima=86400,
+                 comprimir=True, retencao_dias=0, arquivo_json=None):
+        self.diretorio = diretorio
+        self.tamanho_maximo = tamanho_maximo
+        self.duracao_maxima = duracao_maxima
+        self.comprimir = comprimir
+        self.retencao_dias = retencao_dias  # 0 = guarda tudo
+        self.escritas = 0
+        self._pendentes = []
+        self._indices = {}  # número do segmento -> IndiceSegmento (lidos sob demanda)
+        self._trava = threading.RLock()
+
+        novo = not os.path.isdir(diretorio)
+        os.makedirs(diretorio, exist_ok=True)
+        self._abrir_segmento_atual()
+        if novo:
+            self._importar_json(arquivo_json)
+
+    def _importar_json(self, arquivo_json):
+        """
+        📥 Na primeira vez, copia as entradas do arquivo JSON antigo.
+        """
+        if not arquivo_json or not os.path.exists(arquivo_json):
+            return
+        try:
+            with open(arquivo_json, 'r', encoding='utf-8') as f:
+                entradas = json.load(f)
+        except:
+            return
+        self._pendentes.extend(entradas)
+        self.descarregar()
+
+    # ------------------------------------------------------------------
+    # Segmentos
+    # ------------------------------------------------------------------
+
+    def _segmentos(self):
+        """
+        Lista os segmentos do mais antigo para o mais novo:
+        (número, início, caminho).
+        """
+        segmentos = []
+        for nome in os.listdir(self.diretorio):
+            if not nome.startswith("seg_") or not (nome.endswith(".jsonl") or nome.endswith(".jsonl.gz")):
+                continue
+            numero, inicio = nome.split(".")[0][4:].split("_")
+            segmentos.append((int(numero), int(inicio), os.path.join(self.diretorio, nome)))
+        segmentos.sort()
+        return segmentos
+
+    def _abrir_segmento_atual(self):
+        segmentos = self._segmentos()
+        if segmentos and segmentos[-1][2].endswith(".jsonl"):
+            self.numero, self.inicio, self.arquivo_atual = segmentos[-1]
+            with open(self.arquivo_atual, 'rb+') as f:
+                # Fecha a última linha se o programa caiu no meio da escrita
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+            self._indices[self.numero] = self._indexar(self.arquivo_atual)
+        else:
+            self._novo_segmento(segmentos[-1][0] + 1 if segmentos else 1)
+
+    def _novo_segmento(self, numero):
+        self.numero = numero
+        self.inicio = int(time.time())
+        self.arquivo_atual = os.path.join(self.diretorio, f"seg_{numero:06d}_{self.inicio}.jsonl")
+        open(self.arquivo_atual, 'a').close()
+        self._indices[numero] = IndiceSegmento()
+
+    @staticmethod
+    def _arquivo_indice(caminho):
+        return caminho.split(".jsonl")[0] + ".idx"
+
+    def _indexar(self, caminho):
+        """
+        🗂️ Monta o índice de um segmento lendo todas as linhas dele.
+        """
+        indice = IndiceSegmento()
+        for linha in self._ler_linhas(caminho):
+            try:
+                indice.adicionar(json.loads(linha))
+            except ValueError:
+                indice.adicionar(None)
+        return indice
+
+    def _indice(self, numero, caminho):
+        """
+        🗂️ Retorna o índice de um segmento: da memória, do arquivo .idx
+        ou, para segmentos antigos sem índice, lendo o segmento (e
+        gravando o .idx para a próxima vez).
+        """
+        if numero not in self._indices:
+            arquivo_indice = self._arquivo_indice(caminho)
+            if os.path.exists(arquivo_indice):
+                with open(arquivo_indice, 'r', encoding='utf-8') as f:
+                    self._indices[numero] = IndiceSegmento.de_json(json.load(f))
+            else:
+                self._indices[numero] = self._indexar(caminho)
+                self._gravar_indice(numero, caminho)
+        return self._indices[numero]
+
+    def _gravar_indice(self, numero, caminho):
+        arquivo_indice = self._arquivo_indice(caminho)
+        with open(arquivo_indice + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(self._indices[numero].para_json(), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(arquivo_indice + ".tmp", arquivo_indice)
+
+    def _precisa_rotacionar(self):
+        if os.path.getsize(self.arquivo_atual) >= self.tamanho_maximo:
+            return True
+        return self.duracao_maxima and time.time() - self.inicio >= self.duracao_maxima
+
+    def rotacionar(self):
+        """
+        🔄 Fecha o segmento aberto (comprimindo, se configurado),
+        abre um novo e aplica a retenção.
+        """
+        with self._trava:
+            if os.path.getsize(self.arquivo_atual) == 0:
+                return  # Não vale fechar um segmento vazio
+            fechado = self.arquivo_atual
+            self._gravar_indice(self.numero, fechado)
+            self._novo_segmento(self.numero + 1)
+            if self.comprimir:
+                with open(fechado, 'rb') as origem, gzip.open(fechado + ".gz.tmp", 'wb') as destino:
+                    destino.write(origem.read())
+                os.replace(fechado + ".gz.tmp", fechado + ".gz")
+                os.remove(fechado)
+            self._aplicar_retencao()
+
+    def _aplicar_retencao(self):
+        """
+        🗑️ Apaga os segmentos fechados cuja última gravação é mais
+        antiga que a retenção (o segmento aberto nunca é apagado).
+        """
+        if not self.retencao_dias:
+            return
+        limite = time.time() - self.retencao_dias * 86400
+        for numero, _, caminho in self._segmentos():
+            if caminho != self.arquivo_atual and os.path.getmtime(caminho) < limite:
+                os.remove(caminho)
+                self._indices.pop(numero, None)
+                if os.path.exists(self._arquivo_indice(caminho)):
+                    os.remove(self._arquivo_indice(caminho))
+
+    # ------------------------------------------------------------------
+    # Escrita
+    # ------------------------------------------------------------------
+
+    def anexar(self, entrada):
+        """
+        📎 Adiciona uma entrada no final do log e grava.
+        """
+        with self._trava:
+            self._pendentes.append(entrada)
+        if adiar_escrita(self, self.descarregar):
+            return
+        self.descarregar()
+
+    def descarregar(self):
+        """
+        💾 Anexa as entradas pendentes no segmento aberto, numa escrita só.
+        """
+        with self._trava:
+            if not self._pendentes:
+                return
+            linhas = "".join(json.dumps(entrada, ensure_ascii=False) + "\n" for entrada in self._pendentes)
+            indice = self._indices[self.numero]
+            for entrada in self._pendentes:
+                indice.adicionar(entrada)
+            self._pendentes = []
+            with open(self.arquivo_atual, 'a', encoding='utf-8') as f:
+                f.write(linhas)
+            self.escritas += 1
+            if self._precisa_rotacionar():
+                self.rotacionar()
+
+    # ------------------------------------------------------------------
+    # Leitura
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _abrir(caminho):
+        if caminho.endswith(".gz"):
+            return gzip.open(caminho, 'rb')
+        return open(caminho, 'rb')
+
+    @classmethod
+    def _ler_linhas(cls, caminho):
+        with cls._abrir(caminho) as f:
+            return f.read().splitlines()
+
+    @staticmethod
+    def _linhas_de_tras_para_frente(caminho):
+        """
+        Percorre as linhas de um segmento da última para a primeira.
+        Segmentos sem compressão são lidos em blocos a partir do fim;
+        os comprimidos precisam ser descomprimidos inteiros.
+        """
+        if caminho.endswith(".gz"):
+            with gzip.open(caminho, 'rb') as f:
+                yield from reversed(f.read().splitlines())
+            return
+
+        with open(caminho, 'rb') as f:
+            posicao = f.seek(0, os.SEEK_END)
+            resto = b""
+            while posicao > 0:
+                tamanho = min(_BLOCO_LEITURA, posicao)
+                posicao -= tamanho
+                f.seek(posicao)
+                linhas = (f.read(tamanho) + resto).split(b"\n")
+                resto = linhas.pop(0)  # Pode ser o fim de uma linha do bloco anterior
+                for linha in reversed(linhas):
+                    if linha:
+                        yield linha
+            if resto:
+                yield resto
+
+    def _de_tras_para_frente(self):
+        """
+        🔙 Percorre as entradas da mais nova para a mais antiga,
+        começando pelo segmento mais novo.
+        """
+        self.descarregar()
+        for _, _, caminho in reversed(self._segmentos()):
+            for linha in self._linhas_de_tras_para_frente(caminho):
+                try:
+                    yield json.loads(linha)
+                except ValueError:
+                    continue  # Linha incompleta: o programa caiu no meio da escrita
+
+    def ultimos(self, quantidade):
+        """
+        🔚 Retorna as últimas entradas, da mais antiga para a mais nova,
+        lendo só os segmentos mais novos.
+        """
+        entradas = []
+        if quantidade <= 0:
+            return entradas
+        for entrada in self._de_tras_para_frente():
+            entradas.append(entrada)
+            if len(entradas) >= quantidade:
+                break
+        entradas.reverse()
+        return entradas
+
+    def consultar(self, usuario=None, acao=None, inicio=None, fim=None, pagina=1, por_pagina=50):
+        """
+        🔎 CONSULTAR
+
+        Filtra as entradas por usuário, ação e período (textos ISO, os
+        dois limites entram) e retorna (entradas da página, total
+        encontrado), da mais nova para a mais antiga.
+
+        Os totais vêm dos índices; só são lidos os segmentos com entradas
+        da página pedida ou com entradas na borda do período (que
+        precisam ter o horário conferido).
+        """
+        self.descarregar()
+        pular = (pagina - 1) * por_pagina
+        pagina_entradas = []
+        total = 0
+
+        with self._trava:
+            for numero, _, caminho in reversed(self._segmentos()):
+                certas, incertas = self._indice(numero, caminho).candidatas(usuario, acao, inicio, fim)
+                if not certas and not incertas:
+                    continue
+
+                linhas = None
+                if incertas:
+                    linhas = self._ler_linhas(caminho)
+                    for n in incertas:
+                        if combina_filtro(json.loads(linhas[n]), inicio=inicio, fim=fim):
+                            certas.add(n)
+
+                encontradas = sorted(certas, reverse=True)
+                faltando = por_pagina - len(pagina_entradas)
+                if faltando > 0 and pular < len(encontradas):
+                    if linhas is None:
+                        linhas = self._ler_linhas(caminho)
+                    for n in encontradas[pular:pular + faltando]:
+                        pagina_entradas.append(json.loads(linhas[n]))
+                pular = max(0, pular - len(encontradas))
+                total += len(encontradas)
+
+        return pagina_entradas, total
+
+    def __iter__(self):
+        self.descarregar()
+        for _, _, caminho in self._segmentos():
+            with self._abrir(caminho) as f:
+                for linha in f:
+                    try:
+                        yield json.loads(linha)
+                    except ValueError:
+                        continue
+
+    def __len__(self):
+        self.descarregar()
+        total = 0
+        for _, _, caminho in self._segmentos():
+            with self._abrir(caminho) as f:
+                total += sum(1 for _ in f)
+        return total
+
+    def fechar(self):
+        self.descarregar()
@@ -0,0 +1,198 @@
+import json
+import os
+import threading
+import zlib
+
+from armazenamento.repositorio import Repositorio
+
+
+class RepositorioShards(Repositorio):
+    """
+    🧩 REPOSITÓRIO EM SHARDS
+
+    Em vez de um arquivo único, os registros são espalhados em N arquivos
+    menores ("shards"). O shard de cada registro é escolhido pelo hash da
+    chave, então alterar um usuário só regrava o shard dele.
+
+    Estrutura em disco (ex: data/usuarios/):
+    - manifesto.json: quantos shards existem e quantos registros há em cada
+    - shard_000.json, shard_001.json, ...: os registros de cada shard
+
+    Os shards só são lidos quando alguém precisa de um registro deles.
+    """
+
+    def __init__(self, diretorio, num_shards=16, arquivo_json=None):
+        super().__init__()
+        self.diretorio = diretorio
+        self.arquivo_manifesto = os.path.join(diretorio, "manifesto.json")
+        self.escritas = 0           # Quantos arquivos de shard foram regravados
+        self._shards = {}           # Shards já lidos: número -> dicionário
+        self._sujos = set()         # Shards alterados ainda não gravados
+        self._trava = threading.RLock()  # Várias sessões (threads) podem ler e gravar ao mesmo tempo
+
+        os.makedirs(diretorio, exist_ok=True)
+        novo = not os.path.exists(self.arquivo_manifesto)
+        if novo:
+            self.manifesto = {"shards": num_shards, "contagens": [0] * num_shards}
+        else:
+            with open(self.arquivo_manifesto, 'r', encoding='utf-8') as f:
+                self.manifesto = json.load(f)
+
+        # O número de shards vem do manifesto: mudar a configuração não embaralha os dados
+        self.num_shards = self.manifesto["shards"]
+
+        if novo:
+            self._importar_json(arquivo_json)
+            self._gravar_manifesto()
+
+    def _importar_json(self, arquivo_json):
+        """
+        📥 Na primeira vez, distribui o arquivo JSON antigo entre os shards.
+        """
+        if not arquivo_json or not os.path.exists(arquivo_json):
+            return
+        try:
+            with open(arquivo_json, 'r', encoding='utf-8') as f:
+                registros = json.load(f)
+        except:
+            return
+
+        for chave, registro in registros.items():
+            self._shard(self._numero(chave))[chave] = registro
+            self._sujos.add(self._numero(chave))
+        self.descarregar()
+
+    # ------------------------------------------------------------------
+    # Localização dos shards
+    # ------------------------------------------------------------------
+
+    def _numero(self, chave):
+        # crc32 dá o mesmo resultado em qualquer execução (o hash() do Python não)
+        return zlib.crc32(chave.encode('utf-8')) % self.num_shards
+
+    def _arquivo_shard(self, numero):
+        return os.path.join(self.diretorio, f"shard_{numero:03d}.json")
+
+    def _ler_shard(self, numero):
+        arquivo = self._arquivo_shard(numero)
+        if os.path.exists(arquivo):
+            with open(arquivo, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _shard(self, numero):
+        """
+        📂 Retorna o shard, lendo do disco na primeira vez.
+        """
+        with self._trava:
+            if numero not in self._shards:
+                self._shards[numero] = self._ler_shard(numero)
+            return self._shards[numero]
+
+    # ------------------------------------------------------------------
+    # Interface de dicionário
+    # ------------------------------------------------------------------
+
+    def _obter(self, chave):
+        return self._shard(self._numero(chave))[chave]
+
+    def __setitem__(self, chave, registro):
+        numero = self._numero(chave)
+        with self._trava:
+            self._shard(numero)[chave] = registro
+            self._sujos.add(numero)
+
+    def __delitem__(self, chave):
+        numero = self._numero(chave)
+        with self._trava:
+            del self._shard(numero)[chave]
+            self._sujos.add(numero)
+
+    def __contains__(self, chave):
+        return chave in self._shard(self._numero(chave))
+
+    def __len__(self):
+        return sum(self.manifesto["contagens"])
+
+    def __iter__(self):
+        for _, chaves in self._percorrer():
+            yield from chaves
+
+    def items(self):
+        """
+        🔁 Percorre os registros shard por shard, sem carregar todos na memória.
+
+        Shards que ainda não estavam em memória são lidos só para a
+        iteração e descartados em seguida: para alterar um registro,
+        use repositorio[chave] antes de salvar.
+        """
+        for _, shard in self._percorrer():
+            yield from shard.items()
+
+    def values(self):
+        for _, shard in self._percorrer():
+            yield from shard.values()
+
+    def _percorrer(self):
+        for numero in range(self.num_shards):
+            with self._trava:
+                # Cópia rasa: outra thread pode incluir registros durante a iteração
+                shard = dict(self._shards[numero]) if numero in self._shards else None
+            if shard is not None:
+                yield numero, shard
+            elif self.manifesto["contagens"][numero]:
+                yield numero, self._ler_shard(numero)
+
+    # ------------------------------------------------------------------
+    # Gravação
+    # ------------------------------------------------------------------
+
+    def _marcar(self, chave, campos):
+        with self._trava:
+            if chave is None:
+                self._sujos.update(self._shards)
+            else:
+                self._sujos.add(self._numero(chave))
+
+    def descarregar(self):
+        """
+        💾 Regrava só os shards alterados (e o manifesto, se mudou).
+        """
+        with self._trava:
+            if not self._sujos:
+                return
+
+            contagens = self.manifesto["contagens"]
+            manifesto_mudou = False
+
+            for numero in sorted(self._sujos):
+                shard = self._shards[numero]
+                self._gravar_arquivo(self._arquivo_shard(numero), shard)
+                self.escritas += 1
+                if contagens[numero] != len(shard):
+                    contagens[numero] = len(shard)
+                    manifesto_mudou = True
+
+            self._sujos.clear()
+            if manifesto_mudou:
+                self._gravar_manifesto()
+
+    def _gravar_manifesto(self):
+        self._gravar_arquivo(self.arquivo_manifesto, self.manifesto)
+
+    @staticmethod
+    def _gravar_arquivo(arquivo, dados):
+        texto = RepositorioShards._serializar(dados)
+        temporario = arquivo + ".tmp"
+        with open(temporario, 'w', encoding='utf-8') as f:
+            f.write(texto)
+        os.replace(temporario, arquivo)  # Troca atômica
+
+    @staticmethod
+    def _serializar(dados):
+        # Vira texto antes de abrir o arquivo, como no RepositorioJSON
+        while True:
+            try:
+                return json.dumps(dados, indent=2, ensure_ascii=False)
+            except RuntimeError:
+                continue  # Outra thread incluiu um campo num registro no meio: tenta de novo
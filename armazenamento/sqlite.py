@@ -0,0 +1,482 @@
+"""
+🗃️ ARMAZENAMENTO EM SQLITE
+
+Guarda cada registro numa linha de uma tabela SQLite (biblioteca padrão
+do Python). Em vez de regravar um arquivo inteiro, só as linhas alteradas
+são atualizadas, dentro de uma transação de verdade.
+
+Todos os repositórios e logs que apontam para o mesmo banco compartilham
+o mesmo BancoSQLite: uma conexão, aberta em modo WAL (leituras não
+bloqueiam escritas), e uma trava de gravação. As alterações ficam em
+memória, separadas por thread, até a gravação: cada transação de fora
+(transacao()) grava tudo o que a sua thread alterou, em todas as tabelas,
+num único BEGIN ... COMMIT. Assim o commit de uma sessão nunca leva junto
+a transferência pela metade de outra.
+"""
+
+from contextlib import contextmanager
+import json
+import os
+import sqlite3
+import threading
+
+from armazenamento.repositorio import Repositorio
+from armazenamento.unidade_trabalho import adiar_escrita
+
+_bancos = {}
+_trava_bancos = threading.Lock()
+
+# gravar(TODAS): as pendências de todas as threads
+TODAS = "todas"
+
+
+def conectar(arquivo, compartilhada=True):
+    """
+    🔌 Abre (ou reaproveita) o banco SQLite.
+
+    Com compartilhada=False abre uma conexão (e trava de gravação) só
+    para quem pediu (ex: um log gravado por outra thread, para não
+    disputar a trava de gravação dos managers).
+    """
+    with _trava_bancos:
+        if not compartilhada:
+            return BancoSQLite(arquivo)
+        if arquivo not in _bancos:
+            _bancos[arquivo] = BancoSQLite(arquivo)
+        return _bancos[arquivo]
+
+
+class BancoSQLite:
+    """
+    🗄️ BANCO SQLITE
+
+    A conexão com um arquivo de banco e quem grava nele (repositórios e
+    logs, os "donos"). A conexão fica em modo autocommit: as transações
+    são abertas à mão, sempre com a trava de gravação, do BEGIN ao COMMIT.
+
+    Cada dono guarda as suas alterações pendentes por thread e sabe
+    gravá-las: gravar() junta as pendências da thread atual de todos os
+    donos numa transação só.
+    """
+
+    def __init__(self, arquivo):
+        self.conexao = sqlite3.connect(arquivo, check_same_thread=False, isolation_level=None)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        self.trava = threading.RLock()  # Uma gravação por vez, do BEGIN ao COMMIT
+        self._donos = []
+
+    def registrar(self, dono):
+        with self.trava:
+            self._donos.append(dono)
+
+    @contextmanager
+    def escrever(self):
+        """
+        ✍️ Transação explícita: BEGIN IMMEDIATE no começo, COMMIT no fim
+        (ou ROLLBACK, se der erro), com a trava de gravação o tempo todo.
+        """
+        with self.trava:
+            self.conexao.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conexao
+            except BaseException:
+                self.conexao.execute("ROLLBACK")
+                raise
+            self.conexao.execute("COMMIT")
+
+    def gravar(self, thread=None):
+        """
+        ✅ Grava numa transação as pendências da thread (padrão: a atual;
+        com thread=TODAS, as de todas as threads, ex: ao fechar).
+        """
+        if thread is None:
+            thread = threading.get_ident()
+        with self.trava:
+            donos = [dono for dono in self._donos if dono._tem_pendentes(thread)]
+            if not donos:
+                return
+            # As travas dos donos ficam presas até o COMMIT: ninguém altera
+            # o que está sendo gravado no meio da transação
+            for dono in donos:
+                dono._trava.acquire()
+            try:
+                with self.escrever() as conexao:
+                    gravados = [dono._gravar_pendentes(conexao, thread) for dono in donos]
+                for dono, gravado in zip(donos, gravados):
+                    dono._confirmar(thread, gravado)
+                    dono.escritas += 1
+            finally:
+                for dono in reversed(donos):
+                    dono._trava.release()
+
+
+class RepositorioSQLite(Repositorio):
+    """
+    🗃️ REPOSITÓRIO EM SQLITE
+
+    Cada tabela tem três colunas: a chave (chave primária), o dono do
+    registro (com índice, para achar os registros de um usuário sem
+    percorrer tudo) e o registro em JSON.
+
+    Os registros lidos pela chave ficam guardados em memória, então
+    alterar o dicionário retornado e depois chamar salvar(chave) funciona
+    igual ao repositório JSON. Consultas que percorrem a tabela inteira
+    (items, values) não guardam nada.
+
+    Registros criados ou apagados em memória e ainda não gravados já
+    aparecem (ou somem) nas consultas, como nos outros backends.
+    """
+
+    def __init__(self, arquivo, tabela, arquivo_json=None):
+        super().__init__()
+        self.banco = conectar(arquivo)
+        self.conexao = self.banco.conexao
+        self.tabela = tabela
+        self.escritas = 0               # Quantos commits foram feitos
+        self._cache = {}                # Registros já lidos: chave -> dicionário
+        self._sujos = {}                # thread -> chaves alteradas ainda não gravadas
+        self._novos = set()             # Chaves criadas em memória que ainda não estão na tabela
+        self._apagados = set()          # Chaves apagadas em memória que ainda estão na tabela
+        self._trava = threading.RLock()
+
+        with self.banco.escrever() as conexao:
+            conexao.execute(
+                f"CREATE TABLE IF NOT EXISTS {tabela} ("
+                "chave TEXT PRIMARY KEY, usuario TEXT, dados TEXT NOT NULL)"
+            )
+            conexao.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{tabela}_usuario ON {tabela}(usuario)"
+            )
+        self.banco.registrar(self)
+
+        # Na primeira vez, importa os dados que estavam no arquivo JSON
+        if arquivo_json and len(self) == 0:
+            self._importar_json(arquivo_json)
+
+    def _importar_json(self, arquivo_json):
+        if not os.path.exists(arquivo_json):
+            return
+        try:
+            with open(arquivo_json, 'r', encoding='utf-8') as f:
+                registros = json.load(f)
+        except:
+            return
+
+        with self.banco.escrever() as conexao:
+            conexao.executemany(
+                f"INSERT OR REPLACE INTO {self.tabela} (chave, usuario, dados) VALUES (?, ?, ?)",
+                [self._linha(chave, registro) for chave, registro in registros.items()]
+            )
+
+    @staticmethod
+    def _linha(chave, registro):
+        # Registros de usuário não têm o campo "usuario": o dono é a própria chave
+        return (chave, registro.get("usuario", chave), json.dumps(registro, ensure_ascii=False))
+
+    def _na_tabela(self, chave):
+        return self.conexao.execute(
+            f"SELECT 1 FROM {self.tabela} WHERE chave = ?", (chave,)
+        ).fetchone() is not None
+
+    def _sujos_da_thread(self):
+        return self._sujos.setdefault(threading.get_ident(), set())
+
+    # ------------------------------------------------------------------
+    # Interface de dicionário
+    # ------------------------------------------------------------------
+
+    def _obter(self, chave):
+        with self._trava:
+            if chave in self._apagados:
+                raise KeyError(chave)
+            if chave in self._cache:
+                return self._cache[chave]
+            linha = self.conexao.execute(
+                f"SELECT dados FROM {self.tabela} WHERE chave = ?", (chave,)
+            ).fetchone()
+            if linha is None:
+                raise KeyError(chave)
+            registro = json.loads(linha[0])
+            self._cache[chave] = registro
+            return registro
+
+    def __setitem__(self, chave, registro):
+        with self._trava:
+            if chave in self._apagados:
+                self._apagados.discard(chave)  # A linha antiga ainda está na tabela
+            elif chave not in self._cache and not self._na_tabela(chave):
+                self._novos.add(chave)
+            self._cache[chave] = registro
+            self._sujos_da_thread().add(chave)  # Gravado junto com o próximo salvar()
+
+    def __delitem__(self, chave):
+        with self._trava:
+            if chave not in self:
+                raise KeyError(chave)
+            self._cache.pop(chave, None)
+            if chave in self._novos:
+                self._novos.discard(chave)  # Nunca chegou à tabela
+            else:
+                self._apagados.add(chave)
+            self._sujos_da_thread().add(chave)
+
+    def __contains__(self, chave):
+        with self._trava:
+            if chave in self._apagados:
+                return False
+            if chave in self._cache:
+                return True
+            return self._na_tabela(chave)
+
+    def __iter__(self):
+        with self._trava:
+            chaves = [linha[0] for linha in self.conexao.execute(f"SELECT chave FROM {self.tabela}")
+                      if linha[0] not in self._apagados]
+            chaves.extend(self._novos)
+        return iter(chaves)
+
+    def __len__(self):
+        with self._trava:
+            total = self.conexao.execute(f"SELECT COUNT(*) FROM {self.tabela}").fetchone()[0]
+            return total - len(self._apagados) + len(self._novos)
+
+    def items(self):
+        """
+        🔁 Todos os registros. Quem já está em memória é usado direto; os
+        outros são lidos da tabela sem ficar guardados, para uma consulta
+        que percorre tudo (ex: relatórios) não carregar a tabela inteira
+        na memória.
+        """
+        with self._trava:
+            linhas = self.conexao.execute(f"SELECT chave, dados FROM {self.tabela}").fetchall()
+            resultado = [(chave, self._cache.get(chave) or json.loads(dados))
+                         for chave, dados in linhas if chave not in self._apagados]
+            resultado.extend((chave, self._cache[chave]) for chave in self._novos)
+        return resultado
+
+    def values(self):
+        return [registro for _, registro in self.items()]
+
+    def chaves_do_usuario(self, usuario):
+        """
+        🔎 Usa o índice da coluna "usuario" em vez de percorrer a tabela
+        (ou o índice em memória, se o manager criou um).
+        """
+        if "usuario" in self._indices:
+            return super().chaves_do_usuario(usuario)
+        with self._trava:
+            chaves = [linha[0] for linha in self.conexao.execute(
+                f"SELECT chave FROM {self.tabela} WHERE usuario = ?", (usuario,)
+            ) if linha[0] not in self._apagados]
+            chaves.extend(chave for chave in self._novos
+                          if self._cache[chave].get("usuario", chave) == usuario)
+        return chaves
+
+    # ------------------------------------------------------------------
+    # Gravação
+    # ------------------------------------------------------------------
+
+    def _marcar(self, chave, campos):
+        with self._trava:
+            if chave is None:
+                self._sujos_da_thread().update(self._cache)
+            else:
+                self._sujos_da_thread().add(chave)
+
+    def _tem_pendentes(self, thread):
+        with self._trava:
+            if thread == TODAS:
+                return any(self._sujos.values())
+            return bool(self._sujos.get(thread))
+
+    def _gravar_pendentes(self, conexao, thread):
+        """
+        Grava (na transação aberta pelo banco) as chaves pendentes da
+        thread, com o conteúdo que elas têm agora em memória.
+        """
+        if thread == TODAS:
+            chaves = set().union(*self._sujos.values())
+        else:
+            chaves = set(self._sujos.get(thread, ()))
+        for chave in chaves:
+            if chave in self._apagados:
+                conexao.execute(f"DELETE FROM {self.tabela} WHERE chave = ?", (chave,))
+            elif chave in self._cache:
+                conexao.execute(
+                    f"INSERT OR REPLACE INTO {self.tabela} (chave, usuario, dados) VALUES (?, ?, ?)",
+                    self._linha(chave, self._cache[chave])
+                )
+        return chaves
+
+    def _confirmar(self, thread, chaves):
+        # Depois do COMMIT: o que foi gravado deixa de ser pendente
+        self._apagados -= chaves
+        self._novos -= chaves
+        if thread == TODAS:
+            self._sujos.clear()
+        else:
+            self._sujos.pop(thread, None)
+
+    def descarregar(self):
+        """
+        ✅ Grava as linhas alteradas por esta thread (e as dos logs no
+        mesmo banco) numa transação só.
+        """
+        self.banco.gravar()
+
+    def fechar(self):
+        self.banco.gravar(TODAS)
+
+
+class LogSQLite:
+    """
+    📜 LOG EM SQLITE
+
+    Guarda entradas de log (ex: auditoria) numa tabela com índices por
+    usuário, ação e horário. Diferente do log em JSON, nada é descartado.
+
+    As entradas anexadas ficam pendentes (por thread) até a gravação,
+    que acontece na mesma transação das alterações dos repositórios.
+    """
+
+    def __init__(self, arquivo, tabela, arquivo_json=None, conexao_propria=False):
+        self.banco = conectar(arquivo, compartilhada=not conexao_propria)
+        self.conexao = self.banco.conexao
+        self.tabela = tabela
+        self.escritas = 0
+        self._pendentes = {}  # thread -> entradas ainda não gravadas
+        self._trava = threading.RLock()
+
+        with self.banco.escrever() as conexao:
+            conexao.execute(
+                f"CREATE TABLE IF NOT EXISTS {tabela} ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, usuario TEXT, dados TEXT NOT NULL, "
+                "acao TEXT, timestamp TEXT)"
+            )
+            self._criar_colunas_de_consulta()
+            for coluna in ("usuario", "acao", "timestamp"):
+                conexao.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{tabela}_{coluna} ON {tabela}({coluna}, id)"
+                )
+        self.banco.registrar(self)
+
+        if arquivo_json and len(self) == 0:
+            self._importar_json(arquivo_json)
+
+    def _criar_colunas_de_consulta(self):
+        """
+        Tabelas criadas antes das consultas não têm as colunas "acao" e
+        "timestamp": cria as colunas e preenche a partir do JSON de cada linha.
+        """
+        colunas = [linha[1] for linha in self.conexao.execute(f"PRAGMA table_info({self.tabela})")]
+        if "acao" in colunas:
+            return
+        self.conexao.execute(f"ALTER TABLE {self.tabela} ADD COLUMN acao TEXT")
+        self.conexao.execute(f"ALTER TABLE {self.tabela} ADD COLUMN timestamp TEXT")
+        linhas = self.conexao.execute(f"SELECT id, dados FROM {self.tabela}").fetchall()
+        atualizacoes = []
+        for id_linha, dados in linhas:
+            entrada = json.loads(dados)
+            atualizacoes.append((entrada.get("acao"), entrada.get("timestamp"), id_linha))
+        self.conexao.executemany(
+            f"UPDATE {self.tabela} SET acao = ?, timestamp = ? WHERE id = ?", atualizacoes
+        )
+
+    def _importar_json(self, arquivo_json):
+        if not os.path.exists(arquivo_json):
+            return
+        try:
+            with open(arquivo_json, 'r', encoding='utf-8') as f:
+                entradas = json.load(f)
+        except:
+            return
+        for entrada in entradas:
+            self._inserir(entrada)
+        self.descarregar()
+
+    def _inserir(self, entrada):
+        with self._trava:
+            self._pendentes.setdefault(threading.get_ident(), []).append(entrada)
+
+    def anexar(self, entrada):
+        """
+        📎 Adiciona uma entrada no final do log e grava.
+        """
+        self._inserir(entrada)
+        if adiar_escrita(self, self.descarregar):
+            return
+        self.descarregar()
+
+    def _tem_pendentes(self, thread):
+        with self._trava:
+            if thread == TODAS:
+                return any(self._pendentes.values())
+            return bool(self._pendentes.get(thread))
+
+    def _gravar_pendentes(self, conexao, thread):
+        if thread == TODAS:
+            entradas = [entrada for lista in self._pendentes.values() for entrada in lista]
+        else:
+            entradas = self._pendentes.get(thread, [])
+        conexao.executemany(
+            f"INSERT INTO {self.tabela} (usuario, dados, acao, timestamp) VALUES (?, ?, ?, ?)",
+            [(entrada.get("usuario"), json.dumps(entrada, ensure_ascii=False),
+              entrada.get("acao"), entrada.get("timestamp")) for entrada in entradas]
+        )
+        return entradas
+
+    def _confirmar(self, thread, entradas):
+        if thread == TODAS:
+            self._pendentes.clear()
+        else:
+            self._pendentes.pop(thread, None)
+
+    def ultimos(self, quantidade):
+        """
+        🔚 Retorna as últimas entradas, da mais antiga para a mais nova.
+        """
+        with self._trava:
+            linhas = self.conexao.execute(
+                f"SELECT dados FROM {self.tabela} ORDER BY id DESC LIMIT ?", (quantidade,)
+            ).fetchall()
+        return [json.loads(linha[0]) for linha in reversed(linhas)]
+
+    def consultar(self, usuario=None, acao=None, inicio=None, fim=None, pagina=1, por_pagina=50):
+        """
+        🔎 Filtra as entradas usando os índices das colunas e retorna
+        (entradas da página, total encontrado), da mais nova para a mais antiga.
+        """
+        condicoes = []
+        parametros = []
+        for condicao, valor in (("usuario = ?", usuario), ("acao = ?", acao),
+                                ("timestamp >= ?", inicio), ("timestamp <= ?", fim)):
+            if valor is not None:
+                condicoes.append(condicao)
+                parametros.append(valor)
+        where = f" WHERE {' AND '.join(condicoes)}" if condicoes else ""
+
+        with self._trava:
+            total = self.conexao.execute(
+                f"SELECT COUNT(*) FROM {self.tabela}{where}", parametros
+            ).fetchone()[0]
+            linhas = self.conexao.execute(
+                f"SELECT dados FROM {self.tabela}{where} ORDER BY id DESC LIMIT ? OFFSET ?",
+                parametros + [por_pagina, (pagina - 1) * por_pagina]
+            ).fetchall()
+        return [json.loads(linha[0]) for linha in linhas], total
+
+    def __len__(self):
+        with self._trava:
+            return self.conexao.execute(f"SELECT COUNT(*) FROM {self.tabela}").fetchone()[0]
+
+    def __iter__(self):
+        with self._trava:
+            linhas = self.conexao.execute(f"SELECT dados FROM {self.tabela} ORDER BY id").fetchall()
+        return (json.loads(linha[0]) for linha in linhas)
+
+    def descarregar(self):
+        self.banco.gravar()
+
+    def fechar(self):
+        self.banco.gravar(TODAS)
@@ -0,0 +1,78 @@
+"""
+🔐 TRAVAS
+
+- TravasPorChave: uma trava de threading por chave (ex: por usuário),
+  para as threads de um processo não mexerem no mesmo registro ao
+  mesmo tempo
+- trava_de_arquivo: as travas de threading só valem dentro de um
+  processo. Quando dois "python main.py" usam a mesma pasta data/, quem
+  coordena as gravações é o sistema operacional, com fcntl.flock:
+  enquanto um processo segura a trava de um arquivo, os outros que
+  pedirem a mesma trava esperam.
+"""
+
+from contextlib import contextmanager
+import threading
+
+try:
+    import fcntl
+except ImportError:  # fcntl só existe em sistemas Unix (Linux, macOS)
+    fcntl = None
+
+# Há travas entre processos neste sistema?
+DISPONIVEL = fcntl is not None
+
+
+class TravasPorChave:
+    """
+    🔐 TRAVAS POR CHAVE
+
+    Uma trava (RLock) para cada chave, criada no primeiro uso:
+
+        with travas.travar(origem, destino):
+            ...
+
+    Não existe trava geral: blocos com chaves diferentes seguem em
+    paralelo. As travas são pegas sempre na mesma ordem (a das chaves
+    ordenadas), então dois blocos com as mesmas chaves em ordens
+    diferentes nunca ficam um esperando o outro para sempre. A mesma
+    thread pode travar de novo uma chave que já travou.
+    """
+
+    def __init__(self):
+        self._travas = {}                       # chave -> trava
+        self._trava_travas = threading.Lock()   # protege a criação das travas
+
+    def _trava(self, chave):
+        with self._trava_travas:
+            trava = self._travas.get(chave)
+            if trava is None:
+                trava = self._travas[chave] = threading.RLock()
+            return trava
+
+    @contextmanager
+    def travar(self, *chaves):
+        travas = [self._trava(chave) for chave in sorted(set(chaves))]
+        for trava in travas:
+            trava.acquire()
+        try:
+            yield
+        finally:
+            for trava in reversed(travas):
+                trava.release()
+
+
+@contextmanager
+def trava_de_arquivo(arquivo):
+    """
+    🔐 Trava o arquivo (aberto, ou o descritor dele) para os outros
+    processos enquanto o bloco roda. Sem fcntl, não trava nada.
+    """
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(arquivo, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(arquivo, fcntl.LOCK_UN)
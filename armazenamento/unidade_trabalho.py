@@ -0,0 +1,100 @@
+"""
+🧾 UNIDADE DE TRABALHO (TRANSAÇÃO)
+
+Uma operação bancária costuma mexer em vários lugares ao mesmo tempo:
+uma transferência altera dois saldos e dois históricos, um empréstimo
+altera o saldo, o empréstimo e a auditoria. Sem controle, cada pedacinho
+regrava o seu arquivo na hora.
+
+Dentro de uma unidade de trabalho, os managers só avisam que têm dados
+pendentes ("se alistam") e a gravação acontece uma única vez por manager,
+no final da operação:
+
+    with transacao() as unidade:
+        usuario_manager.depositar(usuario, 100)
+        auditoria.log_acao(usuario, "DEPOSITO", "Depósito de R$ 100.00")
+    print(unidade.escritas)  # 2 (usuarios.json + auditoria.json)
+
+Transações aninhadas participam da transação de fora, então um método
+pode abrir a sua própria transação e ainda assim ser agrupado pelo menu.
+"""
+
+from contextlib import contextmanager
+import threading
+
+_local = threading.local()
+
+
+class UnidadeDeTrabalho:
+    """
+    📦 Guarda as gravações pendentes de uma operação.
+    """
+
+    def __init__(self):
+        self.pendentes = {}  # dono -> função que grava os dados do dono
+        self.escritas = 0    # Quantas gravações foram feitas no commit
+
+    def alistar(self, dono, gravar):
+        """
+        ✍️ Registra que o dono tem dados a gravar no final da operação.
+        Alistar o mesmo dono várias vezes gera uma única gravação.
+        """
+        self.pendentes[id(dono)] = gravar
+
+    def confirmar(self):
+        """
+        ✅ Grava tudo que ficou pendente, uma vez por dono.
+        """
+        while self.pendentes:
+            pendentes = list(self.pendentes.values())
+            self.pendentes.clear()
+            for gravar in pendentes:
+                gravar()
+                self.escritas += 1
+
+
+def unidade_atual():
+    """
+    🔎 Retorna a unidade de trabalho aberta nesta thread (ou None).
+    """
+    return getattr(_local, "unidade", None)
+
+
+def adiar_escrita(dono, gravar):
+    """
+    ⏳ ADIAR ESCRITA
+
+    Se houver uma transação aberta, alista o dono nela e retorna True
+    (quem chamou não deve gravar agora). Sem transação, retorna False
+    e quem chamou grava imediatamente, como sempre.
+    """
+    unidade = unidade_atual()
+    if unidade is None:
+        return False
+    unidade.alistar(dono, gravar)
+    return True
+
+
+@contextmanager
+def transacao():
+    """
+    🔐 ABRIR TRANSAÇÃO
+
+    Abre uma unidade de trabalho para a thread atual. Se já houver
+    uma aberta, reaproveita a de fora e deixa o commit para ela.
+
+    O commit acontece mesmo se der erro no meio da operação, para que
+    o disco continue igual ao que está em memória.
+    """
+    externa = unidade_atual()
+    if externa is not None:
+        yield externa
+        return
+
+    unidade = UnidadeDeTrabalho()
+    _local.unidade = unidade
+    try:
+        yield unidade
+    finally:
+        _local.unidade = None
+        unidade.confirmar()
@@ -0,0 +1,166 @@
+"""
+🧮 AMORTIZAÇÃO DE EMPRÉSTIMOS
+
+Monta o cronograma de um empréstimo, parcela por parcela, separando
+juros e amortização (quanto da dívida a parcela de fato abate):
+
+- "price" (Tabela Price): parcelas iguais. No começo a parcela é quase
+  toda juros; no fim, quase toda amortização.
+    parcela = valor * i / (1 - (1 + i) ** -n)
+- "sac" (Sistema de Amortização Constante): a amortização é sempre
+  valor / n e os juros caem junto com a dívida, então as parcelas
+  começam maiores e vão diminuindo.
+
+Em qualquer parcela, juros = saldo devedor anterior * i. Todos os
+valores são em centavos, com os juros arredondados para o centavo a cada
+parcela; a última parcela acerta o saldo, que termina exatamente em zero.
+
+Os fatores de 1 a 36 parcelas (o prazo máximo do banco) são calculados
+uma vez por taxa e reaproveitados. cronogramas() monta o cronograma de
+muitos empréstimos de uma vez, vetorizado com NumPy quando ele está
+instalado.
+"""
+
+from functools import lru_cache
+
+from utils.dinheiro import dividir, multiplicar
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele cronogramas() usa Python puro
+    np = None
+
+TAXA_MENSAL = 0.02   # 2% ao mês
+PRAZO_MAXIMO = 36
+SISTEMAS = ("price", "sac")
+
+
+@lru_cache(maxsize=None)
+def tabela_price(taxa=TAXA_MENSAL):
+    """
+    📋 Fator da Tabela Price para cada prazo: parcela = valor * fator[n]
+    (posição 0 sem uso).
+    """
+    return (0.0,) + tuple(taxa / (1 - (1 + taxa) ** -n) if taxa else 1 / n
+                          for n in range(1, PRAZO_MAXIMO + 1))
+
+
+@lru_cache(maxsize=None)
+def tabela_valor_presente(taxa=TAXA_MENSAL):
+    """
+    📋 Valor hoje de uma parcela de R$ 1,00 paga ao fim de cada um dos
+    próximos n meses: soma de (1 + taxa) ** -k para k de 1 a n.
+    """
+    acumulado, tabela = 0.0, [0.0]
+    for k in range(1, PRAZO_MAXIMO + 1):
+        acumulado += (1 + taxa) ** -k
+        tabela.append(acumulado)
+    return tuple(tabela)
+
+
+def _validar(sistema, parcelas):
+    if sistema not in SISTEMAS:
+        raise ValueError(f"Sistema de amortização desconhecido: {sistema}")
+    if not 1 <= parcelas <= PRAZO_MAXIMO:
+        raise ValueError(f"Número de parcelas deve ser entre 1 e {PRAZO_MAXIMO}")
+
+
+def cronograma(valor, parcelas, sistema="price", taxa=TAXA_MENSAL):
+    """
+    📅 Cronograma completo de um empréstimo (valores em centavos): uma
+    linha por parcela com "numero", "parcela", "juros", "amortizacao" e
+    "saldo" (o que ainda se deve depois de pagar aquela parcela).
+    """
+    _validar(sistema, parcelas)
+    linhas = []
+    saldo = valor
+    prestacao = multiplicar(valor, tabela_price(taxa)[parcelas])
+    amortizacoes_sac = dividir(valor, parcelas)
+    for numero in range(1, parcelas + 1):
+        juros = multiplicar(saldo, taxa)
+        if sistema == "price":
+            amortizacao = prestacao - juros
+        else:
+            amortizacao = amortizacoes_sac[numero - 1]
+        if numero == parcelas:
+            amortizacao = saldo  # A última parcela zera o saldo, sem sobra de arredondamento
+        saldo -= amortizacao
+        linhas.append({
+            "numero": numero,
+            "parcela": juros + amortizacao,
+            "juros": juros,
+            "amortizacao": amortizacao,
+            "saldo": saldo,
+        })
+    return linhas
+
+
+def saldo_devedor(valor, parcelas, pagas, sistema="price", taxa=TAXA_MENSAL):
+    """
+    💰 Quanto custa quitar o empréstimo depois de "pagas" parcelas: o
+    saldo devedor do cronograma, sem os juros das parcelas que ainda
+    não venceram.
+    """
+    pagas = min(max(pagas, 0), parcelas)
+    if not pagas:
+        return valor
+    return cronograma(valor, parcelas, sistema, taxa)[pagas - 1]["saldo"]
+
+
+def valor_presente(prestacao, restantes, taxa=TAXA_MENSAL):
+    """
+    💰 Valor hoje de "restantes" parcelas iguais de "prestacao".
+    """
+    return multiplicar(prestacao, tabela_valor_presente(taxa)[min(max(restantes, 0), PRAZO_MAXIMO)])
+
+
+def cronogramas(valores, prazos, sistema="price", taxa=TAXA_MENSAL):
+    """
+    🗃️ Cronogramas de muitos empréstimos de uma vez.
+
+    Devolve um dicionário com "parcela", "juros", "amortizacao" e "saldo",
+    cada um uma matriz de centavos com uma linha por empréstimo e uma
+    coluna por mês (PRAZO_MAXIMO colunas; depois do prazo do empréstimo,
+    tudo zero). Com NumPy as matrizes são arrays de inteiros, calculados
+    mês a mês para todos os empréstimos juntos, com os mesmos
+    arredondamentos de cronograma(); sem NumPy, listas de listas.
+    """
+    if sistema not in SISTEMAS:
+        raise ValueError(f"Sistema de amortização desconhecido: {sistema}")
+
+    if np is None:
+        matrizes = {"parcela": [], "juros": [], "amortizacao": [], "saldo": []}
+        for valor, prazo in zip(valores, prazos):
+            linhas = cronograma(valor, prazo, sistema, taxa)
+            for campo, matriz in matrizes.items():
+                matriz.append([linha[campo] for linha in linhas] + [0] * (PRAZO_MAXIMO - prazo))
+        return matrizes
+
+    valores = np.asarray(valores, dtype=np.int64)
+    prazos = np.asarray(prazos, dtype=np.int64)
+    if prazos.size and (prazos.min() < 1 or prazos.max() > PRAZO_MAXIMO):
+        raise ValueError(f"Número de parcelas deve ser entre 1 e {PRAZO_MAXIMO}")
+
+    prestacao = np.floor(valores * np.array(tabela_price(taxa))[prazos] + 0.5).astype(np.int64)
+    base_sac, sobra_sac = np.divmod(valores, prazos)
+
+    matrizes = {campo: np.zeros((len(valores), PRAZO_MAXIMO), dtype=np.int64)
+                for campo in ("parcela", "juros", "amortizacao", "saldo")}
+    saldo = valores.copy()
+    for mes in range(1, PRAZO_MAXIMO + 1):
+        dentro = mes <= prazos
+        juros = np.where(dentro, np.floor(saldo * taxa + 0.5).astype(np.int64), 0)
+        if sistema == "price":
+            amortizacao = prestacao - juros
+        else:
+            amortizacao = base_sac + (mes <= sobra_sac)
+        amortizacao = np.where(mes == prazos, saldo, amortizacao)
+        amortizacao = np.where(dentro, amortizacao, 0)
+        saldo = saldo - amortizacao
+
+        coluna = mes - 1
+        matrizes["juros"][:, coluna] = juros
+        matrizes["amortizacao"][:, coluna] = amortizacao
+        matrizes["parcela"][:, coluna] = juros + amortizacao
+        matrizes["saldo"][:, coluna] = np.where(dentro, saldo, 0)
+    return matrizes
@@ -0,0 +1,147 @@
+"""
+📈 AVALIAÇÃO DE INVESTIMENTOS
+
+O valor de um investimento é uma função pura de quatro coisas:
+
+    valor_inicial, rendimento_mensal, data_aplicacao e a data de referência
+
+Nada é gravado: o valor é calculado na hora em que alguém precisa dele,
+em centavos, arredondado para o centavo mais próximo.
+Como o rendimento só muda de um dia para o outro (os meses decorridos
+contam dias inteiros), o resultado fica guardado num cache por dia e
+desenhar o menu várias vezes no mesmo dia não refaz a conta.
+"""
+
+from datetime import date, datetime
+from functools import lru_cache
+import math
+
+from utils.dinheiro import arredondar
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: a Carteira usa Python puro sem ele
+    np = None
+
+DIAS_POR_MES = 30  # Aproximação usada em todo o banco
+
+
+def _dia(momento):
+    """
+    Data (sem hora) de um datetime, date ou texto ISO.
+    """
+    if isinstance(momento, str):
+        momento = datetime.fromisoformat(momento)
+    if isinstance(momento, datetime):
+        return momento.date()
+    return momento
+
+
+@lru_cache(maxsize=65536)
+def _valor_no_dia(valor_inicial, rendimento_mensal, data_aplicacao, data_base):
+    meses = max((data_base - data_aplicacao).days, 0) / DIAS_POR_MES
+    return arredondar(valor_inicial * ((1 + rendimento_mensal) ** meses))
+
+
+def valor_em(valor_inicial, rendimento_mensal, data_aplicacao, data_base=None):
+    """
+    💰 Valor de um investimento na data de referência (padrão: hoje),
+    com rendimento composto mensal. Valores em centavos.
+    """
+    return _valor_no_dia(valor_inicial, rendimento_mensal, _dia(data_aplicacao),
+                         _dia(data_base or date.today()))
+
+
+def avaliar(dados, data_base=None):
+    """
+    📊 Valor atual de um registro de investimento (como está no repositório).
+    """
+    return valor_em(dados["valor_inicial"], dados["rendimento_mensal"],
+                    dados["data_aplicacao"], data_base)
+
+
+# ----------------------------------------------------------------------
+# Reavaliação da carteira inteira
+# ----------------------------------------------------------------------
+
+class Carteira:
+    """
+    🗃️ CARTEIRA DE INVESTIMENTOS EM COLUNAS
+
+    Carrega uma vez, em vetores, as colunas de todos os investimentos do
+    banco (tipo, valor inicial, rendimento mensal e dia da aplicação) e
+    reavalia o livro inteiro numa passada só, para qualquer data:
+
+        valor = valor_inicial * (1 + rendimento_mensal) ** (dias / 30)
+
+    Os valores ficam em vetores de inteiros (centavos) e cada investimento
+    é arredondado para o centavo antes de somar, então os totais batem
+    exatamente com a soma dos valores mostrados para cada usuário.
+
+    Com NumPy a conta é vetorizada; sem NumPy instalado, o mesmo cálculo
+    é feito com um laço em Python puro (mais lento, mesmo resultado).
+    """
+
+    def __init__(self, registros):
+        tipos, principais, taxas, dias = [], [], [], []
+        for dados in registros:
+            tipos.append(dados["tipo"])
+            principais.append(dados["valor_inicial"])
+            taxas.append(dados["rendimento_mensal"])
+            dias.append(_dia(dados["data_aplicacao"]).toordinal())
+
+        self.tipos = sorted(set(tipos))
+        codigos = {tipo: i for i, tipo in enumerate(self.tipos)}
+        if np is not None:
+            self._tipo = np.array([codigos[t] for t in tipos], dtype=np.int32)
+            self._principal = np.array(principais, dtype=np.int64)
+            self._log_fator = np.log1p(np.array(taxas, dtype=np.float64))
+            self._dia = np.array(dias, dtype=np.int64)
+        else:
+            self._tipo = [codigos[t] for t in tipos]
+            self._principal = principais
+            self._log_fator = [math.log1p(taxa) for taxa in taxas]
+            self._dia = dias
+
+    def __len__(self):
+        return len(self._principal)
+
+    def valores(self, data_base=None):
+        """
+        💰 Valor de cada investimento, em centavos, na data de referência
+        (padrão: hoje).
+        """
+        dia_base = _dia(data_base or date.today()).toordinal()
+        if np is not None:
+            meses = np.maximum(dia_base - self._dia, 0) / DIAS_POR_MES
+            return np.floor(self._principal * np.exp(self._log_fator * meses) + 0.5).astype(np.int64)
+        return [arredondar(principal * math.exp(log_fator * max(dia_base - dia, 0) / DIAS_POR_MES))
+                for principal, log_fator, dia in zip(self._principal, self._log_fator, self._dia)]
+
+    def por_tipo(self, data_base=None):
+        """
+        📊 Totais por tipo de investimento na data de referência:
+        {tipo: {"quantidade", "investido", "valor"}} (valores em centavos).
+        """
+        valores = self.valores(data_base)
+        if np is not None:
+            quantidade = np.bincount(self._tipo, minlength=len(self.tipos))
+            investido = np.bincount(self._tipo, weights=self._principal, minlength=len(self.tipos))
+            valor = np.bincount(self._tipo, weights=valores, minlength=len(self.tipos))
+        else:
+            quantidade = [0] * len(self.tipos)
+            investido = [0] * len(self.tipos)
+            valor = [0] * len(self.tipos)
+            for codigo, principal, atual in zip(self._tipo, self._principal, valores):
+                quantidade[codigo] += 1
+                investido[codigo] += principal
+                valor[codigo] += atual
+
+        return {
+            tipo: {
+                "quantidade": int(quantidade[i]),
+                "investido": int(investido[i]),
+                "valor": int(valor[i]),
+            }
+            for i, tipo in enumerate(self.tipos)
+        }
@@ -0,0 +1,111 @@
+"""
+🎲 SIMULAÇÃO DE RISCO (MONTE CARLO)
+
+O rendimento mensal de cada produto é só a média: na prática o valor
+oscila, e quanto maior o risco, maior a oscilação. Aqui cada produto tem
+uma volatilidade mensal e o valor futuro é sorteado muitas vezes
+(caminhos), seguindo um passeio aleatório geométrico:
+
+    valor_final = valor * exp((m - v² / 2) * meses + v * raiz(meses) * Z)
+
+com m = ln(1 + rendimento_mensal), v = volatilidade mensal e Z normal
+padrão. Na média, o resultado é o mesmo do rendimento fixo; os
+percentis mostram o que pode acontecer de pior e de melhor.
+
+Numa carteira com vários investimentos, cada um é sorteado de forma
+independente em cada caminho e o resultado é a soma.
+
+Com NumPy todos os caminhos são sorteados de uma vez; sem NumPy o mesmo
+cálculo é feito com um laço em Python puro (bem mais lento).
+"""
+
+import math
+import random
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: sem ele a simulação usa Python puro
+    np = None
+
+PERCENTIS = (5, 25, 50, 75, 95)
+CAMINHOS = 100000
+
+
+def simular(valor, rendimento_mensal, volatilidade_mensal, meses, caminhos=CAMINHOS, semente=None):
+    """
+    🎲 Simula o valor de uma aplicação daqui a "meses" meses.
+    """
+    return simular_carteira([(valor, rendimento_mensal, volatilidade_mensal)], meses, caminhos, semente)
+
+
+def simular_carteira(posicoes, meses, caminhos=CAMINHOS, semente=None):
+    """
+    🗃️ Simula uma carteira inteira daqui a "meses" meses.
+
+    posicoes: lista de (valor, rendimento_mensal, volatilidade_mensal).
+
+    Devolve um dicionário com:
+    - "investido": soma dos valores de hoje
+    - "media": valor médio no fim do prazo
+    - "percentis": {5: ..., 25: ..., 50: ..., 75: ..., 95: ...}
+    - "chance_perda": fração dos caminhos que terminam abaixo do investido
+    """
+    investido = sum(valor for valor, _, _ in posicoes)
+    if not posicoes or caminhos <= 0:
+        return {"investido": investido, "media": investido, "chance_perda": 0.0,
+                "percentis": {p: investido for p in PERCENTIS}}
+
+    if np is not None:
+        finais = _simular_numpy(posicoes, meses, caminhos, semente)
+        percentis = np.percentile(finais, PERCENTIS)
+        return {
+            "investido": investido,
+            "media": float(finais.mean()),
+            "chance_perda": float(np.count_nonzero(finais < investido)) / caminhos,
+            "percentis": {p: float(v) for p, v in zip(PERCENTIS, percentis)},
+        }
+
+    finais = sorted(_simular_python(posicoes, meses, caminhos, semente))
+    return {
+        "investido": investido,
+        "media": sum(finais) / caminhos,
+        "chance_perda": sum(1 for v in finais if v < investido) / caminhos,
+        "percentis": {p: _percentil(finais, p) for p in PERCENTIS},
+    }
+
+
+def _parametros(posicoes, meses):
+    """
+    Deriva e desvio do logaritmo do valor no fim do prazo, por posição.
+    """
+    for valor, rendimento, volatilidade in posicoes:
+        deriva = (math.log1p(rendimento) - volatilidade ** 2 / 2) * meses
+        desvio = volatilidade * math.sqrt(meses)
+        yield valor, deriva, desvio
+
+
+def _simular_numpy(posicoes, meses, caminhos, semente):
+    valores, derivas, desvios = (np.array(coluna, dtype=np.float64)
+                                 for coluna in zip(*_parametros(posicoes, meses)))
+    gerador = np.random.default_rng(semente)
+    sorteios = gerador.standard_normal((caminhos, len(valores)))
+    # Uma linha por caminho, uma coluna por posição; a soma das colunas é a carteira
+    return (valores * np.exp(derivas + desvios * sorteios)).sum(axis=1)
+
+
+def _simular_python(posicoes, meses, caminhos, semente):
+    parametros = list(_parametros(posicoes, meses))
+    gerador = random.Random(semente)
+    for _ in range(caminhos):
+        yield sum(valor * math.exp(deriva + desvio * gerador.gauss(0.0, 1.0))
+                  for valor, deriva, desvio in parametros)
+
+
+def _percentil(ordenados, p):
+    """
+    Percentil com interpolação linear (o mesmo padrão do NumPy).
+    """
+    posicao = (len(ordenados) - 1) * p / 100
+    abaixo = math.floor(posicao)
+    acima = min(abaixo + 1, len(ordenados) - 1)
+    return ordenados[abaixo] + (ordenados[acima] - ordenados[abaixo]) * (posicao - abaixo)
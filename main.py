@@ -8,6 +8,7 @@ from managers.auditoria import AuditoriaManager
 from menus.menu_usuario import menu_usuario
 from menus.menu_admin import menu_admin
 
+from utils import config
 from utils.helpers import limpar_tela, pausar
 
 def main():
@@ -19,12 +20,23 @@ def main():
     print("🏦 SOLABANK, O BANCO IDEAL PARA VOCÊ!")
     print("=" * 50)
 
-    usuario_manager = UsuarioManager()
-    cartao_manager = CartaoManager()
-    admin_manager = AdminManager()
-    investimento_manager = InvestimentoManager()
-    emprestimo_manager = EmprestimoManager()
-    auditoria = AuditoriaManager()
+    if config.SERVIDOR:
+        # Modo cliente: os managers (e os dados) ficam no servidor
+        from servidor.cliente import conectar
+        remotos = conectar(config.SERVIDOR)
+        usuario_manager = remotos["usuarios"]
+        cartao_manager = remotos["cartoes"]
+        admin_manager = remotos["admin"]
+        investimento_manager = remotos["investimentos"]
+        emprestimo_manager = remotos["emprestimos"]
+        auditoria = remotos["auditoria"]
+    else:
+        usuario_manager = UsuarioManager()
+        cartao_manager = CartaoManager()
+        admin_manager = AdminManager()
+        investimento_manager = InvestimentoManager()
+        emprestimo_manager = EmprestimoManager()
+        auditoria = AuditoriaManager()
 
     while True:
         limpar_tela()
@@ -50,10 +62,15 @@ def main():
 
         elif opcao == "3":
             if admin_manager.login_admin():
-                menu_admin(admin_manager, usuario_manager, auditoria)
+                menu_admin(admin_manager, usuario_manager, auditoria, investimento_manager)
 
         elif opcao == "4":
             print("👋 Obrigado por usar nosso sistema!")
+            usuario_manager.fechar()  # Espera o journal terminar de gravar
+            cartao_manager.fechar()
+            emprestimo_manager.fechar()
+            investimento_manager.fechar()
+            auditoria.fechar()        # Grava a fila da auditoria assíncrona
             break
 
         else:
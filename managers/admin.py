@@ -5,7 +5,8 @@ from pydoc import pager
 from matplotlib import colors
 from matplotlib.table import Table
 from networkx import star_graph
-from utils.helpers import pausar
+from utils.dinheiro import texto_reais
+from utils.helpers import formatar_moeda, pausar
 
 
 class AdminManager:
@@ -68,10 +69,10 @@ class AdminManager:
         for nome, dados in usuarios.items():
             data_cadastro = datetime.fromisoformat(dados["data_cadastro"]).strftime("%d/%m/%Y")
             print(f"👤 {nome}")
-            print(f"   💰 Saldo: R$ {dados['saldo']:.2f}")
+            print(f"   💰 Saldo: {formatar_moeda(dados['saldo'])}")
             print(f"   ⭐ Pontos: {dados.get('pontos', 0)}")
             print(f"   📅 Cadastro: {data_cadastro}")
-            print(f"   📊 Transações: {len(dados['historico'])}")
+            print(f"   📊 Transações: {usuario_manager.contar_transacoes(nome)}")
             print()
     
     def mostrar_estatisticas(self, usuario_manager):
@@ -94,21 +95,65 @@ class AdminManager:
         total_usuarios = len(usuarios)
         saldo_total = sum(dados['saldo'] for dados in usuarios.values())
         pontos_total = sum(dados.get('pontos', 0) for dados in usuarios.values())
-        transacoes_total = sum(len(dados['historico']) for dados in usuarios.values())
+        transacoes = {nome: usuario_manager.contar_transacoes(nome) for nome in usuarios}
+        transacoes_total = sum(transacoes.values())
         
         # Usuário com maior saldo
         usuario_maior_saldo = max(usuarios.items(), key=lambda x: x[1]['saldo'])
         
         # Usuário mais ativo (mais transações)
-        usuario_mais_ativo = max(usuarios.items(), key=lambda x: len(x[1]['historico']))
+        usuario_mais_ativo = max(transacoes.items(), key=lambda x: x[1])
         
         print(f"👥 Total de usuários: {total_usuarios}")
-        print(f"💰 Saldo total do sistema: R$ {saldo_total:.2f}")
+        print(f"💰 Saldo total do sistema: {formatar_moeda(saldo_total)}")
         print(f"⭐ Pontos totais distribuídos: {pontos_total}")
         print(f"📊 Total de transações: {transacoes_total}")
-        print(f"📈 Média de saldo por usuário: R$ {saldo_total/total_usuarios:.2f}")
-        print(f"🏆 Usuário com maior saldo: {usuario_maior_saldo[0]} (R$ {usuario_maior_saldo[1]['saldo']:.2f})")
-        print(f"🎯 Usuário mais ativo: {usuario_mais_ativo[0]} ({len(usuario_mais_ativo[1]['historico'])} transações)")
+        print(f"📈 Média de saldo por usuário: {formatar_moeda(saldo_total/total_usuarios)}")
+        print(f"🏆 Usuário com maior saldo: {usuario_maior_saldo[0]} ({formatar_moeda(usuario_maior_saldo[1]['saldo'])})")
+        print(f"🎯 Usuário mais ativo: {usuario_mais_ativo[0]} ({usuario_mais_ativo[1]} transações)")
+        print(f"💾 Gravações de usuários nesta sessão: {usuarios.escritas} feitas, "
+              f"{usuarios.escritas_evitadas} evitadas (nada tinha mudado)")
+    
+    def mostrar_investimentos_banco(self, investimento_manager):
+        """
+        📈 INVESTIMENTOS SOB GESTÃO
+        
+        Esta função mostra quanto o banco tem investido, separado por
+        tipo de investimento, em qualquer data de referência. A carteira
+        inteira é reavaliada de uma vez, sem passar usuário por usuário.
+        """
+        print("\n📈 INVESTIMENTOS SOB GESTÃO")
+        
+        texto = input("📅 Data de referência (DD/MM/AAAA, vazio = hoje): ").strip()
+        try:
+            data_base = datetime.strptime(texto, "%d/%m/%Y").date() if texto else None
+        except ValueError:
+            print("❌ Data inválida!")
+            return
+        
+        carteira = investimento_manager.carteira()
+        totais = carteira.por_tipo(data_base)
+        
+        print("=" * 60)
+        if not totais:
+            print("📝 Nenhum investimento no banco.")
+            return
+        
+        total_investido = 0
+        total_atual = 0
+        for tipo, total in totais.items():
+            nome = investimento_manager.tipos_investimento.get(tipo, {}).get("nome", tipo)
+            print(f"💰 {nome} ({total['quantidade']} aplicações)")
+            print(f"   Investido: {formatar_moeda(total['investido'])}")
+            print(f"   Valor atual: {formatar_moeda(total['valor'])}")
+            total_investido += total['investido']
+            total_atual += total['valor']
+        
+        print("=" * 60)
+        print(f"🗃️ Total de aplicações: {len(carteira)}")
+        print(f"💰 Total investido: {formatar_moeda(total_investido)}")
+        print(f"📈 Total sob gestão: {formatar_moeda(total_atual)}")
+        print(f"💹 Rendimento total: {formatar_moeda(total_atual - total_investido)}")
     
     def gerar_relatorio_csv(self, usuario_manager):
         """
@@ -131,10 +176,10 @@ class AdminManager:
                 for nome, dados in usuarios.items():
                     writer.writerow([
                         nome,
-                        dados['saldo'],
+                        texto_reais(dados['saldo']),  # Em reais, como antes dos centavos
                         dados.get('pontos', 0),
                         dados['data_cadastro'],
-                        len(dados['historico'])
+                        usuario_manager.contar_transacoes(nome)
                     ])
             
             print(f"✅ Relatório CSV gerado: {nome_arquivo}")
@@ -177,9 +222,9 @@ class AdminManager:
                 <b>ESTATÍSTICAS GERAIS</b><br/>
                 <br/>
                 Total de usuários: {total_usuarios}<br/>
-                Saldo total do sistema: R$ {saldo_total:.2f}<br/>
+                Saldo total do sistema: {formatar_moeda(saldo_total)}<br/>
                 Pontos totais distribuídos: {pontos_total}<br/>
-                Média de saldo por usuário: R$ {saldo_total/total_usuarios:.2f}<br/>
+                Média de saldo por usuário: {formatar_moeda(saldo_total/total_usuarios)}<br/>
                 """
                 
                 stats_para = star_graph(estatisticas, styles['Normal'])
@@ -192,9 +237,9 @@ class AdminManager:
                 for nome, dados in usuarios.items():
                     dados_tabela.append([
                         nome,
-                        f"R$ {dados['saldo']:.2f}",
+                        f"{formatar_moeda(dados['saldo'])}",
                         str(dados.get('pontos', 0)),
-                        str(len(dados['historico']))
+                        str(usuario_manager.contar_transacoes(nome))
                     ])
                 
                 tabela = Table(dados_tabela)
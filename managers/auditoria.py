@@ -1,6 +1,6 @@
 from datetime import datetime
-import json
-import os
+
+from armazenamento.fabrica import abrir_log
 
 class AuditoriaManager:
     """
@@ -18,29 +18,30 @@ class AuditoriaManager:
         """
         🏗️ CONSTRUTOR
         
-        Define onde salvar os logs de auditoria e carrega os existentes.
+        Abre o log de auditoria (segmentos JSON lines em
+        data/auditoria/, arquivo JSON ou SQLite, conforme utils/config.py).
+        
+        No modo assíncrono, log_acao só coloca a entrada numa fila e
+        uma thread em segundo plano grava as entradas em lotes.
         """
-        self.arquivo_logs = "data/auditoria.json"
-        self.logs = self.carregar_logs()
+        self.logs = abrir_log("auditoria")
     
-    def carregar_logs(self):
+    def descarregar(self):
         """
-        📂 CARREGAR LOGS DO ARQUIVO
+        💾 GRAVAR LOGS PENDENTES
+        
+        Espera todas as entradas da fila serem gravadas
+        (chamada no logout, para nada ficar só em memória).
         """
-        if os.path.exists(self.arquivo_logs):
-            try:
-                with open(self.arquivo_logs, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return []
-        return []
+        self.logs.descarregar()
     
-    def salvar_logs(self):
+    def fechar(self):
         """
-        💾 SALVAR LOGS NO ARQUIVO
+        🔒 FECHAR LOG
+        
+        Grava o que estiver pendente e para a thread de gravação.
         """
-        with open(self.arquivo_logs, 'w', encoding='utf-8') as f:
-            json.dump(self.logs, f, indent=2, ensure_ascii=False)
+        self.logs.fechar()
     
     def log_acao(self, usuario, acao, detalhes):
         """
@@ -57,13 +58,7 @@ class AuditoriaManager:
             "ip": "127.0.0.1"  # Em um sistema real, seria o IP real do usuário
         }
         
-        self.logs.append(log_entry)
-        self.salvar_logs()
-        
-        # Mantém apenas os últimos 1000 logs para não ocupar muito espaço
-        if len(self.logs) > 1000:
-            self.logs = self.logs[-1000:]
-            self.salvar_logs()
+        self.logs.anexar(log_entry)
     
     def mostrar_logs(self, limite=50):
         """
@@ -75,17 +70,76 @@ class AuditoriaManager:
         print(f"\n📋 LOGS DE AUDITORIA (Últimos {limite})")
         print("=" * 80)
         
-        if not self.logs:
+        # Mostra os logs mais recentes primeiro (o log segmentado
+        # lê de trás para frente, a partir do segmento mais novo)
+        logs_recentes = self.logs.ultimos(limite)
+        logs_recentes.reverse()
+        
+        if not logs_recentes:
             print("📝 Nenhum log encontrado.")
             return
         
-        # Mostra os logs mais recentes primeiro
-        logs_recentes = self.logs[-limite:]
-        logs_recentes.reverse()
-        
         for log in logs_recentes:
             timestamp = datetime.fromisoformat(log["timestamp"]).strftime("%d/%m/%Y %H:%M:%S")
             print(f"[{timestamp}] {log['usuario']} - {log['acao']}: {log['detalhes']}")
+    
+    def consultar(self, usuario=None, acao=None, inicio=None, fim=None, pagina=1, por_pagina=20):
+        """
+        🔎 CONSULTAR LOGS
+        
+        Esta função busca logs filtrando por usuário, ação e período
+        (datetime ou texto ISO; os dois limites entram), usando os
+        índices do log. Retorna (logs da página, total encontrado),
+        do mais novo para o mais antigo.
+        """
+        if isinstance(inicio, datetime):
+            inicio = inicio.isoformat()
+        if isinstance(fim, datetime):
+            fim = fim.isoformat()
+        return self.logs.consultar(usuario=usuario, acao=acao, inicio=inicio, fim=fim,
+                                   pagina=pagina, por_pagina=por_pagina)
+    
+    def consultar_logs(self):
+        """
+        🔍 CONSULTA INTERATIVA DE LOGS
+        
+        Esta função pergunta os filtros ao administrador (deixe em
+        branco para não filtrar) e mostra o resultado em páginas.
+        Útil para investigar as ações de um cliente específico.
+        """
+        print("\n🔍 CONSULTAR LOGS DE AUDITORIA")
+        usuario = input("👤 Usuário: ").strip() or None
+        acao = input("🏷️ Ação (ex: LOGIN, DEPOSITO, SAQUE): ").strip().upper() or None
+        
+        try:
+            texto = input("📅 Data inicial (DD/MM/AAAA): ").strip()
+            inicio = datetime.strptime(texto, "%d/%m/%Y") if texto else None
+            texto = input("📅 Data final (DD/MM/AAAA): ").strip()
+            # A data final entra inteira, até o último instante do dia
+            fim = datetime.strptime(texto, "%d/%m/%Y").replace(hour=23, minute=59, second=59,
+                                                                microsecond=999999) if texto else None
+        except ValueError:
+            print("❌ Data inválida!")
+            return
+        
+        pagina = 1
+        while True:
+            logs, total = self.consultar(usuario, acao, inicio, fim, pagina=pagina)
+            paginas = max(1, (total + 19) // 20)
+            
+            print(f"\n📋 {total} log(s) encontrado(s) - página {pagina} de {paginas}")
+            print("=" * 80)
+            for log in logs:
+                timestamp = datetime.fromisoformat(log["timestamp"]).strftime("%d/%m/%Y %H:%M:%S")
+                print(f"[{timestamp}] {log['usuario']} - {log['acao']}: {log['detalhes']}")
+            
+            opcao = input("\n[P] Próxima  [A] Anterior  [S] Sair: ").strip().upper()
+            if opcao == "P" and pagina < paginas:
+                pagina += 1
+            elif opcao == "A" and pagina > 1:
+                pagina -= 1
+            elif opcao == "S":
+                break
 
 # ============================================================================
 # FUNÇÕES DO MENU PRINCIPAL
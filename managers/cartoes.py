@@ -1,13 +1,75 @@
-import datetime
-import json
-import os
+from bisect import bisect_right
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from pydoc import pager
 
 from matplotlib import colors
 from matplotlib.table import Table
 from networkx import star_graph
 
-from utils.helpers import gerar_numero_cartao, pausar
+from armazenamento.fabrica import abrir_repositorio
+from armazenamento.travas import TravasPorChave
+from armazenamento.unidade_trabalho import transacao
+from utils.dinheiro import MARCA, UM_REAL, dividir, migrar_registros, multiplicar, para_centavos, valor_positivo
+from utils.helpers import formatar_moeda, gerar_numero_cartao, pausar
+from utils.transacoes import TipoTransacao
+
+
+# A cada quantos centavos de compra o cliente ganha 1 ponto (R$ 10,00)
+CENTAVOS_POR_PONTO = 10 * UM_REAL
+
+
+def _vencimento(parcela):
+    # Chave de ordenação das parcelas: a data de vencimento em texto ISO
+    return parcela["data_vencimento"]
+
+
+def faturar_vencidas(cartao, ate):
+    """
+    🧾 Move para a fatura aberta as parcelas do cartão que vencem até
+    "ate" (texto ISO) e retorna quantas foram movidas.
+    
+    Como as parcelas ficam ordenadas pelo vencimento, as vencidas
+    são sempre as primeiras da lista: elas saem do começo e vão para
+    o fim da fila da fatura aberta. As futuras nem são olhadas.
+    """
+    movidas = 0
+    for parcela in cartao["parcelas"]:
+        # Datas ISO comparam direto como texto, sem converter
+        if parcela["data_vencimento"] > ate:
+            break
+        CartaoManager._faturar(cartao, parcela)
+        movidas += 1
+    
+    if movidas:
+        del cartao["parcelas"][:movidas]
+    return movidas
+
+
+def _cartao_em_centavos(cartao):
+    # Todos os valores do cartão, de reais para centavos
+    for campo in ("limite", "usado", "fatura_atual"):
+        cartao[campo] = para_centavos(cartao[campo])
+    for compra in cartao["compras"]:
+        for campo in ("valor_original", "valor_final", "valor_parcela"):
+            compra[campo] = para_centavos(compra[campo])
+    for lista in ("parcelas", "fatura_aberta", "parcelas_pagas"):
+        for parcela in cartao.get(lista, []):
+            for campo in ("valor", "restante"):
+                if campo in parcela:
+                    parcela[campo] = para_centavos(parcela[campo])
+    for fechada in cartao.get("faturas_fechadas", []):
+        fechada["valor"] = para_centavos(fechada["valor"])
+        fechada["minimo"] = para_centavos(fechada["minimo"])
+        for item in fechada["itens"]:
+            item["valor"] = para_centavos(item["valor"])
+    
+    if "fatura_aberta" in cartao:
+        # Parcelas de 1/3 arredondadas podem deixar um centavo de diferença:
+        # os totais passam a ser exatamente a soma das parcelas
+        cartao["fatura_atual"] = sum(p["restante"] for p in cartao["fatura_aberta"])
+        cartao["usado"] = cartao["fatura_atual"] + sum(p["valor"] for p in cartao["parcelas"])
+
 
 class CartaoManager:
     """
@@ -26,34 +88,82 @@ class CartaoManager:
         """
         🏗️ CONSTRUTOR
         
-        Quando criamos um CartaoManager, ele define onde salvar
-        os dados dos cartões e carrega os cartões existentes.
+        Quando criamos um CartaoManager, ele abre o repositório
+        de cartões (arquivo JSON ou SQLite, conforme utils/config.py)
+        e monta o índice usuário -> números dos cartões, para achar
+        os cartões de alguém sem percorrer todos.
+        
+        Cada usuário tem a sua trava: a conferência (limite, número de
+        cartões) e a alteração são feitas sem outra sessão do mesmo
+        usuário no meio. Nenhuma pergunta (input) é feita com a trava.
         """
-        self.arquivo_cartoes = "data/cartoes.json"
-        self.cartoes = self.carregar_cartoes()
+        self.cartoes = abrir_repositorio("cartoes")
+        self.cartoes.criar_indice("usuario")
+        self._travas = TravasPorChave()  # Uma trava por usuário
+        self._migrar_parcelas()
     
-    def carregar_cartoes(self):
+    def _migrar_parcelas(self):
         """
-        📂 CARREGAR CARTÕES DO ARQUIVO
+        📦 MIGRAR PARCELAS
         
-        Esta função lê o arquivo JSON onde estão salvos todos os cartões.
+        Cartões com valores em reais (de antes dos centavos) são
+        convertidos primeiro; eles ganham a marca "centavos".
+        
+        Cartões criados antes da agenda de vencimentos têm todas as
+        parcelas numa lista só, na ordem das compras. Aqui elas são
+        separadas em:
+        - "parcelas_pagas": arquivo das parcelas já pagas
+        - "fatura_aberta": parcelas já faturadas e não pagas, na ordem
+          de pagamento (pagamentos parciais antigos são descontados da
+          primeira da fila)
+        - "parcelas": as que ainda não venceram, ordenadas pelo vencimento
+        
+        Roda só para cartões ainda no formato antigo.
         """
-        if os.path.exists(self.arquivo_cartoes):
-            try:
-                with open(self.arquivo_cartoes, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
+        with transacao():
+            migrar_registros(self.cartoes, _cartao_em_centavos)
+            
+            for numero in list(self.cartoes):
+                cartao = self.cartoes[numero]
+                if "fatura_aberta" in cartao:
+                    continue
+                
+                pagas = cartao.get("parcelas_pagas", [])
+                abertas = sorted((p for p in cartao["parcelas"] if not p["paga"]), key=_vencimento)
+                cartao["parcelas_pagas"] = pagas + [p for p in cartao["parcelas"] if p["paga"]]
+                cartao["fatura_aberta"] = [p for p in abertas if p["moved_to_bill"]]
+                cartao["parcelas"] = [p for p in abertas if not p["moved_to_bill"]]
+                
+                # O que já foi pago em parte sai da primeira parcela da fila
+                pago_em_parte = sum(p["valor"] for p in cartao["fatura_aberta"]) - cartao["fatura_atual"]
+                for parcela in cartao["fatura_aberta"]:
+                    desconto = min(max(pago_em_parte, 0), parcela["valor"])
+                    parcela["restante"] = parcela["valor"] - desconto
+                    pago_em_parte -= desconto
+                cartao["fatura_atual"] = sum(p["restante"] for p in cartao["fatura_aberta"])
+                cartao["usado"] = cartao["fatura_atual"] + sum(p["valor"] for p in cartao["parcelas"])
+                self.cartoes.salvar(numero)
     
-    def salvar_cartoes(self):
+    def fechar(self):
         """
-        💾 SALVAR CARTÕES NO ARQUIVO
+        🔒 FECHAR ARMAZENAMENTO
         
-        Esta função salva todos os dados dos cartões no arquivo JSON.
+        Grava os cartões pendentes antes de sair do sistema.
         """
-        with open(self.arquivo_cartoes, 'w', encoding='utf-8') as f:
-            json.dump(self.cartoes, f, indent=2, ensure_ascii=False)
+        self.cartoes.fechar()
+    
+    @contextmanager
+    def travar(self, usuario):
+        """
+        🔐 TRAVAR USUÁRIO
+        
+        Trava os cartões do usuário enquanto o bloco roda. No armazenamento
+        "compartilhado", o repositório também fica travado para os
+        outros processos durante o bloco, e é relido antes se outro
+        processo gravou: a conferência vê os dados mais novos.
+        """
+        with self._travas.travar(usuario), self.cartoes.exclusivo():
+            yield
     
     def criar_cartao(self, usuario):
         """
@@ -68,37 +178,44 @@ class CartaoManager:
         """
         print("\n➕ SOLICITAÇÃO DE NOVO CARTÃO")
         
-        # Conta quantos cartões o usuário já tem
-        cartoes_usuario = self.get_cartoes_usuario(usuario)
-        num_cartoes = len(cartoes_usuario)
-        
-        # Limite máximo de 5 cartões por usuário
-        if num_cartoes >= 5:
+        # Contagem e criação com o usuário travado: duas sessões não criam o 6º cartão
+        with self.travar(usuario):
+            # Conta quantos cartões o usuário já tem
+            num_cartoes = len(self.get_cartoes_usuario(usuario))
+            
+            # Limite máximo de 5 cartões por usuário
+            no_maximo = num_cartoes >= 5
+            if not no_maximo:
+                # Calcula o limite baseado no número de cartões
+                limite_inicial = (num_cartoes + 1) * 100000  # R$ 1.000,00 por cartão, em centavos
+                
+                # Gera um número único para o cartão
+                numero_cartao = gerar_numero_cartao()
+                
+                # Cria o registro do cartão
+                self.cartoes[numero_cartao] = {
+                    "usuario": usuario,
+                    "limite": limite_inicial,
+                    "usado": 0,                      # Quanto já gastou (centavos)
+                    "fatura_atual": 0,               # Valor da fatura atual (centavos)
+                    "compras": [],                   # Lista de compras
+                    "parcelas": [],                  # Parcelas a vencer, ordenadas pelo vencimento
+                    "fatura_aberta": [],             # Parcelas faturadas e não pagas, na ordem de pagamento
+                    "parcelas_pagas": [],            # Arquivo das parcelas já pagas
+                    "data_criacao": datetime.now().isoformat(),
+                    MARCA: True
+                }
+                
+                self.cartoes.salvar(numero_cartao)
+        
+        if no_maximo:
             print("❌ Você já possui o máximo de 5 cartões!")
             pausar()
             return False
         
-        # Calcula o limite baseado no número de cartões
-        limite_inicial = (num_cartoes + 1) * 1000
-        
-        # Gera um número único para o cartão
-        numero_cartao = gerar_numero_cartao()
-        
-        # Cria o registro do cartão
-        self.cartoes[numero_cartao] = {
-            "usuario": usuario,
-            "limite": limite_inicial,
-            "usado": 0.0,                    # Quanto já gastou
-            "fatura_atual": 0.0,             # Valor da fatura atual
-            "compras": [],                   # Lista de compras
-            "parcelas": [],                  # Lista de parcelas pendentes
-            "data_criacao": datetime.now().isoformat()
-        }
-        
-        self.salvar_cartoes()
         print(f"✅ Cartão criado com sucesso!")
         print(f"💳 Número: {numero_cartao}")
-        print(f"💰 Limite: R$ {limite_inicial:.2f}")
+        print(f"💰 Limite: {formatar_moeda(limite_inicial)}")
         pausar()
         return True
     
@@ -107,98 +224,122 @@ class CartaoManager:
         💳 OBTER CARTÕES DO USUÁRIO
         
         Esta função retorna uma lista com todos os cartões de um usuário.
+        Usa o índice por usuário: só lê os cartões dele.
         """
+        self.cartoes.sincronizar()  # Outro processo pode ter criado ou usado um cartão
         cartoes_usuario = []
-        for numero, dados in self.cartoes.items():
-            if dados["usuario"] == usuario:
-                cartoes_usuario.append({
-                    "numero": numero,
-                    "limite": dados["limite"],
-                    "usado": dados["usado"],
-                    "disponivel": dados["limite"] - dados["usado"]
-                })
+        for numero in self.cartoes.chaves_do_usuario(usuario):
+            dados = self.cartoes[numero]
+            cartoes_usuario.append({
+                "numero": numero,
+                "limite": dados["limite"],
+                "usado": dados["usado"],
+                "disponivel": dados["limite"] - dados["usado"]
+            })
         return cartoes_usuario
     
-    def fazer_compra(self, usuario, numero_cartao, valor, parcelas, descricao):
+    def fazer_compra(self, usuario, numero_cartao, valor, parcelas, descricao, usuario_manager=None):
         """
         🛒 FAZER COMPRA NO CARTÃO
         
         Esta função processa uma compra no cartão de crédito.
         Pode ser à vista (1x) ou parcelada (até 24x).
         Aplica juros para parcelamentos acima de 6x.
-        """
-        if numero_cartao not in self.cartoes:
-            print("❌ Cartão não encontrado!")
-            return False
         
-        cartao = self.cartoes[numero_cartao]
+        Com o usuario_manager, credita os pontos da compra (1 ponto a
+        cada R$ 10,00 do valor original).
         
-        if cartao["usuario"] != usuario:
-            print("❌ Este cartão não pertence a você!")
-            return False
-        
-        if valor <= 0:
-            print("❌ Valor deve ser positivo!")
-            return False
-        
-        if parcelas < 1 or parcelas > 24:
-            print("❌ Número de parcelas deve ser entre 1 e 24!")
-            return False
-        
-        # Calcula juros baseado no número de parcelas
-        valor_final = valor
-        if parcelas > 6:
-            if parcelas <= 12:
-                # 7-12 parcelas: 8% de juros
-                valor_final = valor * 1.08
-            else:
-                # 13-24 parcelas: 12% de juros
-                valor_final = valor * 1.12
-        
-        # Verifica se tem limite disponível
-        if cartao["usado"] + valor_final > cartao["limite"]:
-            print("❌ Limite insuficiente!")
-            print(f"💰 Disponível: R$ {cartao['limite'] - cartao['usado']:.2f}")
-            print(f"💸 Necessário: R$ {valor_final:.2f}")
-            return False
-        
-        # Registra a compra
-        compra = {
-            "data": datetime.now().isoformat(),
-            "descricao": descricao,
-            "valor_original": valor,
-            "valor_final": valor_final,
-            "parcelas": parcelas,
-            "valor_parcela": valor_final / parcelas
-        }
-        
-        cartao["compras"].append(compra)
-        cartao["usado"] += valor_final
-        
-        # Cria as parcelas
-        for i in range(parcelas):
-            data_vencimento = datetime.now() + datetime.timedelta(days=30 * i)  # 30 dias entre parcelas
-            parcela = {
-                "numero": i + 1,
-                "valor": valor_final / parcelas,
+        Valores em centavos: as parcelas somam exatamente o valor da
+        compra (os centavos que sobram ficam nas primeiras).
+        """
+        # Da conferência do limite até a gravação, com o usuário travado
+        with self.travar(usuario):
+            if numero_cartao not in self.cartoes:
+                print("❌ Cartão não encontrado!")
+                return False
+            
+            cartao = self.cartoes[numero_cartao]
+            
+            if cartao["usuario"] != usuario:
+                print("❌ Este cartão não pertence a você!")
+                return False
+            
+            if not valor_positivo(valor):
+                print("❌ Valor deve ser positivo!")
+                return False
+            
+            if type(parcelas) is not int or parcelas < 1 or parcelas > 24:
+                print("❌ Número de parcelas deve ser entre 1 e 24!")
+                return False
+            
+            # Calcula juros baseado no número de parcelas
+            valor_final = valor
+            if parcelas > 6:
+                if parcelas <= 12:
+                    # 7-12 parcelas: 8% de juros
+                    valor_final = multiplicar(valor, 1.08)
+                else:
+                    # 13-24 parcelas: 12% de juros
+                    valor_final = multiplicar(valor, 1.12)
+            
+            # Verifica se tem limite disponível
+            if cartao["usado"] + valor_final > cartao["limite"]:
+                print("❌ Limite insuficiente!")
+                print(f"💰 Disponível: {formatar_moeda(cartao['limite'] - cartao['usado'])}")
+                print(f"💸 Necessário: {formatar_moeda(valor_final)}")
+                return False
+            
+            valores_parcelas = dividir(valor_final, parcelas)
+            
+            # Registra a compra
+            compra = {
+                "data": datetime.now().isoformat(),
                 "descricao": descricao,
-                "data_vencimento": data_vencimento.isoformat(),
-                "paga": False,
-                "moved_to_bill": i == 0  # Primeira parcela já vai para a fatura
+                "valor_original": valor,
+                "valor_final": valor_final,
+                "parcelas": parcelas,
+                "valor_parcela": valores_parcelas[0]
             }
-            cartao["parcelas"].append(parcela)
-        
-        # Primeira parcela já entra na fatura atual
-        cartao["fatura_atual"] += valor_final / parcelas
-        
-        self.salvar_cartoes()
+            
+            cartao["compras"].append(compra)
+            cartao["usado"] += valor_final
+            
+            # Cria as parcelas. Os vencimentos ficam numa lista à parte, na mesma
+            # ordem de cartao["parcelas"], para a busca binária (bisect só aceita
+            # "key=" a partir do Python 3.10)
+            vencimentos = [_vencimento(p) for p in cartao["parcelas"]]
+            for i in range(parcelas):
+                data_vencimento = datetime.now() + timedelta(days=30 * i)  # 30 dias entre parcelas
+                parcela = {
+                    "numero": i + 1,
+                    "valor": valores_parcelas[i],
+                    "descricao": descricao,
+                    "data_vencimento": data_vencimento.isoformat(),
+                    "paga": False,
+                    "moved_to_bill": i == 0  # Primeira parcela já vai para a fatura
+                }
+                if i == 0:
+                    # Primeira parcela já entra na fatura atual
+                    self._faturar(cartao, parcela)
+                else:
+                    # Entra na posição certa para a lista continuar ordenada pelo vencimento
+                    posicao = bisect_right(vencimentos, _vencimento(parcela))
+                    vencimentos.insert(posicao, _vencimento(parcela))
+                    cartao["parcelas"].insert(posicao, parcela)
+            
+            self.cartoes.salvar(numero_cartao)
         
         if valor_final > valor:
-            print(f"💰 Valor original: R$ {valor:.2f}")
-            print(f"💸 Valor com juros: R$ {valor_final:.2f}")
+            print(f"💰 Valor original: {formatar_moeda(valor)}")
+            print(f"💸 Valor com juros: {formatar_moeda(valor_final)}")
             print(f"📊 Juros aplicados: {((valor_final/valor - 1) * 100):.1f}%")
         
-        print(f"✅ Compra realizada em {parcelas}x de R$ {valor_final/parcelas:.2f}")
+        print(f"✅ Compra realizada em {parcelas}x de {formatar_moeda(valores_parcelas[0])}")
+        
+        if usuario_manager is not None:
+            pontos_ganhos = valor // CENTAVOS_POR_PONTO  # // = divisão inteira
+            usuario_manager.adicionar_pontos(usuario, pontos_ganhos)
+            print(f"⭐ Você ganhou {pontos_ganhos} pontos!")
         return True
     
     def mostrar_fatura(self, usuario, numero_cartao):
@@ -222,39 +363,47 @@ class CartaoManager:
         print("=" * 50)
         
         # Atualiza a fatura com parcelas vencidas
-        self.atualizar_fatura(numero_cartao)
+        with self.travar(usuario):
+            self.atualizar_fatura(numero_cartao)
         
         if cartao["fatura_atual"] == 0:
             print("✅ Nenhuma fatura pendente!")
             return
         
-        print(f"💰 Valor total da fatura: R$ {cartao['fatura_atual']:.2f}")
-        print(f"📅 Data de vencimento: {(datetime.now() + datetime.timedelta(days=10)).strftime('%d/%m/%Y')}")
+        print(f"💰 Valor total da fatura: {formatar_moeda(cartao['fatura_atual'])}")
+        print(f"📅 Data de vencimento: {(datetime.now() + timedelta(days=10)).strftime('%d/%m/%Y')}")
+        
+        # Último fechamento feito pela rotina de fechamento de faturas
+        if cartao.get("faturas_fechadas"):
+            fechada = cartao["faturas_fechadas"][-1]
+            print(f"🔒 Fatura fechada em {datetime.fromisoformat(fechada['fechamento']).strftime('%d/%m/%Y')}: "
+                  f"{formatar_moeda(fechada['valor'])} (mínimo {formatar_moeda(fechada['minimo'])}, "
+                  f"vence em {datetime.fromisoformat(fechada['vencimento']).strftime('%d/%m/%Y')})")
         
         print("\n📋 Itens da fatura:")
-        for parcela in cartao["parcelas"]:
-            if parcela["moved_to_bill"] and not parcela["paga"]:
-                print(f"• {parcela['descricao']} - Parcela {parcela['numero']} - R$ {parcela['valor']:.2f}")
+        for parcela in cartao["fatura_aberta"]:
+            print(f"• {parcela['descricao']} - Parcela {parcela['numero']} - {formatar_moeda(parcela['restante'])}")
     
     def atualizar_fatura(self, numero_cartao):
         """
         🔄 ATUALIZAR FATURA
         
         Esta função verifica se há parcelas que venceram e devem
-        ser adicionadas à fatura atual.
+        ser adicionadas à fatura atual. Só grava se alguma parcela
+        foi movida.
         """
-        cartao = self.cartoes[numero_cartao]
-        hoje = datetime.now()
-        
-        for parcela in cartao["parcelas"]:
-            data_vencimento = datetime.fromisoformat(parcela["data_vencimento"])
-            
-            # Se a parcela venceu e ainda não foi movida para a fatura
-            if data_vencimento <= hoje and not parcela["moved_to_bill"] and not parcela["paga"]:
-                cartao["fatura_atual"] += parcela["valor"]
-                parcela["moved_to_bill"] = True
-        
-        self.salvar_cartoes()
+        if faturar_vencidas(self.cartoes[numero_cartao], datetime.now().isoformat()):
+            self.cartoes.salvar(numero_cartao)
+    
+    @staticmethod
+    def _faturar(cartao, parcela):
+        """
+        🧾 Coloca a parcela no fim da fila da fatura aberta.
+        """
+        parcela["moved_to_bill"] = True
+        parcela["restante"] = parcela["valor"]
+        cartao["fatura_aberta"].append(parcela)
+        cartao["fatura_atual"] += parcela["valor"]
     
     def pagar_fatura(self, usuario, numero_cartao, valor, usuario_manager):
         """
@@ -263,48 +412,61 @@ class CartaoManager:
         Esta função permite pagar a fatura do cartão usando
         o saldo da conta corrente.
         """
-        if numero_cartao not in self.cartoes:
-            print("❌ Cartão não encontrado!")
-            return False
-        
-        cartao = self.cartoes[numero_cartao]
-        
-        if cartao["usuario"] != usuario:
-            print("❌ Este cartão não pertence a você!")
-            return False
-        
-        if valor <= 0:
-            print("❌ Valor deve ser positivo!")
-            return False
-        
-        if valor > cartao["fatura_atual"]:
-            print(f"❌ Valor maior que a fatura! Fatura atual: R$ {cartao['fatura_atual']:.2f}")
-            return False
-        
-        # Verifica se tem saldo na conta
-        if not usuario_manager.sacar(usuario, valor):
-            return False
-        
-        # Paga as parcelas proporcionalmente
-        valor_restante = valor
-        for parcela in cartao["parcelas"]:
-            if parcela["moved_to_bill"] and not parcela["paga"] and valor_restante > 0:
-                if valor_restante >= parcela["valor"]:
+        # Da conferência da fatura até a baixa, com o usuário travado
+        with self.travar(usuario):
+            if numero_cartao not in self.cartoes:
+                print("❌ Cartão não encontrado!")
+                return False
+            
+            cartao = self.cartoes[numero_cartao]
+            
+            if cartao["usuario"] != usuario:
+                print("❌ Este cartão não pertence a você!")
+                return False
+            
+            if not valor_positivo(valor):
+                print("❌ Valor deve ser positivo!")
+                return False
+            
+            if valor > cartao["fatura_atual"]:
+                print(f"❌ Valor maior que a fatura! Fatura atual: {formatar_moeda(cartao['fatura_atual'])}")
+                return False
+            
+            # Saque, baixa das parcelas e histórico gravados juntos no final
+            with transacao():
+                # Verifica se tem saldo na conta
+                if not usuario_manager.sacar(usuario, valor):
+                    return False
+                
+                # Paga as parcelas na ordem da fila da fatura aberta: só as
+                # parcelas pagas são olhadas, não o histórico inteiro
+                fila = cartao["fatura_aberta"]
+                valor_restante = valor
+                pagas = 0
+                for parcela in fila:
+                    if valor_restante <= 0:
+                        break
+                    pagamento = min(valor_restante, parcela["restante"])
+                    parcela["restante"] -= pagamento
+                    valor_restante -= pagamento
+                    cartao["usado"] -= pagamento
+                    if parcela["restante"] > 0:
+                        break  # Paga parcialmente: continua na frente da fila
                     # Paga a parcela inteira
-                    valor_restante -= parcela["valor"]
                     parcela["paga"] = True
-                    cartao["usado"] -= parcela["valor"]
-                else:
-                    # Paga parcialmente
-                    break
-        
-        cartao["fatura_atual"] -= valor
-        if cartao["fatura_atual"] < 0.01:  # Evita valores muito pequenos
-            cartao["fatura_atual"] = 0
-        
-        self.salvar_cartoes()
-        usuario_manager.adicionar_historico(usuario, f"PAGAMENTO CARTÃO {numero_cartao}: -R$ {valor:.2f}")
-        return True
+                    pagas += 1
+                
+                # Parcelas pagas saem da fila e vão para o arquivo
+                if pagas:
+                    cartao["parcelas_pagas"].extend(fila[:pagas])
+                    del fila[:pagas]
+                
+                cartao["fatura_atual"] -= valor
+                
+                self.cartoes.salvar(numero_cartao)
+                usuario_manager.adicionar_historico(usuario, TipoTransacao.PAGAMENTO_CARTAO, valor,
+                                                    referencia=numero_cartao)
+            return True
     
     def gerar_fatura_pdf(self, usuario, numero_cartao):
         """
@@ -342,8 +504,8 @@ class CartaoManager:
             <b>Número do Cartão:</b> {numero_cartao}<br/>
             <b>Titular:</b> {usuario}<br/>
             <b>Data da Fatura:</b> {datetime.now().strftime('%d/%m/%Y')}<br/>
-            <b>Vencimento:</b> {(datetime.now() + datetime.timedelta(days=10)).strftime('%d/%m/%Y')}<br/>
-            <b>Valor Total:</b> R$ {cartao['fatura_atual']:.2f}
+            <b>Vencimento:</b> {(datetime.now() + timedelta(days=10)).strftime('%d/%m/%Y')}<br/>
+            <b>Valor Total:</b> {formatar_moeda(cartao['fatura_atual'])}
             """
             
             info_para = star_graph(info_cartao, styles['Normal'])
@@ -353,13 +515,12 @@ class CartaoManager:
             # Tabela com os itens da fatura
             dados_tabela = [['Descrição', 'Parcela', 'Valor']]
             
-            for parcela in cartao["parcelas"]:
-                if parcela["moved_to_bill"] and not parcela["paga"]:
-                    dados_tabela.append([
-                        parcela['descricao'],
-                        f"{parcela['numero']}",
-                        f"R$ {parcela['valor']:.2f}"
-                    ])
+            for parcela in cartao["fatura_aberta"]:
+                dados_tabela.append([
+                    parcela['descricao'],
+                    f"{parcela['numero']}",
+                    f"{formatar_moeda(parcela['restante'])}"
+                ])
             
             if len(dados_tabela) > 1:  # Se tem itens além do cabeçalho
                 tabela = Table(dados_tabela)
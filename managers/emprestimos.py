@@ -1,15 +1,28 @@
-import datetime
-import json
-import os
+from contextlib import contextmanager
+from datetime import datetime
+
+from armazenamento.fabrica import abrir_repositorio
+from armazenamento.travas import TravasPorChave
+from armazenamento.unidade_trabalho import transacao
+from financeiro.amortizacao import TAXA_MENSAL, cronograma, saldo_devedor, valor_presente
+from utils.dinheiro import MARCA, UM_REAL, dividir, migrar_registros, para_centavos
+from utils.helpers import formatar_moeda, pausar
+from utils.transacoes import TipoTransacao
+
+
+def _emprestimo_em_centavos(dados):
+    # Valores do empréstimo, de reais para centavos
+    for campo in ("valor_original", "valor_total", "valor_atual", "valor_parcela", "encargos_atraso"):
+        if campo in dados:
+            dados[campo] = para_centavos(dados[campo])
 
-from utils.helpers import pausar
 
 class EmprestimoManager:
     """
     💵 GERENCIADOR DE EMPRÉSTIMOS
     
     Esta classe cuida de tudo relacionado aos empréstimos:
-    - Solicitação de empréstimos
+    - Solicitação de empréstimos (Tabela Price ou SAC)
     - Cálculo de juros
     - Pagamentos e quitação
     
@@ -20,29 +33,44 @@ class EmprestimoManager:
         """
         🏗️ CONSTRUTOR
         
-        Define onde salvar os dados dos empréstimos e carrega os existentes.
+        Abre o repositório de empréstimos (arquivo JSON ou SQLite,
+        conforme utils/config.py) e monta o índice usuário -> empréstimos,
+        separado por status: os empréstimos quitados ficam de fora
+        das consultas do dia a dia.
+        
+        Empréstimos com valores em reais (de antes dos centavos) são
+        convertidos aqui, uma vez só.
+        
+        Cada usuário tem a sua trava. As perguntas (input) são feitas
+        antes de travar; com a trava, o empréstimo e o saldo são
+        conferidos de novo antes de alterar.
         """
-        self.arquivo_emprestimos = "data/emprestimos.json"
-        self.emprestimos = self.carregar_emprestimos()
+        self.emprestimos = abrir_repositorio("emprestimos")
+        self._por_usuario = self.emprestimos.criar_indice("usuario", particao="status")
+        self._travas = TravasPorChave()  # Uma trava por usuário
+        with transacao():
+            migrar_registros(self.emprestimos, _emprestimo_em_centavos)
     
-    def carregar_emprestimos(self):
+    def fechar(self):
         """
-        📂 CARREGAR EMPRÉSTIMOS DO ARQUIVO
+        🔒 FECHAR ARMAZENAMENTO
+        
+        Grava os empréstimos pendentes antes de sair do sistema.
         """
-        if os.path.exists(self.arquivo_emprestimos):
-            try:
-                with open(self.arquivo_emprestimos, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
+        self.emprestimos.fechar()
     
-    def salvar_emprestimos(self):
+    @contextmanager
+    def travar(self, usuario):
         """
-        💾 SALVAR EMPRÉSTIMOS NO ARQUIVO
+        🔐 TRAVAR USUÁRIO
+        
+        Trava os empréstimos do usuário enquanto o bloco roda. No armazenamento
+        "compartilhado", o repositório também fica travado para os
+        outros processos durante o bloco, e é relido antes se outro
+        processo gravou: a conferência vê os dados mais novos.
         """
-        with open(self.arquivo_emprestimos, 'w', encoding='utf-8') as f:
-            json.dump(self.emprestimos, f, indent=2, ensure_ascii=False)
+        with self._travas.travar(usuario), self.emprestimos.exclusivo():
+            yield
     
     def solicitar_emprestimo(self, usuario, usuario_manager, auditoria):
         """
@@ -56,17 +84,17 @@ class EmprestimoManager:
         saldo_atual = usuario_manager.get_saldo(usuario)
         limite_emprestimo = saldo_atual * 5  # Pode pedir até 5x o saldo
         
-        print(f"💰 Seu saldo atual: R$ {saldo_atual:.2f}")
-        print(f"📊 Limite para empréstimo: R$ {limite_emprestimo:.2f}")
+        print(f"💰 Seu saldo atual: {formatar_moeda(saldo_atual)}")
+        print(f"📊 Limite para empréstimo: {formatar_moeda(limite_emprestimo)}")
         print("💹 Taxa de juros: 2% ao mês")
         
-        if limite_emprestimo < 100:
+        if limite_emprestimo < 100 * UM_REAL:
             print("❌ Você precisa ter pelo menos R$ 20,00 de saldo para solicitar empréstimo!")
             pausar()
             return
         
         try:
-            valor = float(input("💰 Valor do empréstimo: R$ "))
+            valor = para_centavos(input("💰 Valor do empréstimo: R$ "))
             parcelas = int(input("📅 Número de parcelas (1-36): "))
             
             if valor <= 0:
@@ -75,7 +103,7 @@ class EmprestimoManager:
                 return
             
             if valor > limite_emprestimo:
-                print(f"❌ Valor excede o limite de R$ {limite_emprestimo:.2f}!")
+                print(f"❌ Valor excede o limite de {formatar_moeda(limite_emprestimo)}!")
                 pausar()
                 return
             
@@ -84,15 +112,24 @@ class EmprestimoManager:
                 pausar()
                 return
             
-            # Calcula o valor total com juros (2% ao mês)
-            valor_total = valor * ((1.02) ** parcelas)
-            valor_parcela = valor_total / parcelas
+            print("\n🧮 Sistema de amortização:")
+            print("1. Tabela Price (parcelas iguais)")
+            print("2. SAC (parcelas decrescentes, menos juros no total)")
+            sistema = "sac" if input("Escolha uma opção (padrão 1): ").strip() == "2" else "price"
+            
+            # Cronograma com juros de 2% ao mês sobre o saldo devedor
+            linhas = cronograma(valor, parcelas, sistema, TAXA_MENSAL)
+            valor_total = sum(linha["parcela"] for linha in linhas)
+            valor_parcela = linhas[0]["parcela"]
             
             print(f"\n📊 SIMULAÇÃO DO EMPRÉSTIMO")
-            print(f"💰 Valor solicitado: R$ {valor:.2f}")
-            print(f"💸 Valor total a pagar: R$ {valor_total:.2f}")
-            print(f"📅 {parcelas}x de R$ {valor_parcela:.2f}")
-            print(f"💹 Total de juros: R$ {valor_total - valor:.2f}")
+            print(f"💰 Valor solicitado: {formatar_moeda(valor)}")
+            print(f"💸 Valor total a pagar: {formatar_moeda(valor_total)}")
+            if sistema == "price":
+                print(f"📅 {parcelas}x de {formatar_moeda(valor_parcela)}")
+            else:
+                print(f"📅 {parcelas} parcelas, de {formatar_moeda(valor_parcela)} até {formatar_moeda(linhas[-1]['parcela'])}")
+            print(f"💹 Total de juros: {formatar_moeda(valor_total - valor)}")
             
             confirma = input("\nConfirma o empréstimo? (s/n): ").strip().lower()
             
@@ -101,31 +138,45 @@ class EmprestimoManager:
                 pausar()
                 return
             
-            # Cria o empréstimo
-            emprestimo_id = f"{usuario}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            
-            self.emprestimos[emprestimo_id] = {
-                "usuario": usuario,
-                "valor_original": valor,
-                "valor_total": valor_total,
-                "valor_atual": valor_total,  # Quanto ainda deve
-                "parcelas_total": parcelas,
-                "parcelas_pagas": 0,
-                "valor_parcela": valor_parcela,
-                "data_emprestimo": datetime.now().isoformat(),
-                "status": "ativo"
-            }
+            # Empréstimo, depósito, histórico e auditoria gravados juntos no
+            # final; o limite é conferido de novo com o usuário travado
+            with self.travar(usuario), transacao():
+                # O saldo pode ter mudado enquanto o cliente respondia
+                limite_emprestimo = usuario_manager.get_saldo(usuario) * 5
+                aprovado = valor <= limite_emprestimo
+                if aprovado:
+                    # Cria o empréstimo
+                    emprestimo_id = f"{usuario}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                    
+                    self.emprestimos[emprestimo_id] = {
+                        "usuario": usuario,
+                        "valor_original": valor,
+                        "valor_total": valor_total,
+                        "valor_atual": valor_total,  # Quanto ainda deve
+                        "parcelas_total": parcelas,
+                        "parcelas_pagas": 0,
+                        "valor_parcela": valor_parcela,  # Valor da próxima parcela
+                        "sistema": sistema,
+                        "taxa_mensal": TAXA_MENSAL,
+                        "data_emprestimo": datetime.now().isoformat(),
+                        "status": "ativo",
+                        MARCA: True
+                    }
+                    
+                    # Adiciona o dinheiro na conta do usuário
+                    usuario_manager.depositar(usuario, valor)
+                    
+                    self.emprestimos.salvar(emprestimo_id)
+                    
+                    # Registra no histórico e auditoria
+                    usuario_manager.adicionar_historico(usuario, TipoTransacao.EMPRESTIMO, valor,
+                                                        referencia=emprestimo_id, detalhe=parcelas)
+                    auditoria.log_acao(usuario, "EMPRESTIMO", f"Empréstimo de {formatar_moeda(valor)} em {parcelas}x")
             
-            # Adiciona o dinheiro na conta do usuário
-            usuario_manager.depositar(usuario, valor)
-            
-            self.salvar_emprestimos()
-            
-            # Registra no histórico e auditoria
-            usuario_manager.adicionar_historico(usuario, f"EMPRÉSTIMO: R$ {valor:.2f} em {parcelas}x")
-            auditoria.log_acao(usuario, "EMPRESTIMO", f"Empréstimo de R$ {valor:.2f} em {parcelas}x")
-            
-            print(f"✅ Empréstimo aprovado e creditado na sua conta!")
+            if aprovado:
+                print(f"✅ Empréstimo aprovado e creditado na sua conta!")
+            else:
+                print(f"❌ Valor excede o limite de {formatar_moeda(limite_emprestimo)}!")
             
         except ValueError:
             print("❌ Valor inválido!")
@@ -137,22 +188,78 @@ class EmprestimoManager:
         📊 OBTER EMPRÉSTIMOS DO USUÁRIO
         
         Esta função retorna todos os empréstimos ativos de um usuário.
+        Só lê os empréstimos ativos dele (os quitados nem são abertos).
         """
+        self.emprestimos.sincronizar()  # Outro processo pode ter pago ou criado um empréstimo
         emprestimos_usuario = []
         
-        for emp_id, dados in self.emprestimos.items():
-            if dados["usuario"] == usuario and dados["status"] == "ativo":
-                emprestimos_usuario.append({
-                    "id": emp_id,
-                    "valor_original": dados["valor_original"],
-                    "valor_atual": dados["valor_atual"],
-                    "parcelas_restantes": dados["parcelas_total"] - dados["parcelas_pagas"],
-                    "valor_parcela": dados["valor_parcela"],
-                    "data_emprestimo": datetime.fromisoformat(dados["data_emprestimo"]).strftime("%d/%m/%Y")
-                })
+        for emp_id in self._por_usuario.chaves(usuario, "ativo"):
+            dados = self.emprestimos[emp_id]
+            emprestimos_usuario.append({
+                "id": emp_id,
+                "valor_original": dados["valor_original"],
+                "valor_atual": dados["valor_atual"],
+                "parcelas_restantes": dados["parcelas_total"] - dados["parcelas_pagas"],
+                "valor_parcela": dados["valor_parcela"],
+                "valor_quitacao": self.valor_quitacao(dados),
+                "parcelas_em_atraso": dados.get("parcelas_em_atraso", 0),
+                "encargos_atraso": dados.get("encargos_atraso", 0),
+                "data_emprestimo": datetime.fromisoformat(dados["data_emprestimo"]).strftime("%d/%m/%Y")
+            })
         
         return emprestimos_usuario
     
+    @staticmethod
+    def _cronograma(dados):
+        """
+        📅 Cronograma de um empréstimo salvo (ver financeiro/amortizacao.py).
+        """
+        return cronograma(dados["valor_original"], dados["parcelas_total"],
+                          dados["sistema"], dados["taxa_mensal"])
+    
+    @staticmethod
+    def valor_quitacao(dados):
+        """
+        💰 VALOR DE QUITAÇÃO
+        
+        Quanto custa quitar o empréstimo hoje: o saldo devedor, sem os
+        juros das parcelas que ainda não venceram, mais os encargos de
+        atraso calculados no último fechamento do mês.
+        
+        Empréstimos antigos (de antes dos cronogramas) têm parcelas
+        iguais: a quitação é o valor hoje das parcelas restantes,
+        descontadas a 2% ao mês.
+        """
+        restantes = dados["parcelas_total"] - dados["parcelas_pagas"]
+        if "sistema" not in dados:
+            saldo = min(valor_presente(dados["valor_parcela"], restantes), dados["valor_atual"])
+        else:
+            saldo = saldo_devedor(dados["valor_original"], dados["parcelas_total"], dados["parcelas_pagas"],
+                                  dados["sistema"], dados["taxa_mensal"])
+        return saldo + dados.get("encargos_atraso", 0)
+    
+    @staticmethod
+    def encargos_da_parcela(dados):
+        """
+        ⚠️ Encargos de atraso cobrados junto com a próxima parcela
+        (a parte da parcela mais antiga em atraso, com os centavos que
+        sobram da divisão).
+        """
+        if not dados.get("parcelas_em_atraso"):
+            return 0
+        return dividir(dados["encargos_atraso"], dados["parcelas_em_atraso"])[0]
+    
+    def emprestimos_ativos(self):
+        """
+        📂 EMPRÉSTIMOS ATIVOS DO BANCO
+        
+        Percorre só os empréstimos ativos de todos os usuários,
+        como pares (id, dados). Útil para relatórios e rotinas
+        que olham a carteira inteira.
+        """
+        for emp_id in self._por_usuario.chaves_da_particao("ativo"):
+            yield emp_id, self.emprestimos[emp_id]
+    
     def mostrar_emprestimos(self, usuario):
         """
         📊 MOSTRAR EMPRÉSTIMOS
@@ -172,15 +279,19 @@ class EmprestimoManager:
         
         for emp in emprestimos:
             print(f"\n💰 Empréstimo de {emp['data_emprestimo']}")
-            print(f"   Valor original: R$ {emp['valor_original']:.2f}")
-            print(f"   Valor atual devido: R$ {emp['valor_atual']:.2f}")
+            print(f"   Valor original: {formatar_moeda(emp['valor_original'])}")
+            print(f"   Valor atual devido: {formatar_moeda(emp['valor_atual'])}")
             print(f"   Parcelas restantes: {emp['parcelas_restantes']}")
-            print(f"   Valor da parcela: R$ {emp['valor_parcela']:.2f}")
+            print(f"   Valor da parcela: {formatar_moeda(emp['valor_parcela'])}")
+            print(f"   Para quitar hoje: {formatar_moeda(emp['valor_quitacao'])}")
+            if emp['parcelas_em_atraso']:
+                print(f"   ⚠️ Parcelas em atraso: {emp['parcelas_em_atraso']} "
+                      f"(encargos: {formatar_moeda(emp['encargos_atraso'])})")
             
             total_devido += emp['valor_atual']
         
         print("\n" + "=" * 60)
-        print(f"💸 Total devido: R$ {total_devido:.2f}")
+        print(f"💸 Total devido: {formatar_moeda(total_devido)}")
     
     def pagar_emprestimo(self, usuario, usuario_manager, auditoria):
         """
@@ -200,7 +311,7 @@ class EmprestimoManager:
         print("\nSeus empréstimos:")
         
         for i, emp in enumerate(emprestimos, 1):
-            print(f"{i}. Empréstimo de {emp['data_emprestimo']} - Devido: R$ {emp['valor_atual']:.2f}")
+            print(f"{i}. Empréstimo de {emp['data_emprestimo']} - Devido: {formatar_moeda(emp['valor_atual'])}")
         
         try:
             escolha = int(input("\nEscolha o empréstimo para pagar: ")) - 1
@@ -212,9 +323,14 @@ class EmprestimoManager:
             
             emprestimo = emprestimos[escolha]
             
-            print(f"\n💰 Valor devido: R$ {emprestimo['valor_atual']:.2f}")
-            print(f"📅 Valor da parcela: R$ {emprestimo['valor_parcela']:.2f}")
+            print(f"\n💰 Valor devido: {formatar_moeda(emprestimo['valor_atual'])}")
+            print(f"📅 Valor da parcela: {formatar_moeda(emprestimo['valor_parcela'])}")
             print(f"🔢 Parcelas restantes: {emprestimo['parcelas_restantes']}")
+            if emprestimo['parcelas_em_atraso']:
+                print(f"⚠️ Parcelas em atraso: {emprestimo['parcelas_em_atraso']} "
+                      f"(encargos: {formatar_moeda(emprestimo['encargos_atraso'])})")
+            print(f"🎉 Para quitar hoje: {formatar_moeda(emprestimo['valor_quitacao'])} "
+                  f"(desconto de {formatar_moeda(emprestimo['valor_atual'] + emprestimo['encargos_atraso'] - emprestimo['valor_quitacao'])} em juros)")
             
             print("\n1. Pagar uma parcela")
             print("2. Quitar completamente")
@@ -222,52 +338,82 @@ class EmprestimoManager:
             opcao = input("Escolha uma opção: ").strip()
             
             if opcao == "1":
-                # Pagar uma parcela
-                valor_pagamento = emprestimo['valor_parcela']
+                # Pagar uma parcela (com os encargos, se ela estiver atrasada).
+                # Com o usuário travado, os valores são lidos de novo: o
+                # empréstimo pode ter sido pago enquanto o cliente escolhia
+                with self.travar(usuario), transacao():
+                    emp_dados = self.emprestimos[emprestimo['id']]
+                    ativo = emp_dados['status'] == "ativo"
+                    pago = False
+                    if ativo:
+                        valor_parcela = emp_dados['valor_parcela']
+                        encargos = self.encargos_da_parcela(emp_dados)
+                        valor_pagamento = valor_parcela + encargos
+                        pago = usuario_manager.sacar(usuario, valor_pagamento)
+                    
+                    if pago:
+                        # Atualiza o empréstimo
+                        emp_dados['valor_atual'] -= valor_parcela
+                        emp_dados['parcelas_pagas'] += 1
+                        if encargos:
+                            emp_dados['encargos_atraso'] -= encargos
+                            emp_dados['parcelas_em_atraso'] -= 1
+                            if not emp_dados['parcelas_em_atraso']:
+                                emp_dados['encargos_atraso'] = 0
+                                emp_dados['situacao'] = "em_dia"
+                        
+                        # Se pagou todas as parcelas, marca como quitado
+                        if emp_dados['parcelas_pagas'] >= emp_dados['parcelas_total']:
+                            emp_dados['status'] = "quitado"
+                            emp_dados['valor_atual'] = 0
+                            print("🎉 Empréstimo quitado completamente!")
+                        elif "sistema" in emp_dados:
+                            # No SAC a próxima parcela é menor que esta
+                            emp_dados['valor_parcela'] = self._cronograma(emp_dados)[emp_dados['parcelas_pagas']]["parcela"]
+                        
+                        self.emprestimos.salvar(emprestimo['id'])
+                        
+                        # Registra no histórico e auditoria
+                        usuario_manager.adicionar_historico(usuario, TipoTransacao.PAGAMENTO_EMPRESTIMO, valor_pagamento,
+                                                            referencia=emprestimo['id'])
+                        auditoria.log_acao(usuario, "PAGAMENTO_EMPRESTIMO", f"Pagamento de parcela - {formatar_moeda(valor_pagamento)}")
                 
-                if not usuario_manager.sacar(usuario, valor_pagamento):
-                    pausar()
-                    return
-                
-                # Atualiza o empréstimo
-                emp_dados = self.emprestimos[emprestimo['id']]
-                emp_dados['valor_atual'] -= valor_pagamento
-                emp_dados['parcelas_pagas'] += 1
-                
-                # Se pagou todas as parcelas, marca como quitado
-                if emp_dados['parcelas_pagas'] >= emp_dados['parcelas_total']:
-                    emp_dados['status'] = "quitado"
-                    print("🎉 Empréstimo quitado completamente!")
-                
-                self.salvar_emprestimos()
-                
-                # Registra no histórico e auditoria
-                usuario_manager.adicionar_historico(usuario, f"PAGAMENTO EMPRÉSTIMO: R$ {valor_pagamento:.2f}")
-                auditoria.log_acao(usuario, "PAGAMENTO_EMPRESTIMO", f"Pagamento de parcela - R$ {valor_pagamento:.2f}")
-                
-                print(f"✅ Parcela paga com sucesso!")
-                print(f"💰 Valor pago: R$ {valor_pagamento:.2f}")
+                if not ativo:
+                    print("❌ Este empréstimo já foi quitado!")
+                elif pago:
+                    print(f"✅ Parcela paga com sucesso!")
+                    print(f"💰 Valor pago: {formatar_moeda(valor_pagamento)}")
                 
             elif opcao == "2":
-                # Quitar completamente
-                valor_quitacao = emprestimo['valor_atual']
-                
-                if not usuario_manager.sacar(usuario, valor_quitacao):
-                    pausar()
-                    return
-                
-                # Marca como quitado
-                self.emprestimos[emprestimo['id']]['status'] = "quitado"
-                self.emprestimos[emprestimo['id']]['valor_atual'] = 0
-                
-                self.salvar_emprestimos()
-                
-                # Registra no histórico e auditoria
-                usuario_manager.adicionar_historico(usuario, f"QUITAÇÃO EMPRÉSTIMO: R$ {valor_quitacao:.2f}")
-                auditoria.log_acao(usuario, "QUITACAO_EMPRESTIMO", f"Quitação completa - R$ {valor_quitacao:.2f}")
+                # Quitar completamente: paga só o saldo devedor (lido de
+                # novo com o usuário travado, como na parcela)
+                with self.travar(usuario), transacao():
+                    emp_dados = self.emprestimos[emprestimo['id']]
+                    ativo = emp_dados['status'] == "ativo"
+                    pago = False
+                    if ativo:
+                        valor_quitacao = self.valor_quitacao(emp_dados)
+                        pago = usuario_manager.sacar(usuario, valor_quitacao)
+                    
+                    if pago:
+                        # Marca como quitado
+                        emp_dados['status'] = "quitado"
+                        emp_dados['valor_atual'] = 0
+                        if "encargos_atraso" in emp_dados:
+                            emp_dados.update(parcelas_em_atraso=0, encargos_atraso=0, situacao="em_dia")
+                        
+                        self.emprestimos.salvar(emprestimo['id'])
+                        
+                        # Registra no histórico e auditoria
+                        usuario_manager.adicionar_historico(usuario, TipoTransacao.QUITACAO_EMPRESTIMO, valor_quitacao,
+                                                            referencia=emprestimo['id'])
+                        auditoria.log_acao(usuario, "QUITACAO_EMPRESTIMO", f"Quitação completa - {formatar_moeda(valor_quitacao)}")
                 
-                print(f"🎉 Empréstimo quitado completamente!")
-                print(f"💰 Valor pago: R$ {valor_quitacao:.2f}")
+                if not ativo:
+                    print("❌ Este empréstimo já foi quitado!")
+                elif pago:
+                    print(f"🎉 Empréstimo quitado completamente!")
+                    print(f"💰 Valor pago: {formatar_moeda(valor_quitacao)}")
             
             else:
                 print("❌ Opção inválida!")
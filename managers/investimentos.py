@@ -1,8 +1,21 @@
-import datetime
-import json
-import os
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from armazenamento.fabrica import abrir_repositorio
+from armazenamento.travas import TravasPorChave
+from armazenamento.unidade_trabalho import transacao
+from financeiro.avaliacao import Carteira, avaliar
+from financeiro.simulacao import simular, simular_carteira
+from utils.dinheiro import MARCA, migrar_registros, para_centavos
+from utils.helpers import formatar_moeda, pausar
+from utils.transacoes import TipoTransacao
+
+
+def _investimento_em_centavos(dados):
+    # Valores da aplicação, de reais para centavos
+    dados["valor_inicial"] = para_centavos(dados["valor_inicial"])
+    dados["valor_atual"] = para_centavos(dados["valor_atual"])
 
-from utils.helpers import pausar
 
 class InvestimentoManager:
     """
@@ -20,38 +33,51 @@ class InvestimentoManager:
         """
         🏗️ CONSTRUTOR
         
-        Define onde salvar os dados dos investimentos e carrega os existentes.
+        Abre o repositório de investimentos (arquivo JSON ou SQLite,
+        conforme utils/config.py). Aplicações com valores em reais
+        (de antes dos centavos) são convertidas aqui, uma vez só.
+        
+        Cada usuário tem a sua trava, pega só depois das perguntas
+        (input), na hora de aplicar ou resgatar.
         """
-        self.arquivo_investimentos = "data/investimentos.json"
-        self.investimentos = self.carregar_investimentos()
+        self.investimentos = abrir_repositorio("investimentos")
+        self._travas = TravasPorChave()  # Uma trava por usuário
+        with transacao():
+            migrar_registros(self.investimentos, _investimento_em_centavos)
         
         # Tipos de investimento disponíveis com suas características
+        # (a volatilidade mensal é usada só nas simulações de risco)
         self.tipos_investimento = {
-            "poupanca": {"nome": "Poupança", "rendimento_mensal": 0.005, "risco": "Baixo"},
-            "cdb": {"nome": "CDB", "rendimento_mensal": 0.008, "risco": "Baixo"},
-            "tesouro": {"nome": "Tesouro Direto", "rendimento_mensal": 0.01, "risco": "Médio"},
-            "acoes": {"nome": "Ações", "rendimento_mensal": 0.015, "risco": "Alto"},
-            "bitcoin": {"nome": "Bitcoin", "rendimento_mensal": 0.02, "risco": "Muito Alto"}
+            "poupanca": {"nome": "Poupança", "rendimento_mensal": 0.005, "risco": "Baixo", "volatilidade_mensal": 0.001},
+            "cdb": {"nome": "CDB", "rendimento_mensal": 0.008, "risco": "Baixo", "volatilidade_mensal": 0.003},
+            "tesouro": {"nome": "Tesouro Direto", "rendimento_mensal": 0.01, "risco": "Médio", "volatilidade_mensal": 0.015},
+            "acoes": {"nome": "Ações", "rendimento_mensal": 0.015, "risco": "Alto", "volatilidade_mensal": 0.07},
+            "bitcoin": {"nome": "Bitcoin", "rendimento_mensal": 0.02, "risco": "Muito Alto", "volatilidade_mensal": 0.2}
         }
     
-    def carregar_investimentos(self):
+    def fechar(self):
         """
-        📂 CARREGAR INVESTIMENTOS DO ARQUIVO
+        🔒 FECHAR ARMAZENAMENTO
+        
+        Grava os investimentos pendentes antes de sair do sistema.
         """
-        if os.path.exists(self.arquivo_investimentos):
-            try:
-                with open(self.arquivo_investimentos, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
+        self.investimentos.fechar()
     
-    def salvar_investimentos(self):
+    @contextmanager
+    def travar(self, usuario):
         """
-        💾 SALVAR INVESTIMENTOS NO ARQUIVO
+        🔐 TRAVAR USUÁRIO
+        
+        Trava os investimentos do usuário enquanto o bloco roda. No armazenamento
+        "compartilhado", o repositório também fica travado para os
+        outros processos durante o bloco, e é relido antes se outro
+        processo gravou: a conferência vê os dados mais novos.
         """
-        with open(self.arquivo_investimentos, 'w', encoding='utf-8') as f:
-            json.dump(self.investimentos, f, indent=2, ensure_ascii=False)
+        with self._travas.travar(usuario), self.investimentos.exclusivo():
+            yield
+    
+    def _volatilidade(self, tipo):
+        return self.tipos_investimento.get(tipo, {}).get("volatilidade_mensal", 0.0)
     
     def nova_aplicacao(self, usuario, usuario_manager, auditoria):
         """
@@ -76,39 +102,52 @@ class InvestimentoManager:
             return
         
         try:
-            valor = float(input("💰 Valor a investir: R$ "))
+            valor = para_centavos(input("💰 Valor a investir: R$ "))
             
             if valor <= 0:
                 print("❌ Valor deve ser positivo!")
                 pausar()
                 return
             
-            # Verifica se tem saldo suficiente
-            if not usuario_manager.sacar(usuario, valor):
+            # Mostra o que pode acontecer em 12 meses antes de confirmar
+            info = self.tipos_investimento[tipo]
+            resultado = simular(valor, info["rendimento_mensal"], info["volatilidade_mensal"], 12)
+            self._mostrar_simulacao(resultado, 12)
+            
+            confirma = input("\nConfirma a aplicação? (s/n): ").strip().lower()
+            if confirma != 's':
+                print("❌ Aplicação cancelada!")
                 pausar()
                 return
             
-            # Cria o investimento
-            investimento_id = f"{usuario}_{tipo}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            
-            self.investimentos[investimento_id] = {
-                "usuario": usuario,
-                "tipo": tipo,
-                "valor_inicial": valor,
-                "valor_atual": valor,
-                "data_aplicacao": datetime.now().isoformat(),
-                "rendimento_mensal": self.tipos_investimento[tipo]["rendimento_mensal"]
-            }
-            
-            self.salvar_investimentos()
-            
-            # Registra no histórico e auditoria
-            usuario_manager.adicionar_historico(usuario, f"INVESTIMENTO: {self.tipos_investimento[tipo]['nome']} - R$ {valor:.2f}")
-            auditoria.log_acao(usuario, "INVESTIMENTO", f"Aplicação em {self.tipos_investimento[tipo]['nome']} - R$ {valor:.2f}")
+            with self.travar(usuario), transacao():
+                # Verifica se tem saldo suficiente
+                aplicado = usuario_manager.sacar(usuario, valor)
+                if aplicado:
+                    # Cria o investimento
+                    investimento_id = f"{usuario}_{tipo}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                    
+                    self.investimentos[investimento_id] = {
+                        "usuario": usuario,
+                        "tipo": tipo,
+                        "valor_inicial": valor,
+                        "valor_atual": valor,
+                        "data_aplicacao": datetime.now().isoformat(),
+                        "rendimento_mensal": self.tipos_investimento[tipo]["rendimento_mensal"],
+                        MARCA: True
+                    }
+                    
+                    self.investimentos.salvar(investimento_id)
+                    
+                    # Registra no histórico e auditoria
+                    usuario_manager.adicionar_historico(usuario, TipoTransacao.INVESTIMENTO, valor, referencia=investimento_id,
+                                                        detalhe=self.tipos_investimento[tipo]['nome'])
+                    auditoria.log_acao(usuario, "INVESTIMENTO", f"Aplicação em {self.tipos_investimento[tipo]['nome']} - {formatar_moeda(valor)}")
             
-            print(f"✅ Investimento realizado com sucesso!")
-            print(f"📈 Tipo: {self.tipos_investimento[tipo]['nome']}")
-            print(f"💰 Valor: R$ {valor:.2f}")
+            if aplicado:
+                print(f"✅ Investimento realizado com sucesso!")
+                print(f"📈 Tipo: {self.tipos_investimento[tipo]['nome']}")
+                print(f"💰 Valor: {formatar_moeda(valor)}")
             
         except ValueError:
             print("❌ Valor inválido!")
@@ -120,35 +159,97 @@ class InvestimentoManager:
         📊 OBTER INVESTIMENTOS DO USUÁRIO
         
         Esta função retorna todos os investimentos de um usuário,
-        atualizando os rendimentos baseado no tempo decorrido.
+        calculando os rendimentos baseado no tempo decorrido.
+        
+        É só uma consulta: o valor atual é calculado na hora e nada
+        é gravado (o menu chama esta função toda vez que é desenhado).
+        O cálculo é uma função pura dos dados da aplicação e do dia,
+        guardada em cache até o dia seguinte.
         """
+        self.investimentos.sincronizar()  # Outro processo pode ter aplicado ou resgatado
         investimentos_usuario = []
-        hoje = datetime.now()
-        
-        for inv_id, dados in self.investimentos.items():
-            if dados["usuario"] == usuario:
-                # Calcula o rendimento baseado no tempo decorrido
-                data_aplicacao = datetime.fromisoformat(dados["data_aplicacao"])
-                meses_decorridos = (hoje - data_aplicacao).days / 30  # Aproximação
-                
-                # Aplica o rendimento composto
-                valor_atual = dados["valor_inicial"] * ((1 + dados["rendimento_mensal"]) ** meses_decorridos)
-                
-                # Atualiza o valor atual no arquivo
-                self.investimentos[inv_id]["valor_atual"] = valor_atual
-                
-                investimentos_usuario.append({
-                    "id": inv_id,
-                    "tipo": self.tipos_investimento[dados["tipo"]]["nome"],
-                    "valor_inicial": dados["valor_inicial"],
-                    "valor_atual": valor_atual,
-                    "rendimento": valor_atual - dados["valor_inicial"],
-                    "data_aplicacao": data_aplicacao.strftime("%d/%m/%Y")
-                })
-        
-        self.salvar_investimentos()
+        hoje = date.today()
+        
+        for inv_id in self.investimentos.chaves_do_usuario(usuario):
+            dados = self.investimentos[inv_id]
+            data_aplicacao = datetime.fromisoformat(dados["data_aplicacao"])
+            
+            # Rendimento composto até hoje (calculado uma vez por dia, ver financeiro/avaliacao.py)
+            valor_atual = avaliar(dados, hoje)
+            
+            investimentos_usuario.append({
+                "id": inv_id,
+                "tipo": self.tipos_investimento[dados["tipo"]]["nome"],
+                "valor_inicial": dados["valor_inicial"],
+                "valor_atual": valor_atual,
+                "rendimento": valor_atual - dados["valor_inicial"],
+                "data_aplicacao": data_aplicacao.strftime("%d/%m/%Y")
+            })
+        
         return investimentos_usuario
     
+    def simular_carteira_usuario(self, usuario, meses):
+        """
+        🎲 SIMULAR CARTEIRA DO USUÁRIO
+        
+        Simula, de uma vez, todos os investimentos do usuário daqui a
+        "meses" meses, partindo do valor de hoje de cada um
+        (ver financeiro/simulacao.py).
+        """
+        posicoes = []
+        for inv_id in self.investimentos.chaves_do_usuario(usuario):
+            dados = self.investimentos[inv_id]
+            posicoes.append((avaliar(dados), dados["rendimento_mensal"], self._volatilidade(dados["tipo"])))
+        return simular_carteira(posicoes, meses)
+    
+    def mostrar_simulacao_carteira(self, usuario):
+        """
+        🎲 MOSTRAR SIMULAÇÃO DA CARTEIRA
+        
+        Pergunta o prazo e mostra os cenários da carteira do usuário.
+        """
+        print(f"\n🎲 SIMULAÇÃO DE RISCO - {usuario}")
+        
+        try:
+            meses = int(input("📅 Prazo da simulação em meses (1-360): "))
+        except ValueError:
+            print("❌ Prazo inválido!")
+            return
+        
+        if meses < 1 or meses > 360:
+            print("❌ Prazo deve ser entre 1 e 360 meses!")
+            return
+        
+        resultado = self.simular_carteira_usuario(usuario, meses)
+        if not resultado["investido"]:
+            print("📝 Você não possui investimentos.")
+            return
+        
+        self._mostrar_simulacao(resultado, meses)
+    
+    @staticmethod
+    def _mostrar_simulacao(resultado, meses):
+        """
+        📋 Mostra os cenários de uma simulação.
+        """
+        percentis = resultado["percentis"]
+        print(f"\n🎲 Cenários em {meses} meses (simulação com vários caminhos possíveis):")
+        print(f"   💰 Valor hoje: {formatar_moeda(resultado['investido'])}")
+        print(f"   📉 Pessimista (5%): {formatar_moeda(percentis[5])}")
+        print(f"   ➖ Provável (50%): {formatar_moeda(percentis[50])}")
+        print(f"   📈 Otimista (95%): {formatar_moeda(percentis[95])}")
+        print(f"   📊 Média: {formatar_moeda(resultado['media'])}")
+        print(f"   ⚠️ Chance de perder dinheiro: {resultado['chance_perda'] * 100:.1f}%")
+    
+    def carteira(self):
+        """
+        🗃️ CARTEIRA DO BANCO
+        
+        Carrega todos os investimentos do banco em colunas, para
+        reavaliar o livro inteiro de uma vez (ver financeiro/avaliacao.py).
+        """
+        return Carteira(self.investimentos.values())
+    
     def mostrar_investimentos(self, usuario):
         """
         📊 MOSTRAR INVESTIMENTOS
@@ -170,18 +271,18 @@ class InvestimentoManager:
         
         for inv in investimentos:
             print(f"\n💰 {inv['tipo']}")
-            print(f"   Valor inicial: R$ {inv['valor_inicial']:.2f}")
-            print(f"   Valor atual: R$ {inv['valor_atual']:.2f}")
-            print(f"   Rendimento: R$ {inv['rendimento']:.2f}")
+            print(f"   Valor inicial: {formatar_moeda(inv['valor_inicial'])}")
+            print(f"   Valor atual: {formatar_moeda(inv['valor_atual'])}")
+            print(f"   Rendimento: {formatar_moeda(inv['rendimento'])}")
             print(f"   Data: {inv['data_aplicacao']}")
             
             total_investido += inv['valor_inicial']
             total_atual += inv['valor_atual']
         
         print("\n" + "=" * 60)
-        print(f"💰 Total investido: R$ {total_investido:.2f}")
-        print(f"📈 Valor atual: R$ {total_atual:.2f}")
-        print(f"💹 Rendimento total: R$ {total_atual - total_investido:.2f}")
+        print(f"💰 Total investido: {formatar_moeda(total_investido)}")
+        print(f"📈 Valor atual: {formatar_moeda(total_atual)}")
+        print(f"💹 Rendimento total: {formatar_moeda(total_atual - total_investido)}")
     
     def resgatar_investimento(self, usuario, usuario_manager, auditoria):
         """
@@ -201,7 +302,7 @@ class InvestimentoManager:
         print("\nSeus investimentos:")
         
         for i, inv in enumerate(investimentos, 1):
-            print(f"{i}. {inv['tipo']} - R$ {inv['valor_atual']:.2f} (Rendimento: R$ {inv['rendimento']:.2f})")
+            print(f"{i}. {inv['tipo']} - {formatar_moeda(inv['valor_atual'])} (Rendimento: {formatar_moeda(inv['rendimento'])})")
         
         try:
             escolha = int(input("\nEscolha o investimento para resgatar: ")) - 1
@@ -214,7 +315,7 @@ class InvestimentoManager:
             investimento = investimentos[escolha]
             
             # Confirma o resgate
-            print(f"\n💰 Valor a resgatar: R$ {investimento['valor_atual']:.2f}")
+            print(f"\n💰 Valor a resgatar: {formatar_moeda(investimento['valor_atual'])}")
             confirma = input("Confirma o resgate? (s/n): ").strip().lower()
             
             if confirma != 's':
@@ -222,19 +323,30 @@ class InvestimentoManager:
                 pausar()
                 return
             
-            # Adiciona o dinheiro na conta
-            usuario_manager.depositar(usuario, investimento['valor_atual'])
-            
-            # Remove o investimento
-            del self.investimentos[investimento['id']]
-            self.salvar_investimentos()
+            # Com o usuário travado, duas sessões não resgatam o mesmo investimento
+            with self.travar(usuario), transacao():
+                # Remove o investimento antes de creditar: se ele já foi
+                # resgatado (ex: em outra sessão), nada é depositado
+                existe = investimento['id'] in self.investimentos
+                if existe:
+                    del self.investimentos[investimento['id']]
+                    self.investimentos.salvar(investimento['id'])
+                    
+                    # Adiciona o dinheiro na conta
+                    usuario_manager.depositar(usuario, investimento['valor_atual'])
+                    
+                    # Registra no histórico e auditoria
+                    usuario_manager.adicionar_historico(usuario, TipoTransacao.RESGATE, investimento['valor_atual'],
+                                                        referencia=investimento['id'], detalhe=investimento['tipo'])
+                    auditoria.log_acao(usuario, "RESGATE", f"Resgate de {investimento['tipo']} - {formatar_moeda(investimento['valor_atual'])}")
             
-            # Registra no histórico e auditoria
-            usuario_manager.adicionar_historico(usuario, f"RESGATE: {investimento['tipo']} - R$ {investimento['valor_atual']:.2f}")
-            auditoria.log_acao(usuario, "RESGATE", f"Resgate de {investimento['tipo']} - R$ {investimento['valor_atual']:.2f}")
+            if not existe:
+                print("❌ Este investimento já foi resgatado!")
+                pausar()
+                return
             
             print(f"✅ Resgate realizado com sucesso!")
-            print(f"💰 Valor creditado: R$ {investimento['valor_atual']:.2f}")
+            print(f"💰 Valor creditado: {formatar_moeda(investimento['valor_atual'])}")
             
         except ValueError:
             print("❌ Opção inválida!")
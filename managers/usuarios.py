@@ -1,8 +1,36 @@
+from contextlib import contextmanager
 from datetime import datetime
-import json
-import os
 
+from armazenamento.fabrica import abrir_repositorio
+from armazenamento.ledger import Ledger
+from armazenamento.travas import TravasPorChave
+from armazenamento.unidade_trabalho import transacao
+from utils import config
+from utils.dinheiro import MARCA, migrar_registros, para_centavos, valor_positivo
 from utils.helpers import pausar
+from utils.transacoes import TipoTransacao, converter_texto, criar_registro, formatar_registro, nova_referencia
+
+# Versão do formato do histórico: 1 = textos prontos, 2 = registros estruturados,
+# 3 = valores em centavos (inteiros)
+VERSAO_HISTORICO = 3
+
+
+def _registro(entrada):
+    # Entradas antigas são textos; as da versão 2 têm o valor em reais (float)
+    if isinstance(entrada, str):
+        return converter_texto(entrada)
+    if isinstance(entrada["valor"], float):
+        return {**entrada, "valor": para_centavos(entrada["valor"])}
+    return entrada
+
+
+def _precisa_migrar(entrada):
+    return isinstance(entrada, str) or isinstance(entrada["valor"], float)
+
+
+def _saldo_em_centavos(dados):
+    dados["saldo"] = para_centavos(dados["saldo"])
+
 
 class UsuarioManager:
     """
@@ -21,38 +49,89 @@ class UsuarioManager:
         """
         🏗️ CONSTRUTOR
         
-        Quando criamos um UsuarioManager, ele automaticamente:
-        - Define onde salvar os dados dos usuários (arquivo JSON)
-        - Carrega os usuários já cadastrados
+        Quando criamos um UsuarioManager, ele automaticamente
+        abre o repositório de usuários (arquivo JSON, journal, shards,
+        indexado ou SQLite, conforme utils/config.py).
+        
+        No modo "indexado" nenhum usuário é lido aqui: o registro
+        completo só é carregado no login ou no primeiro acesso.
+        
+        O histórico de transações não fica no registro do usuário:
+        cada conta tem seu próprio ledger em data/historico/.
+        
+        Cada conta tem a sua trava (ver travar()): várias sessões podem
+        usar o mesmo UsuarioManager ao mesmo tempo, cada uma numa thread.
         """
-        self.arquivo_usuarios = "data/usuarios.json"
-        self.usuarios = self.carregar_usuarios()
+        self.usuarios = abrir_repositorio("usuarios", config.ARMAZENAMENTO_USUARIOS)
+        
+        self._travas = TravasPorChave()  # Uma trava por conta
+        
+        self.ledger = Ledger(config.DIRETORIO_HISTORICO)
+        if self.ledger.versao() < VERSAO_HISTORICO:
+            self._migrar_historico()
+    
+    def _migrar_historico(self):
+        """
+        📦 MIGRAR HISTÓRICO
+        
+        Roda uma vez só (a versão fica gravada em data/historico/VERSAO):
+        - move a lista "historico" de cada usuário para o ledger da conta
+          e tira o campo do registro
+        - converte os textos antigos ("[data] DEPÓSITO: +R$ 10.00") em
+          registros estruturados
+        - passa os valores do histórico e os saldos de reais para centavos
+        
+        Pode ser repetida sem problema se o programa cair no meio.
+        """
+        with transacao():
+            for usuario in list(self.usuarios):
+                dados = self.usuarios[usuario]
+                if "historico" in dados:
+                    self.ledger.reescrever(usuario, [_registro(e) for e in dados.pop("historico")])
+                    self.usuarios.salvar(usuario)
+                    continue
+                
+                entradas = list(self.ledger.ler(usuario))
+                if any(_precisa_migrar(entrada) for entrada in entradas):
+                    self.ledger.reescrever(usuario, [_registro(e) for e in entradas])
+            
+            migrar_registros(self.usuarios, _saldo_em_centavos)
+        self.ledger.gravar_versao(VERSAO_HISTORICO)
     
-    def carregar_usuarios(self):
+    def fechar(self):
         """
-        📂 CARREGAR USUÁRIOS DO ARQUIVO
+        🔒 FECHAR ARMAZENAMENTO
         
-        Esta função lê o arquivo JSON onde estão salvos todos os usuários.
-        Se o arquivo não existir ou estiver corrompido, retorna um dicionário vazio.
+        Grava o que estiver pendente antes de sair do sistema
+        (no modo journal, também espera a compactação terminar).
         """
-        if os.path.exists(self.arquivo_usuarios):
-            try:
-                with open(self.arquivo_usuarios, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except:
-                # Se der erro ao ler o arquivo, retorna dicionário vazio
-                return {}
-        return {}
+        self.usuarios.fechar()
+        self.ledger.fechar()
     
-    def salvar_usuarios(self):
+    @contextmanager
+    def travar(self, *usuarios):
         """
-        💾 SALVAR USUÁRIOS NO ARQUIVO
+        🔐 TRAVAR CONTAS
         
-        Esta função salva todos os dados dos usuários no arquivo JSON.
-        É chamada sempre que algum dado é alterado (saldo, histórico, etc.).
+        Trava as contas informadas enquanto o bloco roda, para que
+        ninguém mexa no saldo delas no meio de uma operação:
+        
+            with usuario_manager.travar(origem, destino):
+                ...
+        
+        Não existe trava geral: operações em contas diferentes seguem
+        em paralelo. As travas são pegas sempre na mesma ordem (a
+        alfabética dos nomes), então duas transferências cruzadas
+        (A -> B e B -> A) nunca ficam uma esperando a outra para
+        sempre. A mesma thread pode travar de novo uma conta que já
+        travou.
+        
+        No armazenamento "compartilhado", o repositório também fica
+        travado para os outros processos durante o bloco, e os saldos
+        são relidos antes se outro processo os alterou.
         """
-        with open(self.arquivo_usuarios, 'w', encoding='utf-8') as f:
-            json.dump(self.usuarios, f, indent=2, ensure_ascii=False)
+        with self._travas.travar(*usuarios), self.usuarios.exclusivo():
+            yield
     
     def cadastrar(self):
         """
@@ -66,6 +145,7 @@ class UsuarioManager:
         
         # Pede o nome de usuário
         usuario = input("👤 Nome de usuário: ").strip()
+        self.usuarios.sincronizar()  # Outro processo pode ter cadastrado o nome
         if not usuario or usuario in self.usuarios:
             print("❌ Usuário inválido ou já existe!")
             pausar()
@@ -82,18 +162,26 @@ class UsuarioManager:
         pergunta = input("❓ Pergunta secreta: ").strip()
         resposta = input("💬 Resposta secreta: ").strip()
         
-        # Cria o registro do usuário com todos os dados iniciais
-        self.usuarios[usuario] = {
-            "senha": senha,
-            "pergunta_secreta": pergunta,
-            "resposta_secreta": resposta,
-            "saldo": 0.0,                    # Começa com saldo zero
-            "pontos": 0,                     # Começa sem pontos
-            "historico": [],                 # Lista vazia de transações
-            "data_cadastro": datetime.now().isoformat()  # Data de quando se cadastrou
-        }
-        
-        self.salvar_usuarios()  # Salva no arquivo
+        with self.travar(usuario):
+            # Confere de novo: o nome pode ter sido usado enquanto as perguntas eram respondidas
+            ja_existe = usuario in self.usuarios
+            if not ja_existe:
+                # Cria o registro do usuário com todos os dados iniciais
+                self.usuarios[usuario] = {
+                    "senha": senha,
+                    "pergunta_secreta": pergunta,
+                    "resposta_secreta": resposta,
+                    "saldo": 0,                      # Começa com saldo zero (em centavos)
+                    "pontos": 0,                     # Começa sem pontos
+                    "data_cadastro": datetime.now().isoformat(),  # Data de quando se cadastrou
+                    MARCA: True                      # Valores já em centavos
+                }
+                self.usuarios.salvar(usuario)  # Salva no arquivo
+        
+        if ja_existe:
+            print("❌ Usuário inválido ou já existe!")
+            pausar()
+            return False
         return True
     
     def login(self):
@@ -107,6 +195,7 @@ class UsuarioManager:
         
         # Pede o nome de usuário
         usuario = input("👤 Usuário: ").strip()
+        self.usuarios.sincronizar()  # A conta pode ter sido criada em outro processo
         if usuario not in self.usuarios:
             print("❌ Usuário não encontrado!")
             pausar()
@@ -135,8 +224,10 @@ class UsuarioManager:
         """
         💰 CONSULTAR SALDO
         
-        Esta função retorna quanto dinheiro o usuário tem na conta.
+        Esta função retorna quanto dinheiro o usuário tem na conta
+        (em centavos).
         """
+        self.usuarios.sincronizar()  # Outro processo pode ter mexido no saldo
         return self.usuarios[usuario]["saldo"]
     
     def get_pontos(self, usuario):
@@ -155,10 +246,11 @@ class UsuarioManager:
         Esta função adiciona pontos de recompensa ao usuário.
         É chamada quando ele faz compras no cartão de crédito.
         """
-        if "pontos" not in self.usuarios[usuario]:
-            self.usuarios[usuario]["pontos"] = 0
-        self.usuarios[usuario]["pontos"] += pontos
-        self.salvar_usuarios()
+        with self.travar(usuario):
+            if "pontos" not in self.usuarios[usuario]:
+                self.usuarios[usuario]["pontos"] = 0
+            self.usuarios[usuario]["pontos"] += pontos
+            self.usuarios.salvar(usuario, ["pontos"])
     
     def remover_pontos(self, usuario, pontos):
         """
@@ -167,25 +259,27 @@ class UsuarioManager:
         Esta função remove pontos do usuário (quando ele troca por dinheiro).
         Garante que os pontos nunca fiquem negativos.
         """
-        if "pontos" not in self.usuarios[usuario]:
-            self.usuarios[usuario]["pontos"] = 0
-        self.usuarios[usuario]["pontos"] = max(0, self.usuarios[usuario]["pontos"] - pontos)
-        self.salvar_usuarios()
+        with self.travar(usuario):
+            if "pontos" not in self.usuarios[usuario]:
+                self.usuarios[usuario]["pontos"] = 0
+            self.usuarios[usuario]["pontos"] = max(0, self.usuarios[usuario]["pontos"] - pontos)
+            self.usuarios.salvar(usuario, ["pontos"])
     
     def depositar(self, usuario, valor):
         """
         💰 FAZER DEPÓSITO
         
         Esta função adiciona dinheiro na conta do usuário.
-        É como colocar dinheiro no banco.
+        É como colocar dinheiro no banco. O valor é em centavos.
         """
-        if valor <= 0:
+        if not valor_positivo(valor):
             print("❌ Valor deve ser positivo!")
             return False
         
-        self.usuarios[usuario]["saldo"] += valor
-        self.adicionar_historico(usuario, f"DEPÓSITO: +R$ {valor:.2f}")
-        self.salvar_usuarios()
+        with self.travar(usuario), transacao():
+            self.usuarios[usuario]["saldo"] += valor
+            self.adicionar_historico(usuario, TipoTransacao.DEPOSITO, valor)
+            self.usuarios.salvar(usuario, ["saldo"])
         return True
     
     def sacar(self, usuario, valor):
@@ -193,19 +287,21 @@ class UsuarioManager:
         💸 FAZER SAQUE
         
         Esta função remove dinheiro da conta do usuário.
-        Só funciona se ele tiver saldo suficiente.
+        Só funciona se ele tiver saldo suficiente. O valor é em centavos.
         """
-        if valor <= 0:
+        if not valor_positivo(valor):
             print("❌ Valor deve ser positivo!")
             return False
         
-        if self.usuarios[usuario]["saldo"] < valor:
-            print("❌ Saldo insuficiente!")
-            return False
-        
-        self.usuarios[usuario]["saldo"] -= valor
-        self.adicionar_historico(usuario, f"SAQUE: -R$ {valor:.2f}")
-        self.salvar_usuarios()
+        with self.travar(usuario), transacao():
+            # O saldo é conferido com a conta travada
+            if self.usuarios[usuario]["saldo"] < valor:
+                print("❌ Saldo insuficiente!")
+                return False
+            
+            self.usuarios[usuario]["saldo"] -= valor
+            self.adicionar_historico(usuario, TipoTransacao.SAQUE, valor)
+            self.usuarios.salvar(usuario, ["saldo"])
         return True
     
     def transferir(self, origem, destino, valor):
@@ -214,41 +310,78 @@ class UsuarioManager:
         
         Esta função transfere dinheiro de um usuário para outro.
         Remove dinheiro da conta de origem e adiciona na conta de destino.
+        O valor é em centavos.
+        
+        As duas contas ficam travadas do começo ao fim (ver travar()).
         """
+        self.usuarios.sincronizar()  # O destino pode ter sido cadastrado em outro processo
         if destino not in self.usuarios:
             print("❌ Usuário de destino não encontrado!")
             return False
         
-        if valor <= 0:
+        if not valor_positivo(valor):
             print("❌ Valor deve ser positivo!")
             return False
         
-        if self.usuarios[origem]["saldo"] < valor:
-            print("❌ Saldo insuficiente!")
-            return False
-        
-        # Remove da conta de origem
-        self.usuarios[origem]["saldo"] -= valor
-        # Adiciona na conta de destino
-        self.usuarios[destino]["saldo"] += valor
-        
-        # Registra no histórico de ambos os usuários
-        self.adicionar_historico(origem, f"TRANSFERÊNCIA ENVIADA para {destino}: -R$ {valor:.2f}")
-        self.adicionar_historico(destino, f"TRANSFERÊNCIA RECEBIDA de {origem}: +R$ {valor:.2f}")
+        # Tudo numa transação só: uma única gravação no final
+        with self.travar(origem, destino), transacao():
+            # O saldo é conferido com as duas contas travadas
+            if self.usuarios[origem]["saldo"] < valor:
+                print("❌ Saldo insuficiente!")
+                return False
+            
+            # Remove da conta de origem
+            self.usuarios[origem]["saldo"] -= valor
+            # Adiciona na conta de destino
+            self.usuarios[destino]["saldo"] += valor
+            
+            # Registra no histórico de ambos os usuários, com a mesma referência
+            referencia = nova_referencia()
+            self.adicionar_historico(origem, TipoTransacao.TRANSFERENCIA_ENVIADA, valor,
+                                     contraparte=destino, referencia=referencia)
+            self.adicionar_historico(destino, TipoTransacao.TRANSFERENCIA_RECEBIDA, valor,
+                                     contraparte=origem, referencia=referencia)
+            
+            self.usuarios.salvar(origem, ["saldo"])
+            self.usuarios.salvar(destino, ["saldo"])
+        return True
+    
+    def pagar_boleto(self, usuario, valor, descricao):
+        """
+        🧾 PAGAR BOLETO
         
-        self.salvar_usuarios()
+        Debita o boleto da conta e registra no histórico, juntos.
+        Retorna False se não houver saldo. O valor é em centavos.
+        """
+        with transacao():
+            if not self.sacar(usuario, valor):
+                return False
+            self.adicionar_historico(usuario, TipoTransacao.BOLETO, valor, detalhe=descricao)
         return True
     
-    def adicionar_historico(self, usuario, transacao):
+    def adicionar_historico(self, usuario, tipo, valor, contraparte=None, referencia=None, detalhe=None):
         """
         📊 ADICIONAR AO HISTÓRICO
         
         Esta função registra uma transação no histórico do usuário.
-        Cada registro inclui data, hora e descrição da operação.
+        O registro guarda tipo (TipoTransacao), valor, contraparte,
+        data e hora e uma referência da operação (gerada se não vier).
+        
+        A transação é anexada no fim do ledger da conta, sem regravar
+        o registro do usuário nem o histórico anterior.
         """
-        timestamp = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        self.usuarios[usuario]["historico"].append(f"[{timestamp}] {transacao}")
-        self.salvar_usuarios()
+        registro = criar_registro(tipo, valor, contraparte=contraparte,
+                                  referencia=referencia or nova_referencia(), detalhe=detalhe)
+        self.ledger.anexar(usuario, registro)
+    
+    def contar_transacoes(self, usuario):
+        """
+        🔢 CONTAR TRANSAÇÕES
+        
+        Esta função retorna quantas transações o usuário já fez,
+        sem ler o histórico (só o tamanho do índice do ledger).
+        """
+        return self.ledger.contar(usuario)
     
     def mostrar_historico(self, usuario):
         """
@@ -258,15 +391,15 @@ class UsuarioManager:
         É como um "extrato bancário".
         """
         print(f"\n📊 HISTÓRICO - {usuario}")
-        historico = self.usuarios[usuario]["historico"]
+        # Lê apenas as últimas 20 transações do fim do ledger
+        historico = self.ledger.ultimos(usuario, 20)
         
         if not historico:
             print("📝 Nenhuma transação encontrada.")
             return
         
-        # Mostra apenas as últimas 20 transações
-        for transacao in historico[-20:]:
-            print(transacao)
+        for registro in historico:
+            print(formatar_registro(registro))
     
     def exportar_historico(self, usuario):
         """
@@ -274,8 +407,9 @@ class UsuarioManager:
         
         Esta função salva o histórico completo do usuário em um arquivo de texto.
         O arquivo é salvo com data e hora no nome para não sobrescrever.
+        As transações são lidas do ledger uma por vez.
         """
-        historico = self.usuarios[usuario]["historico"]
+        historico = self.ledger.ler(usuario)
         nome_arquivo = f"historico_{usuario}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         
         try:
@@ -283,8 +417,8 @@ class UsuarioManager:
                 f.write(f"HISTÓRICO DE TRANSAÇÕES - {usuario}\n")
                 f.write("=" * 50 + "\n\n")
                 
-                for transacao in historico:
-                    f.write(transacao + "\n")
+                for registro in historico:
+                    f.write(formatar_registro(registro) + "\n")
             
             print(f"✅ Histórico exportado para: {nome_arquivo}")
         except Exception as e:
@@ -294,8 +428,12 @@ class UsuarioManager:
         """
         👥 OBTER TODOS OS USUÁRIOS
         
-        Esta função retorna o dicionário com todos os usuários.
+        Esta função retorna o repositório com todos os usuários
+        (funciona como um dicionário nome -> dados).
         É usada principalmente pelo painel administrativo.
+        
+        No modo "shards", percorrer os usuários lê um shard por vez,
+        sem carregar todos na memória.
         """
         return self.usuarios
 
@@ -2,7 +2,7 @@ from json.tool import main
 from utils.helpers import limpar_tela, pausar
 
 
-def menu_admin(admin_manager, usuario_manager, auditoria):
+def menu_admin(admin_manager, usuario_manager, auditoria, investimento_manager):
     """
     🔧 MENU ADMINISTRATIVO
     
@@ -22,7 +22,9 @@ def menu_admin(admin_manager, usuario_manager, auditoria):
         print("3. 📄 Gerar relatório CSV")     # Exportar dados em planilha
         print("4. 📋 Gerar relatório PDF")     # Exportar relatório em PDF
         print("5. 📝 Ver logs de auditoria")   # Ver logs de segurança
-        print("6. 🚪 Sair")                    # Sair do painel admin
+        print("6. 🔍 Consultar logs")          # Filtrar logs por usuário, ação e data
+        print("7. 📈 Investimentos do banco")  # Total investido por tipo, em qualquer data
+        print("8. 🚪 Sair")                    # Sair do painel admin
         
         opcao = input("\nEscolha uma opção: ").strip()
         
@@ -47,6 +49,13 @@ def menu_admin(admin_manager, usuario_manager, auditoria):
             auditoria.mostrar_logs()
             pausar()
         elif opcao == "6":
+            # Busca logs por usuário, ação e período, com paginação
+            auditoria.consultar_logs()
+        elif opcao == "7":
+            # Reavalia a carteira inteira de investimentos
+            admin_manager.mostrar_investimentos_banco(investimento_manager)
+            pausar()
+        elif opcao == "8":
             break  # Sai do painel administrativo
         else:
             print("❌ Opção inválida!")
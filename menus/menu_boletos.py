@@ -1,4 +1,6 @@
-from utils.helpers import limpar_tela, pausar
+from armazenamento.unidade_trabalho import transacao
+from utils.dinheiro import para_centavos
+from utils.helpers import formatar_moeda, limpar_tela, pausar
 
 
 def pagamento_boletos(usuario, usuario_manager, auditoria):
@@ -14,17 +16,17 @@ def pagamento_boletos(usuario, usuario_manager, auditoria):
     print(f"\n🧾 PAGAMENTO DE BOLETOS - {usuario}")
     
     try:
-        valor = float(input("💰 Valor do boleto: R$ "))
+        valor = para_centavos(input("💰 Valor do boleto: R$ "))
         descricao = input("📝 Descrição (ex: Conta de Luz): ")
         
-        if usuario_manager.sacar(usuario, valor):
-            # Adiciona no histórico como pagamento de boleto
-            usuario_manager.adicionar_historico(usuario, f"BOLETO: {descricao} - R$ {valor:.2f}")
-            # Registra no log de auditoria
-            auditoria.log_acao(usuario, "PAGAMENTO_BOLETO", f"Pagamento de boleto: {descricao} - R$ {valor:.2f}")
-            print("✅ Boleto pago com sucesso!")
-        else:
-            print("❌ Saldo insuficiente!")
+        with transacao():
+            # Debita e adiciona no histórico como pagamento de boleto
+            if usuario_manager.pagar_boleto(usuario, valor, descricao):
+                # Registra no log de auditoria
+                auditoria.log_acao(usuario, "PAGAMENTO_BOLETO", f"Pagamento de boleto: {descricao} - {formatar_moeda(valor)}")
+                print("✅ Boleto pago com sucesso!")
+            else:
+                print("❌ Saldo insuficiente!")
     
     except ValueError:
         # Se digitou um valor inválido (não numérico)
@@ -1,7 +1,9 @@
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
-from utils.helpers import limpar_tela, pausar
+from armazenamento.unidade_trabalho import transacao
+from utils.dinheiro import para_centavos
+from utils.helpers import formatar_moeda, limpar_tela, pausar
 
 def menu_cartao(usuario, cartao_manager, usuario_manager, auditoria):
     """
@@ -37,7 +39,7 @@ def menu_cartao(usuario, cartao_manager, usuario_manager, auditoria):
         
         print("\n📋 Seus cartões:")
         for i, cartao in enumerate(cartoes, 1):  # enumerate começa do 1
-            print(f"{i}. Cartão {cartao['numero']} - Limite: R$ {cartao['limite']:.2f}")
+            print(f"{i}. Cartão {cartao['numero']} - Limite: {formatar_moeda(cartao['limite'])}")
         
         print(f"\n{len(cartoes) + 1}. ➕ Solicitar novo cartão")
         print(f"{len(cartoes) + 2}. ⭐ Trocar pontos por saldo")
@@ -87,9 +89,9 @@ def menu_cartao_individual(usuario, cartao, cartao_manager, usuario_manager, aud
         limpar_tela()
         
         print(f"\n💳 CARTÃO {cartao['numero']}")
-        print(f"💰 Limite: R$ {cartao['limite']:.2f}")           # Limite total
-        print(f"💸 Usado: R$ {cartao['usado']:.2f}")             # Quanto já gastou
-        print(f"✅ Disponível: R$ {cartao['limite'] - cartao['usado']:.2f}")  # Quanto ainda pode gastar
+        print(f"💰 Limite: {formatar_moeda(cartao['limite'])}")           # Limite total
+        print(f"💸 Usado: {formatar_moeda(cartao['usado'])}")             # Quanto já gastou
+        print(f"✅ Disponível: {formatar_moeda(cartao['limite'] - cartao['usado'])}")  # Quanto ainda pode gastar
         
         print("\n1. 🛒 Fazer compra")      # Comprar algo
         print("2. 🧾 Ver fatura atual")    # Ver o que deve pagar
@@ -102,19 +104,17 @@ def menu_cartao_individual(usuario, cartao, cartao_manager, usuario_manager, aud
         if opcao == "1":
             # FAZER COMPRA - usar o cartão para comprar algo
             try:
-                valor = float(input("💰 Valor da compra: R$ "))
+                valor = para_centavos(input("💰 Valor da compra: R$ "))
                 parcelas = int(input("📅 Número de parcelas (1-24): "))
                 descricao = input("📝 Descrição da compra: ")
                 
-                # Tenta fazer a compra
-                if cartao_manager.fazer_compra(usuario, cartao['numero'], valor, parcelas, descricao):
-                    pontos_ganhos = int(valor // 10)  # // = divisão inteira
-                    usuario_manager.adicionar_pontos(usuario, pontos_ganhos)
-                    
-                    # Registra a compra no log
-                    auditoria.log_acao(usuario, "COMPRA_CARTAO", 
-                                     f"Compra de R$ {valor:.2f} em {parcelas}x no cartão {cartao['numero']}")
-                    print(f"✅ Compra realizada! Você ganhou {pontos_ganhos} pontos!")
+                # Tenta fazer a compra (cartão, pontos e log gravados juntos)
+                with transacao():
+                    if cartao_manager.fazer_compra(usuario, cartao['numero'], valor, parcelas, descricao,
+                                                   usuario_manager):
+                        # Registra a compra no log
+                        auditoria.log_acao(usuario, "COMPRA_CARTAO", 
+                                         f"Compra de {formatar_moeda(valor)} em {parcelas}x no cartão {cartao['numero']}")
             except ValueError:
                 print("❌ Valor inválido!")
             pausar()
@@ -132,11 +132,12 @@ def menu_cartao_individual(usuario, cartao, cartao_manager, usuario_manager, aud
         elif opcao == "4":
             # PAGAR FATURA - paga a conta do cartão
             try:
-                valor = float(input("💰 Valor do pagamento: R$ "))
-                if cartao_manager.pagar_fatura(usuario, cartao['numero'], valor, usuario_manager):
-                    auditoria.log_acao(usuario, "PAGAMENTO_FATURA", 
-                                     f"Pagamento de R$ {valor:.2f} da fatura do cartão {cartao['numero']}")
-                    print("✅ Pagamento realizado!")
+                valor = para_centavos(input("💰 Valor do pagamento: R$ "))
+                with transacao():
+                    if cartao_manager.pagar_fatura(usuario, cartao['numero'], valor, usuario_manager):
+                        auditoria.log_acao(usuario, "PAGAMENTO_FATURA", 
+                                         f"Pagamento de {formatar_moeda(valor)} da fatura do cartão {cartao['numero']}")
+                        print("✅ Pagamento realizado!")
             except ValueError:
                 print("❌ Valor inválido!")
             pausar()
@@ -1,4 +1,4 @@
-from utils.helpers import limpar_tela, pausar
+from utils.helpers import formatar_moeda, limpar_tela, pausar
 
 
 def menu_emprestimos(usuario, emprestimo_manager, usuario_manager, auditoria):
@@ -17,7 +17,7 @@ def menu_emprestimos(usuario, emprestimo_manager, usuario_manager, auditoria):
         emprestimos = emprestimo_manager.get_emprestimos_usuario(usuario)
         total_divida = sum(emp['valor_atual'] for emp in emprestimos)  # Soma todas as dívidas
         
-        print(f"💸 Total em dívida: R$ {total_divida:.2f}")
+        print(f"💸 Total em dívida: {formatar_moeda(total_divida)}")
         
         print("\n1. 💰 Solicitar empréstimo")   # Pedir dinheiro emprestado
         print("2. 📊 Ver empréstimos")          # Ver dívidas atuais
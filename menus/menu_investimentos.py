@@ -1,4 +1,4 @@
-from utils.helpers import limpar_tela, pausar
+from utils.helpers import formatar_moeda, limpar_tela, pausar
 
 
 def menu_investimentos(usuario, investimento_manager, usuario_manager, auditoria):
@@ -17,12 +17,13 @@ def menu_investimentos(usuario, investimento_manager, usuario_manager, auditoria
         investimentos = investimento_manager.get_investimentos_usuario(usuario)
         total_investido = sum(inv['valor_atual'] for inv in investimentos)  # Soma todos os investimentos
         
-        print(f"💰 Total investido: R$ {total_investido:.2f}")
+        print(f"💰 Total investido: {formatar_moeda(total_investido)}")
         
         print("\n1. 💰 Nova aplicação")        # Investir dinheiro
         print("2. 📊 Ver investimentos")       # Ver aplicações atuais
         print("3. 💸 Resgatar investimento")   # Tirar dinheiro investido
-        print("4. 🔙 Voltar")                  # Voltar ao menu anterior
+        print("4. 🎲 Simular risco")           # Cenários da carteira no futuro
+        print("5. 🔙 Voltar")                  # Voltar ao menu anterior
         
         opcao = input("\nEscolha uma opção: ").strip()
         
@@ -37,6 +38,10 @@ def menu_investimentos(usuario, investimento_manager, usuario_manager, auditoria
             # Permite resgatar (tirar) dinheiro dos investimentos
             investimento_manager.resgatar_investimento(usuario, usuario_manager, auditoria)
         elif opcao == "4":
+            # Mostra os cenários possíveis da carteira do usuário
+            investimento_manager.mostrar_simulacao_carteira(usuario)
+            pausar()
+        elif opcao == "5":
             break  # Volta ao menu anterior
         else:
             print("❌ Opção inválida!")
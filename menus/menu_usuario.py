@@ -2,7 +2,9 @@ from .menu_cartao import menu_cartao
 from .menu_emprestimos import menu_emprestimos
 from .menu_investimentos import menu_investimentos
 from .menu_boletos import pagamento_boletos
-from utils.helpers import limpar_tela, pausar
+from armazenamento.unidade_trabalho import transacao
+from utils.dinheiro import para_centavos
+from utils.helpers import formatar_moeda, limpar_tela, pausar
 
 
 def menu_usuario(usuario, usuario_manager, cartao_manager, investimento_manager, emprestimo_manager, auditoria):
@@ -23,7 +25,7 @@ def menu_usuario(usuario, usuario_manager, cartao_manager, investimento_manager,
         
         # Mostra as informações do usuário
         print(f"\n👋 Bem-vindo, {usuario}!")
-        print(f"💰 Saldo: R$ {saldo:.2f}")      # .2f = duas casas decimais
+        print(f"💰 Saldo: {formatar_moeda(saldo)}")      # Saldo em centavos, mostrado como R$ 1.234,56
         print(f"⭐ Pontos: {pontos}")
         
         print("\n📋 MENU DO USUÁRIO")
@@ -43,11 +45,13 @@ def menu_usuario(usuario, usuario_manager, cartao_manager, investimento_manager,
         if opcao == "1":
             # DEPÓSITO - adicionar dinheiro na conta
             try:
-                valor = float(input("💰 Valor do depósito: R$ "))
-                if usuario_manager.depositar(usuario, valor):
-                    # Registra a operação no log de auditoria
-                    auditoria.log_acao(usuario, "DEPOSITO", f"Depósito de R$ {valor:.2f}")
-                    print("✅ Depósito realizado com sucesso!")
+                valor = para_centavos(input("💰 Valor do depósito: R$ "))
+                # Operação e auditoria gravadas juntas, uma vez só
+                with transacao():
+                    if usuario_manager.depositar(usuario, valor):
+                        # Registra a operação no log de auditoria
+                        auditoria.log_acao(usuario, "DEPOSITO", f"Depósito de {formatar_moeda(valor)}")
+                        print("✅ Depósito realizado com sucesso!")
             except ValueError:
                 print("❌ Valor inválido!")
             pausar()
@@ -55,10 +59,11 @@ def menu_usuario(usuario, usuario_manager, cartao_manager, investimento_manager,
         elif opcao == "2":
             # SAQUE - tirar dinheiro da conta
             try:
-                valor = float(input("💸 Valor do saque: R$ "))
-                if usuario_manager.sacar(usuario, valor):
-                    auditoria.log_acao(usuario, "SAQUE", f"Saque de R$ {valor:.2f}")
-                    print("✅ Saque realizado com sucesso!")
+                valor = para_centavos(input("💸 Valor do saque: R$ "))
+                with transacao():
+                    if usuario_manager.sacar(usuario, valor):
+                        auditoria.log_acao(usuario, "SAQUE", f"Saque de {formatar_moeda(valor)}")
+                        print("✅ Saque realizado com sucesso!")
             except ValueError:
                 print("❌ Valor inválido!")
             pausar()
@@ -67,10 +72,11 @@ def menu_usuario(usuario, usuario_manager, cartao_manager, investimento_manager,
             # TRANSFERÊNCIA - enviar dinheiro para outro usuário
             destino = input("🎯 Usuário de destino: ")
             try:
-                valor = float(input("💰 Valor da transferência: R$ "))
-                if usuario_manager.transferir(usuario, destino, valor):
-                    auditoria.log_acao(usuario, "TRANSFERENCIA", f"Transferência de R$ {valor:.2f} para {destino}")
-                    print("✅ Transferência realizada com sucesso!")
+                valor = para_centavos(input("💰 Valor da transferência: R$ "))
+                with transacao():
+                    if usuario_manager.transferir(usuario, destino, valor):
+                        auditoria.log_acao(usuario, "TRANSFERENCIA", f"Transferência de {formatar_moeda(valor)} para {destino}")
+                        print("✅ Transferência realizada com sucesso!")
             except ValueError:
                 print("❌ Valor inválido!")
             pausar()
@@ -104,6 +110,7 @@ def menu_usuario(usuario, usuario_manager, cartao_manager, investimento_manager,
         elif opcao == "10":
             # LOGOUT - sai da conta do usuário
             auditoria.log_acao(usuario, "LOGOUT", "Logout realizado")
+            auditoria.descarregar()  # Garante que os logs da sessão foram gravados
             break  # Sai do loop e volta para o menu principal
         
         else:
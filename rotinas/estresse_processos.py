@@ -0,0 +1,193 @@
+"""
+🧪 TESTE DE ESTRESSE ENTRE PROCESSOS
+
+Simula vários "python main.py" abertos na mesma pasta data/: cria
+contas numa pasta temporária (os dados de data/ não são tocados) e
+dispara vários processos, cada um com o seu UsuarioManager, fazendo
+depósitos e transferências aleatórias nas mesmas contas. No final
+confere, como o teste de estresse das transferências:
+
+- o saldo total é o do começo mais os depósitos (nenhum depósito sumiu)
+- nenhum saldo ficou negativo
+- o saldo de cada conta bate com o seu histórico
+
+e mede a disputa pela trava: quanto tempo os processos esperaram uns
+pelos outros, quantas vezes a cópia em memória estava velha e teve de
+ser atualizada e quantos campos não puderam ser juntados.
+
+Com --armazenamento json (sem versão nem trava) o teste mostra o
+problema que o modo "compartilhado" resolve: um processo regrava o
+arquivo por cima do outro e depósitos somem. Sai com código 1 se
+alguma conferência falhar.
+
+Uso (na pasta do projeto):
+
+    python -m rotinas.estresse_processos [--contas N] [--processos N] [--operacoes N] [--armazenamento compartilhado|json]
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+import os
+import random
+import sys
+import tempfile
+import time
+
+from rotinas.estresse_transferencias import SALDO_INICIAL, _criar_contas, conferir
+from utils import config
+from utils.dinheiro import UM_REAL
+
+CONTAS = 50
+PROCESSOS = 4
+OPERACOES = 4000                # Total, divididas entre os processos
+PROPORCAO_DEPOSITOS = 0.5       # O resto são transferências
+ARMAZENAMENTO = "compartilhado"
+
+
+def _abrir(pasta, armazenamento):
+    """
+    UsuarioManager com os dados na pasta do teste.
+    """
+    from managers.usuarios import UsuarioManager
+
+    os.chdir(pasta)
+    config.ARMAZENAMENTO_USUARIOS = armazenamento
+    config.DIRETORIO_HISTORICO = "data/historico"  # Caminho padrão (relativo), dentro da pasta
+    return UsuarioManager()
+
+
+def _sessao(pasta, armazenamento, nomes, operacoes, semente):
+    """
+    ⚙️ Um processo do teste: faz "operacoes" depósitos e transferências
+    sorteados e retorna o que fez e quanto esperou pela trava. Um erro
+    (ex: arquivo lido pela metade no modo json) encerra o processo e
+    vai no resumo.
+    """
+    usuario_manager = _abrir(pasta, armazenamento)
+    sorteio = random.Random(semente)
+    depositado = 0
+    aceitas = 0
+    erro = None
+
+    inicio = time.perf_counter()
+    # As recusas por saldo insuficiente ("❌ Saldo insuficiente!") não são mostradas
+    with open(os.devnull, "w") as silencio, redirect_stdout(silencio):
+        try:
+            for _ in range(operacoes):
+                if sorteio.random() < PROPORCAO_DEPOSITOS:
+                    valor = sorteio.randint(1, 100 * UM_REAL)
+                    if usuario_manager.depositar(sorteio.choice(nomes), valor):
+                        depositado += valor
+                        aceitas += 1
+                else:
+                    origem, destino = sorteio.sample(nomes, 2)
+                    if usuario_manager.transferir(origem, destino, sorteio.randint(1, SALDO_INICIAL // 2)):
+                        aceitas += 1
+        except Exception as excecao:
+            erro = f"{type(excecao).__name__}: {excecao}"
+    duracao = time.perf_counter() - inicio
+
+    usuario_manager.fechar()
+    repositorio = usuario_manager.usuarios
+    return {
+        "erro": erro,
+        "depositado": depositado,
+        "aceitas": aceitas,
+        "tempo": duracao,
+        "espera": getattr(repositorio, "espera", 0.0),
+        "recargas": getattr(repositorio, "recargas", 0),
+        "conflitos": getattr(repositorio, "conflitos", 0),
+    }
+
+
+def estressar(contas=CONTAS, processos=PROCESSOS, operacoes=OPERACOES, armazenamento=ARMAZENAMENTO, semente=None):
+    """
+    🧪 TESTE DE ESTRESSE ENTRE PROCESSOS
+
+    Roda o teste numa pasta temporária e retorna um resumo com
+    contagens, tempos (em segundos) e os problemas encontrados.
+    """
+    pasta_original = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="solabank_processos_") as pasta:
+        os.makedirs(os.path.join(pasta, "data"))
+        try:
+            usuario_manager = _abrir(pasta, armazenamento)
+            nomes = _criar_contas(usuario_manager, contas)
+            usuario_manager.fechar()
+
+            sorteio = random.Random(semente)
+            base, sobra = divmod(operacoes, processos)
+            partes = [base + 1 if i < sobra else base for i in range(processos)]
+
+            inicio = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=processos) as executor:
+                futuros = [executor.submit(_sessao, pasta, armazenamento, nomes, quantidade, sorteio.random())
+                           for quantidade in partes]
+                sessoes = [futuro.result() for futuro in futuros]
+            duracao = time.perf_counter() - inicio
+
+            depositado = sum(sessao["depositado"] for sessao in sessoes)
+            usuario_manager = _abrir(pasta, armazenamento)
+            problemas = [f"Processo {numero}: {sessao['erro']}"
+                         for numero, sessao in enumerate(sessoes, 1) if sessao["erro"]]
+            problemas += conferir(usuario_manager, nomes, depositado)
+            usuario_manager.fechar()
+        finally:
+            os.chdir(pasta_original)
+
+    return {
+        "contas": contas,
+        "processos": processos,
+        "operacoes": operacoes,
+        "armazenamento": armazenamento,
+        "aceitas": sum(sessao["aceitas"] for sessao in sessoes),
+        "tempo": duracao,
+        "tempo_sessoes": sum(sessao["tempo"] for sessao in sessoes),
+        "espera": sum(sessao["espera"] for sessao in sessoes),
+        "recargas": sum(sessao["recargas"] for sessao in sessoes),
+        "conflitos": sum(sessao["conflitos"] for sessao in sessoes),
+        "problemas": problemas,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de estresse do SOLABANK com vários processos")
+    parser.add_argument("--contas", type=int, default=CONTAS, help=f"quantas contas (padrão {CONTAS})")
+    parser.add_argument("--processos", type=int, default=PROCESSOS,
+                        help=f"quantos processos em paralelo (padrão {PROCESSOS})")
+    parser.add_argument("--operacoes", type=int, default=OPERACOES,
+                        help=f"total de depósitos e transferências (padrão {OPERACOES})")
+    parser.add_argument("--armazenamento", choices=("compartilhado", "json"), default=ARMAZENAMENTO,
+                        help=f"backend dos usuários (padrão {ARMAZENAMENTO})")
+    parser.add_argument("--semente", type=int, help="semente do sorteio, para repetir um teste")
+    args = parser.parse_args()
+
+    if args.contas < 2 or args.processos < 1:
+        parser.error("são necessárias pelo menos 2 contas e 1 processo")
+
+    resumo = estressar(args.contas, args.processos, args.operacoes, args.armazenamento, args.semente)
+
+    print("🧪 TESTE DE ESTRESSE ENTRE PROCESSOS")
+    print("=" * 50)
+    print(f"👥 Contas: {resumo['contas']} | ⚙️ Processos: {resumo['processos']} | "
+          f"🗄️ Armazenamento: {resumo['armazenamento']}")
+    print(f"🔄 Operações: {resumo['operacoes']} ({resumo['aceitas']} aceitas)")
+    print(f"⏱️ Tempo: {resumo['tempo']:.3f}s")
+    if resumo["tempo"] > 0:
+        print(f"🚀 {resumo['operacoes'] / resumo['tempo']:.0f} operações/s")
+    if resumo["tempo_sessoes"] > 0:
+        print(f"🔐 Espera pela trava: {resumo['espera']:.3f}s "
+              f"({resumo['espera'] / resumo['tempo_sessoes']:.0%} do tempo dos processos)")
+    print(f"🔄 Recargas: {resumo['recargas']} | ⚠️ Conflitos: {resumo['conflitos']}")
+
+    if resumo["problemas"]:
+        print(f"❌ {len(resumo['problemas'])} problema(s):")
+        for problema in resumo["problemas"][:20]:
+            print(f"   • {problema}")
+        sys.exit(1)
+    print("✅ Nenhum depósito perdido e saldos batendo com os históricos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+🧪 TESTE DE ESTRESSE DAS TRANSFERÊNCIAS
+
+Confere que as travas por conta do UsuarioManager aguentam várias
+sessões ao mesmo tempo. Cria contas numa pasta temporária (os dados de
+data/ não são tocados), dispara transferências aleatórias entre elas a
+partir de várias threads e, no final, confere:
+
+- o saldo total do banco é o mesmo do começo (dinheiro não some nem aparece)
+- nenhum saldo ficou negativo
+- o saldo de cada conta bate com o seu histórico (inicial + recebido - enviado)
+
+Durante o teste as threads trocam de vez com muito mais frequência que
+o normal, para provocar disputas. Sai com código 1 se alguma conferência
+falhar.
+
+Uso (na pasta do projeto):
+
+    python -m rotinas.estresse_transferencias [--contas N] [--threads N] [--transferencias N]
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from datetime import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+from armazenamento.unidade_trabalho import transacao
+from utils import config
+from utils.dinheiro import MARCA, UM_REAL
+from utils.helpers import formatar_moeda
+from utils.transacoes import TipoTransacao
+
+CONTAS = 50
+THREADS = 16
+TRANSFERENCIAS = 20000
+SALDO_INICIAL = 1000 * UM_REAL     # R$ 1.000,00 por conta
+INTERVALO_TROCA = 0.00001          # Segundos entre trocas de thread durante o teste
+
+
+def _criar_contas(usuario_manager, contas):
+    """
+    Cria as contas do teste, todas com SALDO_INICIAL.
+    """
+    nomes = [f"conta{numero:04d}" for numero in range(contas)]
+    with transacao():
+        for nome in nomes:
+            usuario_manager.usuarios[nome] = {
+                "senha": "",
+                "pergunta_secreta": "",
+                "resposta_secreta": "",
+                "saldo": SALDO_INICIAL,
+                "pontos": 0,
+                "data_cadastro": datetime.now().isoformat(),
+                MARCA: True
+            }
+            usuario_manager.usuarios.salvar(nome)
+    return nomes
+
+
+def _transferir(usuario_manager, nomes, quantidade, semente):
+    """
+    ⚙️ Uma sessão: faz "quantidade" transferências entre contas sorteadas
+    e retorna quantas foram aceitas.
+    """
+    sorteio = random.Random(semente)
+    aceitas = 0
+    for _ in range(quantidade):
+        origem, destino = sorteio.sample(nomes, 2)
+        if usuario_manager.transferir(origem, destino, sorteio.randint(1, SALDO_INICIAL // 2)):
+            aceitas += 1
+    return aceitas
+
+
+def conferir(usuario_manager, nomes, depositado=0):
+    """
+    🔍 Confere saldos e históricos das contas do teste e retorna a
+    lista de problemas encontrados (vazia se está tudo certo).
+    "depositado" é o total de depósitos feitos durante o teste.
+    """
+    problemas = []
+    total = sum(usuario_manager.get_saldo(nome) for nome in nomes)
+    esperado = SALDO_INICIAL * len(nomes) + depositado
+    if total != esperado:
+        problemas.append(f"Saldo total {formatar_moeda(total)}, esperado {formatar_moeda(esperado)}")
+
+    for nome in nomes:
+        saldo = usuario_manager.get_saldo(nome)
+        if saldo < 0:
+            problemas.append(f"{nome}: saldo negativo ({formatar_moeda(saldo)})")
+
+        movimento = 0
+        for entrada in usuario_manager.ledger.ler(nome):
+            if entrada["tipo"] in (TipoTransacao.TRANSFERENCIA_RECEBIDA.value, TipoTransacao.DEPOSITO.value):
+                movimento += entrada["valor"]
+            elif entrada["tipo"] == TipoTransacao.TRANSFERENCIA_ENVIADA.value:
+                movimento -= entrada["valor"]
+        if SALDO_INICIAL + movimento != saldo:
+            problemas.append(f"{nome}: saldo {formatar_moeda(saldo)}, pelo histórico "
+                             f"{formatar_moeda(SALDO_INICIAL + movimento)}")
+    return problemas
+
+
+def estressar(contas=CONTAS, threads=THREADS, transferencias=TRANSFERENCIAS, semente=None):
+    """
+    🧪 TESTE DE ESTRESSE
+
+    Roda o teste numa pasta temporária e retorna um resumo com
+    contagens, tempo (em segundos) e os problemas encontrados.
+    """
+    from managers.usuarios import UsuarioManager
+
+    pasta_original = os.getcwd()
+    caminhos_originais = config.ARQUIVO_SQLITE, config.DIRETORIO_HISTORICO
+    intervalo_original = sys.getswitchinterval()
+    with tempfile.TemporaryDirectory(prefix="solabank_estresse_") as pasta:
+        os.chdir(pasta)
+        try:
+            # Caminhos padrão (relativos), para tudo cair na pasta temporária
+            config.ARQUIVO_SQLITE = "data/solabank.db"
+            config.DIRETORIO_HISTORICO = "data/historico"
+            os.makedirs("data")
+            usuario_manager = UsuarioManager()
+            nomes = _criar_contas(usuario_manager, contas)
+
+            sorteio = random.Random(semente)
+            base, sobra = divmod(transferencias, threads)
+            partes = [base + 1 if i < sobra else base for i in range(threads)]
+
+            sys.setswitchinterval(INTERVALO_TROCA)
+            inicio = time.perf_counter()
+            try:
+                # As recusas por saldo insuficiente ("❌ Saldo insuficiente!") não são mostradas
+                with open(os.devnull, "w") as silencio, redirect_stdout(silencio):
+                    with ThreadPoolExecutor(max_workers=threads) as executor:
+                        futuros = [executor.submit(_transferir, usuario_manager, nomes, quantidade, sorteio.random())
+                                   for quantidade in partes]
+                        aceitas = sum(futuro.result() for futuro in futuros)
+            finally:
+                sys.setswitchinterval(intervalo_original)
+            duracao = time.perf_counter() - inicio
+
+            problemas = conferir(usuario_manager, nomes)
+            usuario_manager.fechar()
+        finally:
+            os.chdir(pasta_original)
+            config.ARQUIVO_SQLITE, config.DIRETORIO_HISTORICO = caminhos_originais
+
+    return {
+        "contas": contas,
+        "threads": threads,
+        "transferencias": transferencias,
+        "aceitas": aceitas,
+        "tempo": duracao,
+        "problemas": problemas,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de estresse das transferências do SOLABANK")
+    parser.add_argument("--contas", type=int, default=CONTAS, help=f"quantas contas (padrão {CONTAS})")
+    parser.add_argument("--threads", type=int, default=THREADS, help=f"quantas sessões em paralelo (padrão {THREADS})")
+    parser.add_argument("--transferencias", type=int, default=TRANSFERENCIAS,
+                        help=f"total de transferências (padrão {TRANSFERENCIAS})")
+    parser.add_argument("--semente", type=int, help="semente do sorteio, para repetir um teste")
+    args = parser.parse_args()
+
+    if args.contas < 2 or args.threads < 1:
+        parser.error("são necessárias pelo menos 2 contas e 1 thread")
+
+    resumo = estressar(args.contas, args.threads, args.transferencias, args.semente)
+
+    print("🧪 TESTE DE ESTRESSE DAS TRANSFERÊNCIAS")
+    print("=" * 50)
+    print(f"👥 Contas: {resumo['contas']} | 🧵 Threads: {resumo['threads']}")
+    print(f"🔄 Transferências: {resumo['transferencias']} ({resumo['aceitas']} aceitas)")
+    print(f"⏱️ Tempo: {resumo['tempo']:.3f}s")
+    if resumo["tempo"] > 0:
+        print(f"🚀 {resumo['transferencias'] / resumo['tempo']:.0f} transferências/s")
+
+    if resumo["problemas"]:
+        print(f"❌ {len(resumo['problemas'])} problema(s):")
+        for problema in resumo["problemas"][:20]:
+            print(f"   • {problema}")
+        sys.exit(1)
+    print("✅ Saldo total conservado e saldos batendo com os históricos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+🌙 FECHAMENTO DO MÊS DOS EMPRÉSTIMOS
+
+Rotina em lote que passa por todos os empréstimos ativos do banco e,
+para a data de fechamento (padrão: hoje), calcula:
+
+- parcelas_vencidas: quantas parcelas já venceram (a parcela k vence
+  30 * k dias depois do empréstimo)
+- parcelas_em_atraso: vencidas que ainda não foram pagas
+- encargos_atraso: multa de 2% sobre cada parcela atrasada mais juros de
+  mora de 1% ao mês, proporcionais aos dias de atraso (em centavos,
+  arredondados parcela a parcela)
+- situacao: "em_dia" ou "em_atraso"
+
+Os encargos são recalculados do zero a cada fechamento (rodar duas vezes
+na mesma data dá o mesmo resultado). Todas as alterações são gravadas
+numa única transação no final; empréstimos que não mudaram nem são
+regravados.
+
+Com muitos empréstimos, o cálculo é dividido em lotes e espalhado por
+vários processos.
+
+Uso (na pasta do projeto):
+
+    python -m rotinas.fechamento_emprestimos [--data DD/MM/AAAA] [--processos N]
+"""
+
+import argparse
+from datetime import date, datetime
+import time
+
+from armazenamento.unidade_trabalho import transacao
+from financeiro.amortizacao import cronogramas
+from rotinas.lotes import processar_em_lotes
+from utils.dinheiro import arredondar
+from utils.helpers import formatar_moeda
+
+MULTA_ATRASO = 0.02        # 2% sobre a parcela atrasada
+JUROS_MORA_MENSAL = 0.01   # 1% ao mês, proporcional aos dias de atraso
+DIAS_POR_PARCELA = 30
+LIMITE_PARALELO = 5000     # A partir de quantos empréstimos vale a pena usar processos
+
+CAMPOS = ("parcelas_vencidas", "parcelas_em_atraso", "encargos_atraso", "situacao")
+
+
+def _valores_das_parcelas(lote):
+    """
+    Valor de cada parcela de cada empréstimo do lote (uma lista por
+    empréstimo). Os cronogramas Price e SAC são gerados de uma vez,
+    um lote vetorizado por sistema e taxa (a taxa fica gravada em cada
+    empréstimo, então contratos de épocas diferentes podem ter taxas
+    diferentes); empréstimos antigos têm parcelas iguais.
+    """
+    valores = [None] * len(lote)
+    grupos = {}  # (sistema, taxa) -> posições no lote
+    for i, (_, dados) in enumerate(lote):
+        if dados.get("sistema") in ("price", "sac"):
+            grupos.setdefault((dados["sistema"], dados["taxa_mensal"]), []).append(i)
+    for (sistema, taxa), posicoes in grupos.items():
+        matriz = cronogramas([lote[i][1]["valor_original"] for i in posicoes],
+                             [lote[i][1]["parcelas_total"] for i in posicoes],
+                             sistema, taxa)["parcela"]
+        for linha, i in zip(matriz, posicoes):
+            valores[i] = linha
+    for i, (_, dados) in enumerate(lote):
+        if valores[i] is None:
+            valores[i] = [dados["valor_parcela"]] * dados["parcelas_total"]
+    return valores
+
+
+def _processar_lote(lote, data_base):
+    """
+    ⚙️ Calcula o fechamento de um lote de pares (id, dados).
+
+    Roda dentro dos processos auxiliares: recebe e devolve só dados
+    simples. Devolve pares (id, campos) com os novos valores de CAMPOS.
+    """
+    resultado = []
+    for (emp_id, dados), parcelas in zip(lote, _valores_das_parcelas(lote)):
+        inicio = datetime.fromisoformat(dados["data_emprestimo"]).date()
+        dias = (data_base - inicio).days
+        vencidas = min(max(dias // DIAS_POR_PARCELA, 0), dados["parcelas_total"])
+        pagas = dados["parcelas_pagas"]
+
+        encargos = 0
+        for numero in range(pagas + 1, vencidas + 1):
+            dias_atraso = dias - numero * DIAS_POR_PARCELA
+            encargos += arredondar(int(parcelas[numero - 1]) * (
+                MULTA_ATRASO + JUROS_MORA_MENSAL * dias_atraso / DIAS_POR_PARCELA))
+
+        em_atraso = max(vencidas - pagas, 0)
+        resultado.append((emp_id, {
+            "parcelas_vencidas": vencidas,
+            "parcelas_em_atraso": em_atraso,
+            "encargos_atraso": encargos,
+            "situacao": "em_atraso" if em_atraso else "em_dia",
+        }))
+    return resultado
+
+
+def fechar_emprestimos(emprestimo_manager, data_base=None, processos=None, auditoria=None):
+    """
+    🌙 FECHAMENTO DO MÊS
+
+    Calcula parcelas vencidas, atrasos e encargos de todos os empréstimos
+    ativos e grava tudo numa única transação.
+
+    processos: quantos processos usar no cálculo (padrão: um por CPU
+    quando a carteira passa de LIMITE_PARALELO empréstimos; 1 = tudo
+    no processo atual).
+
+    Retorna um resumo com contagens e tempos (em segundos).
+    """
+    data_base = data_base or date.today()
+    inicio = time.perf_counter()
+
+    # Leitura: só os empréstimos ativos, pelo índice de status
+    carteira = [(emp_id, dict(dados)) for emp_id, dados in emprestimo_manager.emprestimos_ativos()]
+    lido = time.perf_counter()
+
+    # Cálculo: em lotes, espalhados por processos quando a carteira é grande
+    partes, processos = processar_em_lotes(_processar_lote, carteira, data_base,
+                                           processos, LIMITE_PARALELO)
+    calculado = time.perf_counter()
+
+    # Gravação: tudo numa transação só
+    emprestimos = emprestimo_manager.emprestimos
+    evitadas_antes = emprestimos.escritas_evitadas
+    em_atraso = 0
+    encargos = 0
+    with transacao():
+        for parte in partes:
+            for emp_id, campos in parte:
+                emprestimos[emp_id].update(campos)
+                emprestimos.salvar(emp_id, list(CAMPOS))
+                if campos["parcelas_em_atraso"]:
+                    em_atraso += 1
+                    encargos += campos["encargos_atraso"]
+        if auditoria is not None:
+            auditoria.log_acao("SISTEMA", "FECHAMENTO_EMPRESTIMOS",
+                               f"Fechamento de {data_base.strftime('%d/%m/%Y')}: {len(carteira)} empréstimos, "
+                               f"{em_atraso} em atraso, {formatar_moeda(encargos)} em encargos")
+    gravado = time.perf_counter()
+
+    return {
+        "emprestimos": len(carteira),
+        "em_atraso": em_atraso,
+        "encargos": encargos,
+        "alterados": len(carteira) - (emprestimos.escritas_evitadas - evitadas_antes),
+        "processos": processos,
+        "tempo_leitura": lido - inicio,
+        "tempo_calculo": calculado - lido,
+        "tempo_gravacao": gravado - calculado,
+        "tempo_total": gravado - inicio,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fechamento do mês dos empréstimos do SOLABANK")
+    parser.add_argument("--data", help="data do fechamento, DD/MM/AAAA (padrão: hoje)")
+    parser.add_argument("--processos", type=int,
+                        help=f"processos para o cálculo (padrão: um por CPU acima de {LIMITE_PARALELO} empréstimos)")
+    args = parser.parse_args()
+
+    data_base = datetime.strptime(args.data, "%d/%m/%Y").date() if args.data else None
+
+    # Importados aqui para que os processos auxiliares não abram os repositórios
+    from managers.auditoria import AuditoriaManager
+    from managers.emprestimos import EmprestimoManager
+
+    auditoria = AuditoriaManager()
+    resumo = fechar_emprestimos(EmprestimoManager(), data_base, args.processos, auditoria)
+    auditoria.fechar()
+
+    total = resumo["tempo_total"]
+    print("🌙 FECHAMENTO DOS EMPRÉSTIMOS")
+    print("=" * 50)
+    print(f"📂 Empréstimos ativos: {resumo['emprestimos']}")
+    print(f"⚠️ Em atraso: {resumo['em_atraso']}")
+    print(f"💸 Encargos de atraso: {formatar_moeda(resumo['encargos'])}")
+    print(f"💾 Empréstimos alterados: {resumo['alterados']}")
+    print(f"⚙️ Processos: {resumo['processos']}")
+    print(f"⏱️ Leitura: {resumo['tempo_leitura']:.3f}s | Cálculo: {resumo['tempo_calculo']:.3f}s | "
+          f"Gravação: {resumo['tempo_gravacao']:.3f}s | Total: {total:.3f}s")
+    if total > 0:
+        print(f"🚀 {resumo['emprestimos'] / total:.0f} empréstimos/s")
+
+
+if __name__ == "__main__":
+    main()
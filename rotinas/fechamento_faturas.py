@@ -0,0 +1,180 @@
+"""
+🧾 FECHAMENTO DAS FATURAS DOS CARTÕES
+
+Rotina em lote que fecha o ciclo de todos os cartões do banco de uma vez,
+sem depender de cada usuário abrir a fatura:
+
+- move para a fatura aberta as parcelas que vencem até a data do
+  fechamento (o mesmo que atualizar_fatura faz para um cartão)
+- tira uma foto da fatura fechada em "faturas_fechadas": data do
+  fechamento, vencimento (10 dias depois), valor, pagamento mínimo e
+  itens
+- calcula o pagamento mínimo: 15% da fatura, nunca menos que R$ 50,00
+  (ou a fatura inteira, se ela for menor que isso)
+
+Fechar de novo na mesma data substitui a foto daquele dia, então rodar
+duas vezes dá o mesmo resultado e os cartões que não mudaram nem são
+regravados. Tudo é gravado numa única transação no final.
+
+Com muitos cartões, o trabalho é dividido em lotes e espalhado por
+vários processos.
+
+Uso (na pasta do projeto):
+
+    python -m rotinas.fechamento_faturas [--data DD/MM/AAAA] [--processos N]
+"""
+
+import argparse
+from datetime import date, datetime, time as horario, timedelta
+import time
+
+from armazenamento.unidade_trabalho import transacao
+from rotinas.lotes import processar_em_lotes
+from utils.dinheiro import multiplicar
+from utils.helpers import formatar_moeda
+
+PAGAMENTO_MINIMO_PERCENTUAL = 0.15
+PAGAMENTO_MINIMO_VALOR = 5000  # R$ 50,00, em centavos
+DIAS_ATE_VENCIMENTO = 10
+LIMITE_PARALELO = 5000  # A partir de quantos cartões vale a pena usar processos
+
+
+def pagamento_minimo(valor):
+    """
+    💳 Pagamento mínimo de uma fatura (em centavos).
+    """
+    return min(valor, max(multiplicar(valor, PAGAMENTO_MINIMO_PERCENTUAL), PAGAMENTO_MINIMO_VALOR))
+
+
+def _fechar_lote(lote, data_base):
+    """
+    ⚙️ Fecha a fatura de um lote de pares (número, cartão).
+
+    Roda dentro dos processos auxiliares: recebe e devolve só dados
+    simples. Devolve trios (número, cartão atualizado, parcelas movidas).
+    """
+    from managers.cartoes import faturar_vencidas
+
+    fim_do_dia = datetime.combine(data_base, horario.max).isoformat()
+    fechamento = data_base.isoformat()
+    resultado = []
+    for numero, cartao in lote:
+        movidas = faturar_vencidas(cartao, fim_do_dia)
+
+        fechadas = cartao.setdefault("faturas_fechadas", [])
+        if fechadas and fechadas[-1]["fechamento"] == fechamento:
+            fechadas.pop()  # Fechamento repetido no mesmo dia: refaz a foto
+        if cartao["fatura_atual"] > 0:
+            fechadas.append({
+                "fechamento": fechamento,
+                "vencimento": (data_base + timedelta(days=DIAS_ATE_VENCIMENTO)).isoformat(),
+                "valor": cartao["fatura_atual"],
+                "minimo": pagamento_minimo(cartao["fatura_atual"]),
+                "itens": [{"descricao": p["descricao"], "numero": p["numero"], "valor": p["restante"]}
+                          for p in cartao["fatura_aberta"]],
+            })
+        resultado.append((numero, cartao, movidas))
+    return resultado
+
+
+def fechar_faturas(cartao_manager, data_base=None, processos=None, auditoria=None):
+    """
+    🧾 FECHAMENTO DO CICLO
+
+    Fecha a fatura de todos os cartões na data informada (padrão: hoje)
+    e grava tudo numa única transação.
+
+    processos: quantos processos usar (padrão: um por CPU quando há
+    pelo menos LIMITE_PARALELO cartões; 1 = tudo no processo atual).
+
+    Retorna um resumo com contagens, totais e tempos (em segundos).
+    """
+    data_base = data_base or date.today()
+    inicio = time.perf_counter()
+
+    # Leitura
+    cartoes = cartao_manager.cartoes
+    carteira = [(numero, cartoes[numero]) for numero in list(cartoes)]
+    lido = time.perf_counter()
+
+    # Fechamento: em lotes, espalhados por processos quando há muitos cartões
+    partes, processos = processar_em_lotes(_fechar_lote, carteira, data_base,
+                                           processos, LIMITE_PARALELO)
+    calculado = time.perf_counter()
+
+    # Gravação: tudo numa transação só
+    evitadas_antes = cartoes.escritas_evitadas
+    movidas = 0
+    com_fatura = 0
+    a_receber = 0
+    minimo = 0
+    with transacao():
+        for parte in partes:
+            for numero, cartao, movidas_cartao in parte:
+                original = cartoes[numero]
+                if original is not cartao:
+                    # Vindo de outro processo, é uma cópia: atualiza o registro no lugar
+                    original.clear()
+                    original.update(cartao)
+                cartoes.salvar(numero)
+                movidas += movidas_cartao
+                fechadas = cartao["faturas_fechadas"]
+                if fechadas and fechadas[-1]["fechamento"] == data_base.isoformat():
+                    com_fatura += 1
+                    a_receber += fechadas[-1]["valor"]
+                    minimo += fechadas[-1]["minimo"]
+        if auditoria is not None:
+            auditoria.log_acao("SISTEMA", "FECHAMENTO_FATURAS",
+                               f"Fechamento de {data_base.strftime('%d/%m/%Y')}: {len(carteira)} cartões, "
+                               f"{com_fatura} faturas, {formatar_moeda(a_receber)} a receber")
+    gravado = time.perf_counter()
+
+    return {
+        "cartoes": len(carteira),
+        "parcelas_movidas": movidas,
+        "faturas": com_fatura,
+        "a_receber": a_receber,
+        "minimo": minimo,
+        "alterados": len(carteira) - (cartoes.escritas_evitadas - evitadas_antes),
+        "processos": processos,
+        "tempo_leitura": lido - inicio,
+        "tempo_fechamento": calculado - lido,
+        "tempo_gravacao": gravado - calculado,
+        "tempo_total": gravado - inicio,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fechamento das faturas dos cartões do SOLABANK")
+    parser.add_argument("--data", help="data do fechamento, DD/MM/AAAA (padrão: hoje)")
+    parser.add_argument("--processos", type=int,
+                        help=f"processos para o fechamento (padrão: um por CPU a partir de {LIMITE_PARALELO} cartões)")
+    args = parser.parse_args()
+
+    data_base = datetime.strptime(args.data, "%d/%m/%Y").date() if args.data else None
+
+    # Importados aqui para que os processos auxiliares não abram os repositórios
+    from managers.auditoria import AuditoriaManager
+    from managers.cartoes import CartaoManager
+
+    auditoria = AuditoriaManager()
+    resumo = fechar_faturas(CartaoManager(), data_base, args.processos, auditoria)
+    auditoria.fechar()
+
+    total = resumo["tempo_total"]
+    print("🧾 FECHAMENTO DAS FATURAS")
+    print("=" * 50)
+    print(f"💳 Cartões: {resumo['cartoes']}")
+    print(f"📋 Parcelas movidas para a fatura: {resumo['parcelas_movidas']}")
+    print(f"🧾 Faturas fechadas: {resumo['faturas']}")
+    print(f"💰 Total a receber: {formatar_moeda(resumo['a_receber'])} (mínimo: {formatar_moeda(resumo['minimo'])})")
+    print(f"💾 Cartões alterados: {resumo['alterados']}")
+    print(f"⚙️ Processos: {resumo['processos']}")
+    print(f"⏱️ Leitura: {resumo['tempo_leitura']:.3f}s | Fechamento: {resumo['tempo_fechamento']:.3f}s | "
+          f"Gravação: {resumo['tempo_gravacao']:.3f}s | Total: {total:.3f}s")
+    if total > 0:
+        print(f"🚀 {resumo['cartoes'] / total:.0f} cartões/s")
+
+
+if __name__ == "__main__":
+    main()
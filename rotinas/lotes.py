@@ -0,0 +1,45 @@
+"""
+📦 EXECUÇÃO EM LOTES
+
+Ferramentas comuns das rotinas em lote: dividir os registros em lotes e
+processar os lotes no processo atual ou espalhados por vários processos.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import os
+
+
+def em_lotes(itens, tamanho):
+    """
+    Agrupa os itens em listas de até "tamanho" itens.
+    """
+    lote = []
+    for item in itens:
+        lote.append(item)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def processar_em_lotes(funcao, itens, argumento, processos=None, limite_paralelo=5000):
+    """
+    ⚙️ Chama funcao(lote, argumento) para cada lote dos itens e retorna
+    (resultados, processos usados).
+
+    processos: padrão um por CPU quando há pelo menos "limite_paralelo"
+    itens (abaixo disso, criar processos custa mais do que ajuda);
+    1 = tudo no processo atual. A função precisa estar no nível do
+    módulo e receber/devolver só dados simples, para ir aos processos.
+    """
+    if processos is None:
+        processos = (os.cpu_count() or 1) if len(itens) >= limite_paralelo else 1
+    processos = max(1, min(processos, len(itens) or 1))
+    tamanho_lote = max(1, -(-len(itens) // (processos * 4)))  # ~4 lotes por processo
+
+    if processos == 1:
+        return [funcao(lote, argumento) for lote in em_lotes(itens, tamanho_lote)], 1
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        return list(executor.map(funcao, em_lotes(itens, tamanho_lote), repeat(argumento))), processos
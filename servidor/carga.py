@@ -0,0 +1,239 @@
+"""
+📈 GERADOR DE CARGA DO SERVIDOR
+
+Abre vários clientes ao mesmo tempo (conexões asyncio) e dispara
+operações no servidor, medindo requisições por segundo e a latência
+(p50, p99 e máxima) de cada uma:
+
+- 50% consultas de saldo
+- 20% depósitos
+- 30% transferências entre as contas do teste
+
+Antes da carga cadastra as contas "cargaNNNN" (pelo mesmo cadastro
+interativo dos menus) e deposita R$ 1.000,00 em cada. Como o servidor
+só deixa cada conexão operar a conta em que fez login, cada cliente
+entra numa das contas e consulta, deposita e transfere a partir dela.
+
+Sem --endereco, sobe um servidor próprio numa pasta temporária (os
+dados de data/ não são tocados) e o encerra no final.
+
+Uso (na pasta do projeto):
+
+    python -m servidor.carga [--endereco HOST:PORTA] [--clientes N] [--requisicoes N] [--contas N]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from servidor.protocolo import codificar, decodificar, separar_endereco
+from utils.dinheiro import UM_REAL
+
+CLIENTES = 50
+REQUISICOES = 200          # Por cliente
+CONTAS = 100
+SALDO_INICIAL = 1000 * UM_REAL
+ESPERA_SERVIDOR = 15       # Segundos esperando o servidor próprio subir
+
+
+class ClienteCarga:
+    """
+    🔌 Um cliente asyncio do servidor (uma conexão, uma chamada por vez).
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self._ultimo_id = 0
+
+    @classmethod
+    async def abrir(cls, endereco):
+        host, porta = separar_endereco(endereco)
+        return cls(*await asyncio.open_connection(host, porta))
+
+    async def chamar(self, manager, metodo, *args, respostas=()):
+        """
+        📞 Executa a chamada e retorna o resultado. As perguntas do
+        método (input) são respondidas na ordem de "respostas".
+        """
+        self._ultimo_id += 1
+        ident = self._ultimo_id
+        self.writer.write(codificar({"id": ident, "manager": manager, "metodo": metodo, "args": list(args)}))
+        await self.writer.drain()
+        respostas = iter(respostas)
+        while True:
+            mensagem = decodificar(await self.reader.readline())
+            if "pergunta" in mensagem:
+                self.writer.write(codificar({"id": ident, "resposta": next(respostas, "")}))
+                await self.writer.drain()
+                continue
+            if "erro" in mensagem:
+                raise RuntimeError(mensagem["erro"])
+            return mensagem.get("resultado")
+
+    async def fechar(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def _preparar_contas(endereco, contas):
+    """
+    Cadastra as contas do teste e deposita o saldo inicial (entrando
+    em cada uma).
+    """
+    cliente = await ClienteCarga.abrir(endereco)
+    nomes = [f"carga{numero:04d}" for numero in range(contas)]
+    for nome in nomes:
+        # Cadastro interativo: usuário, senha, pergunta e resposta secreta
+        await cliente.chamar("usuarios", "cadastrar", respostas=(nome, "carga", "-", "-"))
+        await _entrar(cliente, nome)
+        await cliente.chamar("usuarios", "depositar", nome, SALDO_INICIAL)
+    await cliente.fechar()
+    return nomes
+
+
+async def _entrar(cliente, nome):
+    """
+    Login interativo: usuário e senha (o "Enter" do pausar() vai vazio).
+    """
+    if await cliente.chamar("usuarios", "login", respostas=(nome, "carga")) != nome:
+        raise RuntimeError(f"Login de {nome} recusado")
+
+
+async def _cliente(endereco, nome, nomes, requisicoes, semente, latencias, erros):
+    """
+    ⚙️ Um cliente da carga: entra na conta "nome" e faz "requisicoes"
+    operações sorteadas a partir dela.
+    """
+    sorteio = random.Random(semente)
+    destinos = [outro for outro in nomes if outro != nome]
+    cliente = await ClienteCarga.abrir(endereco)
+    await _entrar(cliente, nome)
+    for _ in range(requisicoes):
+        sorte = sorteio.random()
+        inicio = time.perf_counter()
+        try:
+            if sorte < 0.5:
+                await cliente.chamar("usuarios", "get_saldo", nome)
+            elif sorte < 0.7:
+                await cliente.chamar("usuarios", "depositar", nome, sorteio.randint(1, 100 * UM_REAL))
+            else:
+                destino = sorteio.choice(destinos)
+                await cliente.chamar("usuarios", "transferir", nome, destino, sorteio.randint(1, 100 * UM_REAL))
+        except RuntimeError:
+            erros.append(1)
+        latencias.append(time.perf_counter() - inicio)
+    await cliente.fechar()
+
+
+def _percentil(ordenados, percentil):
+    indice = min(len(ordenados) - 1, int(len(ordenados) * percentil / 100))
+    return ordenados[indice]
+
+
+async def gerar_carga(endereco, clientes=CLIENTES, requisicoes=REQUISICOES, contas=CONTAS, semente=None):
+    """
+    📈 GERAR CARGA
+
+    Prepara as contas, roda os clientes ao mesmo tempo e retorna um
+    resumo com requisições/s e latências (em segundos).
+    """
+    nomes = await _preparar_contas(endereco, contas)
+
+    sorteio = random.Random(semente)
+    latencias = []
+    erros = []
+    inicio = time.perf_counter()
+    # Cada cliente entra numa conta (com mais clientes que contas, elas se repetem)
+    await asyncio.gather(*(_cliente(endereco, nomes[numero % contas], nomes, requisicoes, sorteio.random(),
+                                    latencias, erros)
+                           for numero in range(clientes)))
+    duracao = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        "clientes": clientes,
+        "requisicoes": len(latencias),
+        "erros": len(erros),
+        "tempo": duracao,
+        "por_segundo": len(latencias) / duracao if duracao > 0 else 0.0,
+        "p50": _percentil(latencias, 50),
+        "p99": _percentil(latencias, 99),
+        "maxima": latencias[-1],
+    }
+
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _subir_servidor(pasta):
+    """
+    🖥️ Sobe um servidor em outro processo, com os dados na pasta
+    informada, e espera ele aceitar conexões. Retorna (processo, endereço).
+    """
+    endereco = f"127.0.0.1:{_porta_livre()}"
+    os.makedirs(os.path.join(pasta, "data"))
+    ambiente = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+    for variavel in ("SOLABANK_ARQUIVO_SQLITE", "SOLABANK_DIRETORIO_HISTORICO"):
+        ambiente.pop(variavel, None)  # Caminhos padrão (relativos): tudo fica na pasta temporária
+    processo = subprocess.Popen([sys.executable, "-m", "servidor.servidor", "--endereco", endereco],
+                                cwd=pasta, env=ambiente, stdout=subprocess.DEVNULL)
+
+    limite = time.monotonic() + ESPERA_SERVIDOR
+    while True:
+        try:
+            socket.create_connection(separar_endereco(endereco)).close()
+            return processo, endereco
+        except ConnectionError:
+            if processo.poll() is not None or time.monotonic() > limite:
+                processo.kill()
+                raise RuntimeError("O servidor não subiu") from None
+            time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerador de carga do servidor do SOLABANK")
+    parser.add_argument("--endereco", help="servidor já no ar, HOST:PORTA (padrão: sobe um numa pasta temporária)")
+    parser.add_argument("--clientes", type=int, default=CLIENTES, help=f"conexões ao mesmo tempo (padrão {CLIENTES})")
+    parser.add_argument("--requisicoes", type=int, default=REQUISICOES,
+                        help=f"requisições por cliente (padrão {REQUISICOES})")
+    parser.add_argument("--contas", type=int, default=CONTAS, help=f"contas do teste (padrão {CONTAS})")
+    parser.add_argument("--semente", type=int, help="semente do sorteio, para repetir um teste")
+    args = parser.parse_args()
+
+    if args.contas < 2 or args.clientes < 1 or args.requisicoes < 1:
+        parser.error("são necessárias pelo menos 2 contas, 1 cliente e 1 requisição")
+
+    with tempfile.TemporaryDirectory(prefix="solabank_carga_") as pasta:
+        processo = None
+        endereco = args.endereco
+        if endereco is None:
+            processo, endereco = _subir_servidor(pasta)
+        try:
+            resumo = asyncio.run(gerar_carga(endereco, args.clientes, args.requisicoes, args.contas, args.semente))
+        finally:
+            if processo is not None:
+                processo.send_signal(signal.SIGINT)  # Encerra gravando tudo
+                processo.wait()
+
+    print("📈 CARGA NO SERVIDOR")
+    print("=" * 50)
+    print(f"🔌 Clientes: {resumo['clientes']} | 📨 Requisições: {resumo['requisicoes']} (erros: {resumo['erros']})")
+    print(f"⏱️ Tempo: {resumo['tempo']:.3f}s")
+    print(f"🚀 {resumo['por_segundo']:.0f} requisições/s")
+    print(f"⌛ Latência p50: {resumo['p50'] * 1000:.2f} ms | p99: {resumo['p99'] * 1000:.2f} ms | "
+          f"máxima: {resumo['maxima'] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+💻 CLIENTE DO SERVIDOR
+
+Deixa os menus usarem o servidor sem mudar nada neles: cada manager
+vira um ManagerRemoto, com os mesmos métodos, que manda a chamada para
+o servidor, mostra o que o método escreveu e responde às perguntas
+(input) aqui no terminal.
+
+    managers = conectar("127.0.0.1:8765")
+    managers["usuarios"].get_saldo("ana")   # roda no servidor
+
+As transações abertas pelos menus (transacao()) não atravessam a rede:
+no servidor cada chamada grava o que alterou ao terminar.
+"""
+
+import socket
+
+from servidor.protocolo import MANAGERS, REFERENCIA, codificar, decodificar, separar_endereco
+
+
+class ErroServidor(RuntimeError):
+    """
+    ❌ O método levantou um erro no servidor (a mensagem vem de lá).
+    """
+
+
+class Conexao:
+    """
+    🔌 Conexão com o servidor, usada por todos os ManagerRemoto de um
+    terminal. Uma chamada por vez.
+    """
+
+    def __init__(self, endereco):
+        self._socket = socket.create_connection(separar_endereco(endereco))
+        self._arquivo = self._socket.makefile("rwb")
+        self._ultimo_id = 0
+
+    def _enviar(self, mensagem):
+        self._arquivo.write(codificar(mensagem))
+        self._arquivo.flush()
+
+    def _receber(self):
+        linha = self._arquivo.readline()
+        if not linha:
+            raise ConnectionError("O servidor encerrou a conexão")
+        return decodificar(linha)
+
+    def chamar(self, manager, metodo, args):
+        """
+        📞 Executa manager.metodo(*args) no servidor e retorna o resultado.
+        """
+        self._ultimo_id += 1
+        ident = self._ultimo_id
+        self._enviar({"id": ident, "manager": manager, "metodo": metodo,
+                      "args": [_referencia(argumento) for argumento in args]})
+        while True:
+            mensagem = self._receber()
+            if mensagem.get("saida"):
+                print(mensagem["saida"], end="")
+            if "pergunta" in mensagem:
+                self._enviar({"id": ident, "resposta": input(mensagem["pergunta"])})
+                continue
+            if "erro" in mensagem:
+                raise ErroServidor(mensagem["erro"])
+            return mensagem.get("resultado")
+
+    def fechar(self):
+        if self._socket is None:
+            return
+        self._arquivo.close()
+        self._socket.close()
+        self._socket = None
+
+
+class ManagerRemoto:
+    """
+    🛰️ Um manager do servidor visto daqui: qualquer método chamado é
+    executado lá (atributos que não são métodos não estão disponíveis).
+    fechar() só encerra a conexão; os dados ficam com o servidor.
+    """
+
+    def __init__(self, conexao, nome):
+        self._conexao = conexao
+        self._nome = nome
+
+    def __getattr__(self, metodo):
+        if metodo.startswith("_"):
+            raise AttributeError(metodo)
+
+        def chamar(*args):
+            return self._conexao.chamar(self._nome, metodo, args)
+        chamar.__name__ = metodo
+        return chamar
+
+    def fechar(self):
+        self._conexao.fechar()
+
+
+def _referencia(argumento):
+    # Managers remotos viajam pelo nome e o servidor usa o dele
+    if isinstance(argumento, ManagerRemoto):
+        return {REFERENCIA: argumento._nome}
+    return argumento
+
+
+def conectar(endereco):
+    """
+    🔗 Conecta no servidor e retorna um dicionário nome -> ManagerRemoto
+    (os nomes de protocolo.MANAGERS), todos na mesma conexão.
+    """
+    conexao = Conexao(endereco)
+    return {nome: ManagerRemoto(conexao, nome) for nome in MANAGERS}
@@ -0,0 +1,57 @@
+"""
+📡 PROTOCOLO DO SERVIDOR
+
+Mensagens JSON, uma por linha (JSON lines), nos dois sentidos.
+
+Cliente -> servidor:
+
+    {"id": 1, "manager": "usuarios", "metodo": "transferir", "args": ["ana", "bia", 1000]}
+    {"id": 1, "resposta": "texto digitado"}     (resposta a uma pergunta)
+
+Servidor -> cliente:
+
+    {"id": 1, "saida": "...", "pergunta": "💰 Valor: R$ "}   (o método chamou input())
+    {"id": 1, "saida": "...", "resultado": true}            (fim da chamada)
+    {"id": 1, "saida": "...", "erro": "ValueError: ..."}    (o método levantou um erro)
+
+"saida" é o que o método escreveu com print() desde a mensagem anterior.
+Um manager passado como argumento (ex: o usuario_manager de
+solicitar_emprestimo) vai como {"$manager": "usuarios"}, e o servidor
+usa o dele.
+"""
+
+import json
+
+ENDERECO_PADRAO = "127.0.0.1:8765"
+
+# Managers que o servidor atende, pelo nome usado nas mensagens
+MANAGERS = ("usuarios", "cartoes", "emprestimos", "investimentos", "auditoria", "admin")
+
+REFERENCIA = "$manager"
+
+
+def codificar(mensagem):
+    """
+    📤 Mensagem -> linha de bytes pronta para enviar.
+    """
+    return (json.dumps(mensagem, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _recusar_constante(nome):
+    # O json do Python aceita NaN, Infinity e -Infinity, que não são JSON válido
+    raise ValueError(f"Número inválido: {nome}")
+
+
+def decodificar(linha):
+    """
+    📥 Linha recebida -> mensagem. NaN e infinito geram ValueError.
+    """
+    return json.loads(linha, parse_constant=_recusar_constante)
+
+
+def separar_endereco(endereco):
+    """
+    "host:porta" -> (host, porta). Sem host, usa 127.0.0.1.
+    """
+    host, _, porta = endereco.rpartition(":")
+    return host or "127.0.0.1", int(porta)
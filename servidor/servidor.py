@@ -0,0 +1,392 @@
+"""
+🖥️ SERVIDOR DO SOLABANK
+
+Um processo só, de longa duração, que é o dono dos dados: abre os
+managers uma vez e atende vários clientes ao mesmo tempo por TCP
+(protocolo em servidor/protocolo.py). Com o servidor no ar, vários
+terminais rodando "python main.py" como clientes enxergam e alteram o
+mesmo estado, sem um regravar por cima do que o outro salvou.
+
+Cada chamada roda numa thread do servidor. O que o método escreve com
+print() vai para o cliente que chamou, e cada input() vira uma pergunta
+para esse cliente, então os métodos interativos (login, solicitar
+empréstimo...) funcionam sem mudar nada. A conexão espera a chamada
+terminar antes de ler o próximo pedido; clientes diferentes seguem em
+paralelo, coordenados pelas travas dos próprios managers (por conta no
+UsuarioManager, por usuário nos outros). Os managers nunca seguram uma
+trava enquanto esperam uma resposta, e um cliente que não responde em
+config.SERVIDOR_TEMPO_PERGUNTA segundos é desconectado.
+
+Só os métodos de PERMITIDOS podem ser chamados. Cada conexão fica
+ligada ao usuário que o login dela retornou: os métodos de um usuário
+só aceitam esse usuário como primeiro argumento, e os do administrador
+só rodam depois do login do admin na mesma conexão. Os valores em
+dinheiro (VALORES) precisam ser inteiros positivos de centavos.
+
+Uso (na pasta do projeto):
+
+    python -m servidor.servidor [--endereco HOST:PORTA] [--trabalhadores N]
+
+e, em outros terminais:
+
+    SOLABANK_SERVIDOR=127.0.0.1:8765 python main.py
+"""
+
+import argparse
+import asyncio
+import builtins
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as TempoEsgotado
+import signal
+import sys
+import threading
+
+from servidor.protocolo import ENDERECO_PADRAO, REFERENCIA, codificar, decodificar, separar_endereco
+from utils import config
+from utils.dinheiro import valor_positivo
+
+# Quem pode chamar cada método
+PUBLICO = "publico"   # Qualquer conexão
+USUARIO = "usuario"   # Conexão logada, com o usuário dela como primeiro argumento
+ADMIN = "admin"       # Conexão que passou pelo login do admin
+
+# Os métodos que o cliente pode chamar (o resto, como fechar(), fica com o servidor)
+PERMITIDOS = {
+    ("usuarios", "login"): PUBLICO,
+    ("usuarios", "cadastrar"): PUBLICO,
+    ("usuarios", "get_saldo"): USUARIO,
+    ("usuarios", "get_pontos"): USUARIO,
+    ("usuarios", "depositar"): USUARIO,
+    ("usuarios", "sacar"): USUARIO,
+    ("usuarios", "transferir"): USUARIO,
+    ("usuarios", "pagar_boleto"): USUARIO,
+    ("usuarios", "mostrar_historico"): USUARIO,
+    ("usuarios", "exportar_historico"): USUARIO,
+    ("cartoes", "get_cartoes_usuario"): USUARIO,
+    ("cartoes", "criar_cartao"): USUARIO,
+    ("cartoes", "fazer_compra"): USUARIO,
+    ("cartoes", "mostrar_fatura"): USUARIO,
+    ("cartoes", "gerar_fatura_pdf"): USUARIO,
+    ("cartoes", "pagar_fatura"): USUARIO,
+    ("emprestimos", "get_emprestimos_usuario"): USUARIO,
+    ("emprestimos", "solicitar_emprestimo"): USUARIO,
+    ("emprestimos", "mostrar_emprestimos"): USUARIO,
+    ("emprestimos", "pagar_emprestimo"): USUARIO,
+    ("investimentos", "get_investimentos_usuario"): USUARIO,
+    ("investimentos", "nova_aplicacao"): USUARIO,
+    ("investimentos", "mostrar_investimentos"): USUARIO,
+    ("investimentos", "resgatar_investimento"): USUARIO,
+    ("investimentos", "mostrar_simulacao_carteira"): USUARIO,
+    ("auditoria", "log_acao"): USUARIO,
+    ("auditoria", "descarregar"): PUBLICO,
+    ("auditoria", "mostrar_logs"): ADMIN,
+    ("auditoria", "consultar_logs"): ADMIN,
+    ("admin", "login_admin"): PUBLICO,
+    ("admin", "listar_usuarios"): ADMIN,
+    ("admin", "mostrar_estatisticas"): ADMIN,
+    ("admin", "mostrar_investimentos_banco"): ADMIN,
+    ("admin", "gerar_relatorio_csv"): ADMIN,
+    ("admin", "gerar_relatorio_pdf"): ADMIN,
+}
+
+# Posição dos argumentos que precisam ser um inteiro positivo (centavos
+# ou número de parcelas), conferidos antes de a chamada chegar ao manager
+VALORES = {
+    ("usuarios", "depositar"): (1,),
+    ("usuarios", "sacar"): (1,),
+    ("usuarios", "transferir"): (2,),
+    ("usuarios", "pagar_boleto"): (1,),
+    ("cartoes", "fazer_compra"): (2, 3),
+    ("cartoes", "pagar_fatura"): (2,),
+}
+
+_local = threading.local()  # Sessão da chamada que a thread está executando
+
+
+class _Sessao:
+    """
+    🔌 Uma chamada em andamento: junta o que o método escreve e leva
+    as perguntas (input) para o cliente.
+    """
+
+    def __init__(self, loop, reader, writer, ident):
+        self.loop = loop
+        self.reader = reader
+        self.writer = writer
+        self.ident = ident
+        self.saida = []
+
+    def tirar_saida(self):
+        saida = "".join(self.saida)
+        self.saida.clear()
+        return saida
+
+    def perguntar(self, pergunta):
+        """
+        Chamado pela thread da chamada: espera o cliente responder. Se
+        ele não responder a tempo, a conexão é fechada e a chamada
+        termina com EOFError, como se o cliente tivesse caído.
+        """
+        futuro = asyncio.run_coroutine_threadsafe(self._perguntar(self.tirar_saida(), pergunta), self.loop)
+        try:
+            return futuro.result(timeout=config.SERVIDOR_TEMPO_PERGUNTA)
+        except TempoEsgotado:
+            futuro.cancel()
+            self.loop.call_soon_threadsafe(self.writer.close)
+            raise EOFError("O cliente não respondeu a tempo") from None
+
+    async def _perguntar(self, saida, pergunta):
+        self.writer.write(codificar({"id": self.ident, "saida": saida, "pergunta": pergunta}))
+        await self.writer.drain()
+        linha = await self.reader.readline()
+        if not linha:
+            raise EOFError("Cliente desconectou")
+        mensagem = decodificar(linha)
+        if "resposta" not in mensagem:
+            raise ValueError("O cliente mandou outra coisa no lugar da resposta")
+        return mensagem["resposta"]
+
+
+class _Acesso:
+    """
+    🔑 Quem está logado numa conexão. Só o servidor altera, com o
+    resultado dos logins feitos nela.
+    """
+
+    def __init__(self):
+        self.usuario = None   # Usuário retornado pelo último login
+        self.admin = False    # Passou pelo login do admin?
+
+    def autorizar(self, nome, metodo, args):
+        """
+        Levanta PermissionError se a conexão não pode fazer a chamada, e
+        ValueError se um valor em dinheiro não é um inteiro positivo.
+        """
+        nivel = PERMITIDOS.get((nome, metodo))
+        if nivel is None:
+            raise ValueError(f"Método não disponível: {nome}.{metodo}")
+        if nivel == ADMIN and not self.admin:
+            raise PermissionError("Acesso restrito ao administrador")
+        if nivel == USUARIO:
+            if self.usuario is None:
+                raise PermissionError("Faça login primeiro")
+            if not args or args[0] != self.usuario:
+                raise PermissionError("Só é permitido operar a conta logada")
+        for posicao in VALORES.get((nome, metodo), ()):
+            if posicao >= len(args) or not valor_positivo(args[posicao]):
+                raise ValueError("Valor inválido: use um número inteiro positivo de centavos")
+
+    def registrar(self, nome, metodo, resultado):
+        """
+        Liga a conexão ao usuário (ou ao admin) depois de um login.
+        """
+        if (nome, metodo) == ("usuarios", "login"):
+            self.usuario = resultado if isinstance(resultado, str) else None
+            self.admin = False
+        elif (nome, metodo) == ("admin", "login_admin"):
+            self.admin = resultado is True
+            self.usuario = None
+
+
+class _SaidaDasSessoes:
+    """
+    Substitui sys.stdout: o que uma thread com sessão escreve vai para
+    a sessão; o resto (o próprio servidor) vai para o terminal.
+    """
+
+    def __init__(self, original):
+        self.original = original
+
+    def write(self, texto):
+        sessao = getattr(_local, "sessao", None)
+        if sessao is None:
+            return self.original.write(texto)
+        sessao.saida.append(texto)
+        return len(texto)
+
+    def flush(self):
+        if getattr(_local, "sessao", None) is None:
+            self.original.flush()
+
+    def __getattr__(self, nome):
+        return getattr(self.original, nome)
+
+
+def _instalar_redirecionamento():
+    """
+    Liga print() e input() às sessões (uma vez por processo).
+    """
+    if isinstance(sys.stdout, _SaidaDasSessoes):
+        return
+    input_original = builtins.input
+
+    def input_da_sessao(pergunta=""):
+        sessao = getattr(_local, "sessao", None)
+        if sessao is None:
+            return input_original(pergunta)
+        return sessao.perguntar(str(pergunta))
+
+    sys.stdout = _SaidaDasSessoes(sys.stdout)
+    builtins.input = input_da_sessao
+
+
+def abrir_managers():
+    """
+    🗂️ Abre todos os managers, como o main.py faz, num dicionário
+    nome -> manager (os nomes de protocolo.MANAGERS).
+    """
+    from managers.admin import AdminManager
+    from managers.auditoria import AuditoriaManager
+    from managers.cartoes import CartaoManager
+    from managers.emprestimos import EmprestimoManager
+    from managers.investimentos import InvestimentoManager
+    from managers.usuarios import UsuarioManager
+
+    return {
+        "usuarios": UsuarioManager(),
+        "cartoes": CartaoManager(),
+        "emprestimos": EmprestimoManager(),
+        "investimentos": InvestimentoManager(),
+        "auditoria": AuditoriaManager(),
+        "admin": AdminManager(),
+    }
+
+
+class ServidorBanco:
+    """
+    🖥️ SERVIDOR DO BANCO
+
+    Atende as conexões e executa os pedidos nos managers que recebeu
+    (padrão: abre todos com abrir_managers()).
+    """
+
+    def __init__(self, managers=None, trabalhadores=None):
+        _instalar_redirecionamento()
+        self.managers = managers or abrir_managers()
+        self.atendidas = 0  # Quantas chamadas já foram executadas
+        self._executor = ThreadPoolExecutor(max_workers=trabalhadores or config.SERVIDOR_TRABALHADORES,
+                                            thread_name_prefix="solabank")
+
+    # ------------------------------------------------------------------
+    # Execução das chamadas (nas threads)
+    # ------------------------------------------------------------------
+
+    def _resolver(self, argumento):
+        # {"$manager": "usuarios"} -> o UsuarioManager do servidor
+        if isinstance(argumento, dict) and set(argumento) == {REFERENCIA}:
+            return self.managers[argumento[REFERENCIA]]
+        return argumento
+
+    def _chamar(self, sessao, acesso, pedido):
+        """
+        ⚙️ Executa um pedido na thread atual, com print() e input()
+        ligados à sessão, se o acesso da conexão permitir.
+        """
+        nome = pedido.get("manager")
+        metodo = pedido.get("metodo", "")
+        if nome not in self.managers:
+            raise ValueError(f"Manager desconhecido: {nome}")
+        args = [self._resolver(argumento) for argumento in pedido.get("args", [])]
+        acesso.autorizar(nome, metodo, args)
+
+        _local.sessao = sessao
+        try:
+            resultado = getattr(self.managers[nome], metodo)(*args)
+        finally:
+            _local.sessao = None
+        acesso.registrar(nome, metodo, resultado)
+        return resultado
+
+    # ------------------------------------------------------------------
+    # Conexões (no laço do asyncio)
+    # ------------------------------------------------------------------
+
+    async def _executar(self, pedido, acesso, reader, writer):
+        loop = asyncio.get_running_loop()
+        sessao = _Sessao(loop, reader, writer, pedido.get("id"))
+        try:
+            resultado = await loop.run_in_executor(self._executor, self._chamar, sessao, acesso, pedido)
+            resposta = {"resultado": resultado}
+        except Exception as erro:
+            resposta = {"erro": f"{type(erro).__name__}: {erro}"}
+        self.atendidas += 1
+
+        resposta.update(id=sessao.ident, saida=sessao.tirar_saida())
+        try:
+            linha = codificar(resposta)
+        except TypeError:
+            linha = codificar({"id": sessao.ident, "saida": resposta["saida"],
+                               "erro": "TypeError: o resultado não pode ser enviado em JSON"})
+        writer.write(linha)
+        await writer.drain()
+
+    async def atender(self, reader, writer):
+        """
+        🔌 Atende uma conexão: um pedido por vez, até o cliente sair.
+        """
+        acesso = _Acesso()  # Ninguém logado até o primeiro login
+        try:
+            while True:
+                linha = await reader.readline()
+                if not linha:
+                    break
+                try:
+                    pedido = decodificar(linha)
+                except ValueError:
+                    writer.write(codificar({"id": None, "erro": "ValueError: mensagem inválida"}))
+                    await writer.drain()
+                    continue
+                await self._executar(pedido, acesso, reader, writer)
+        except (ConnectionError, EOFError):
+            pass  # Cliente caiu no meio de uma chamada
+        except asyncio.CancelledError:
+            pass  # Servidor sendo encerrado com o cliente conectado
+        finally:
+            writer.close()
+
+    async def servir(self, endereco=ENDERECO_PADRAO, pronto=None):
+        """
+        🚀 Escuta no endereço até ser interrompido. "pronto" (um
+        asyncio.Event, opcional) é ligado quando o servidor já aceita
+        conexões.
+        """
+        host, porta = separar_endereco(endereco)
+        servidor = await asyncio.start_server(self.atender, host, porta)
+        print(f"🖥️ Servidor SOLABANK ouvindo em {host}:{porta}")
+        sys.stdout.flush()
+        if pronto is not None:
+            pronto.set()
+        async with servidor:
+            await servidor.serve_forever()
+
+    def fechar(self):
+        """
+        🔒 Termina as chamadas em andamento e fecha os managers.
+        """
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        for nome in ("usuarios", "cartoes", "emprestimos", "investimentos", "auditoria"):
+            self.managers[nome].fechar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor do SOLABANK")
+    parser.add_argument("--endereco", default=config.SERVIDOR or ENDERECO_PADRAO,
+                        help=f"onde escutar, HOST:PORTA (padrão: SOLABANK_SERVIDOR ou {ENDERECO_PADRAO})")
+    parser.add_argument("--trabalhadores", type=int, default=config.SERVIDOR_TRABALHADORES,
+                        help=f"chamadas ao mesmo tempo (padrão {config.SERVIDOR_TRABALHADORES})")
+    args = parser.parse_args()
+
+    # kill (SIGTERM) encerra gravando tudo, como o Ctrl+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    servidor = ServidorBanco(trabalhadores=args.trabalhadores)
+    try:
+        asyncio.run(servidor.servir(args.endereco))
+    except KeyboardInterrupt:
+        print("\n👋 Servidor encerrado")
+    finally:
+        servidor.fechar()
+        print(f"📊 Chamadas atendidas: {servidor.atendidas}")
+
+
+if __name__ == "__main__":
+    main()
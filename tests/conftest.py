@@ -0,0 +1,38 @@
+"""
+🧪 CONFIGURAÇÃO DOS TESTES
+
+Cada teste roda numa pasta temporária com o seu próprio data/, usando
+o backend JSON, para não mexer nos dados de verdade do banco.
+"""
+
+import builtins
+
+import pytest
+
+from utils import config
+
+
+@pytest.fixture
+def pasta_dados(tmp_path, monkeypatch):
+    """
+    📁 Pasta temporária com data/ vazia, usada como diretório atual.
+    """
+    (tmp_path / "data").mkdir()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config, "ARMAZENAMENTO", "json")
+    monkeypatch.setattr(config, "ARMAZENAMENTO_USUARIOS", "json")
+    monkeypatch.setattr(config, "ARMAZENAMENTO_LOGS", "json")
+    monkeypatch.setattr(config, "LOG_ASSINCRONO", False)
+    monkeypatch.setattr(config, "DIRETORIO_HISTORICO", "data/historico")
+    return tmp_path
+
+
+@pytest.fixture
+def respostas(monkeypatch):
+    """
+    ⌨️ Respostas para os input() do menu, na ordem em que são pedidas.
+    Quando a lista acaba, input() devolve "" (ex: "Pressione ENTER").
+    """
+    fila = []
+    monkeypatch.setattr(builtins, "input", lambda texto="": fila.pop(0) if fila else "")
+    return fila
@@ -0,0 +1,19 @@
+"""
+💳 Parcelas futuras das compras no cartão.
+"""
+
+from managers.cartoes import CartaoManager
+
+
+def test_parcelas_futuras_ficam_ordenadas_pelo_vencimento(pasta_dados, respostas):
+    cartoes = CartaoManager()
+    cartoes.criar_cartao("ana")
+    numero = cartoes.get_cartoes_usuario("ana")[0]["numero"]
+
+    for parcelas in (3, 5, 2, 4):
+        assert cartoes.fazer_compra("ana", numero, 10000, parcelas, "Compra")
+
+    vencimentos = [parcela["data_vencimento"] for parcela in cartoes.cartoes[numero]["parcelas"]]
+    assert len(vencimentos) == 2 + 4 + 1 + 3  # A primeira parcela de cada compra vai para a fatura
+    assert vencimentos == sorted(vencimentos)
+    cartoes.fechar()
@@ -0,0 +1,88 @@
+"""
+🧾 Quantas gravações cada operação bancária faz dentro de uma transação:
+cada manager alistado grava uma única vez, no final da operação.
+"""
+
+import pytest
+
+from armazenamento.unidade_trabalho import transacao
+from managers.auditoria import AuditoriaManager
+from managers.cartoes import CartaoManager
+from managers.emprestimos import EmprestimoManager
+from managers.usuarios import UsuarioManager
+
+
+@pytest.fixture
+def banco(pasta_dados, respostas):
+    usuarios = UsuarioManager()
+    cartoes = CartaoManager()
+    emprestimos = EmprestimoManager()
+    auditoria = AuditoriaManager()
+    for nome in ("ana", "bia"):
+        respostas[:] = [nome, "senha123", "Cor favorita?", "azul"]
+        usuarios.cadastrar()
+    usuarios.depositar("ana", 100000)
+    cartoes.criar_cartao("ana")
+    yield usuarios, cartoes, emprestimos, auditoria
+    for manager in (usuarios, cartoes, emprestimos, auditoria):
+        manager.fechar()
+
+
+def _escritas(usuarios, cartoes, emprestimos, auditoria):
+    return {
+        "usuarios": usuarios.usuarios.escritas,
+        "historico": usuarios.ledger.escritas,
+        "cartoes": cartoes.cartoes.escritas,
+        "emprestimos": emprestimos.emprestimos.escritas,
+        "auditoria": auditoria.logs.escritas,
+    }
+
+
+def _diferenca(antes, depois):
+    return {nome: depois[nome] - antes[nome] for nome in antes if depois[nome] != antes[nome]}
+
+
+def test_deposito_grava_usuarios_e_historico_uma_vez(banco):
+    antes = _escritas(*banco)
+    with transacao() as unidade:
+        banco[0].depositar("ana", 5000)
+
+    assert unidade.escritas == 2
+    assert _diferenca(antes, _escritas(*banco)) == {"usuarios": 1, "historico": 1}
+
+
+def test_transferencia_grava_usuarios_uma_vez(banco):
+    usuarios = banco[0]
+    antes = _escritas(*banco)
+    with transacao() as unidade:
+        assert usuarios.transferir("ana", "bia", 1000)
+
+    # O histórico de cada conta é um arquivo, então o ledger grava dois
+    assert unidade.escritas == 2
+    assert _diferenca(antes, _escritas(*banco)) == {"usuarios": 1, "historico": 2}
+    assert usuarios.get_saldo("bia") == 1000
+
+
+def test_emprestimo_grava_cada_manager_uma_vez(banco, respostas):
+    usuarios, _, emprestimos, auditoria = banco
+    antes = _escritas(*banco)
+    respostas[:] = ["1000", "2", "1", "s"]  # R$ 1.000,00 em 2x, Price, confirma
+    with transacao() as unidade:
+        emprestimos.solicitar_emprestimo("ana", usuarios, auditoria)
+
+    assert unidade.escritas == 4
+    assert _diferenca(antes, _escritas(*banco)) == {
+        "usuarios": 1, "historico": 1, "emprestimos": 1, "auditoria": 1,
+    }
+    assert len(emprestimos.get_emprestimos_usuario("ana")) == 1
+
+
+def test_compra_no_cartao_grava_cartoes_e_pontos_uma_vez(banco):
+    usuarios, cartoes, _, _ = banco
+    numero = cartoes.get_cartoes_usuario("ana")[0]["numero"]
+    antes = _escritas(*banco)
+    with transacao() as unidade:
+        assert cartoes.fazer_compra("ana", numero, 5000, 3, "Mercado", usuarios)
+
+    assert unidade.escritas == 2
+    assert _diferenca(antes, _escritas(*banco)) == {"usuarios": 1, "cartoes": 1}
@@ -0,0 +1,20 @@
+"""
+🧪 Teste de estresse das transferências, em tamanho pequeno.
+"""
+
+import pytest
+
+from rotinas.estresse_transferencias import estressar
+from utils import config
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_transferencias_concorrentes_conservam_os_saldos(monkeypatch, backend):
+    monkeypatch.setattr(config, "ARMAZENAMENTO_USUARIOS", backend)
+    caminhos = config.ARQUIVO_SQLITE, config.DIRETORIO_HISTORICO
+
+    resumo = estressar(contas=5, threads=4, transferencias=200, semente=1)
+
+    assert resumo["problemas"] == []
+    assert resumo["aceitas"] > 0
+    assert (config.ARQUIVO_SQLITE, config.DIRETORIO_HISTORICO) == caminhos
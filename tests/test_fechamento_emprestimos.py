@@ -0,0 +1,31 @@
+"""
+🌙 Valores das parcelas usados no fechamento dos empréstimos.
+"""
+
+from financeiro.amortizacao import cronograma
+from rotinas.fechamento_emprestimos import _valores_das_parcelas
+
+
+def _emprestimo(sistema, taxa, valor, parcelas):
+    return {"sistema": sistema, "taxa_mensal": taxa, "valor_original": valor,
+            "parcelas_total": parcelas, "valor_parcela": 0}
+
+
+def test_cada_emprestimo_usa_a_propria_taxa():
+    lote = [
+        ("1", _emprestimo("price", 0.02, 100000, 3)),
+        ("2", _emprestimo("price", 0.05, 100000, 3)),
+        ("3", _emprestimo("sac", 0.05, 100000, 2)),
+        ("4", _emprestimo("sac", 0.02, 100000, 2)),
+    ]
+
+    for (_, dados), parcelas in zip(lote, _valores_das_parcelas(lote)):
+        esperado = [linha["parcela"] for linha in cronograma(
+            dados["valor_original"], dados["parcelas_total"], dados["sistema"], dados["taxa_mensal"])]
+        assert [int(valor) for valor in parcelas[:dados["parcelas_total"]]] == esperado
+
+
+def test_emprestimo_antigo_tem_parcelas_iguais():
+    lote = [("1", {"valor_parcela": 500, "parcelas_total": 2})]
+
+    assert _valores_das_parcelas(lote) == [[500, 500]]
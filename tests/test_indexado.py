@@ -0,0 +1,62 @@
+"""
+📇 Repositório indexado: o que fica no cache e o que pode ser salvo.
+"""
+
+import threading
+
+import pytest
+
+from armazenamento.indexado import RepositorioIndexado
+
+
+@pytest.fixture
+def repositorio(tmp_path):
+    arquivos = str(tmp_path / "usuarios.dat"), str(tmp_path / "usuarios.idx")
+    repositorio = RepositorioIndexado(*arquivos, capacidade_cache=2)
+    for nome in ("ana", "bia", "caio"):
+        repositorio[nome] = {"saldo": 0}
+    repositorio.salvar()
+    repositorio.compactar()  # Relê do disco: o cache fica só com os mais recentes
+    yield repositorio, arquivos
+    repositorio.fechar()
+
+
+def test_salvar_registro_lido_por_items_levanta_erro(repositorio):
+    repositorio, arquivos = repositorio
+    fora_do_cache = [chave for chave in repositorio if chave not in repositorio._cache]
+    assert fora_do_cache
+
+    chave = fora_do_cache[0]
+    dict(repositorio.items())[chave]["saldo"] = 500
+    with pytest.raises(KeyError):
+        repositorio.salvar(chave)
+
+
+def test_registro_lido_pela_chave_e_salvo(repositorio):
+    repositorio, arquivos = repositorio
+    for nome in ("ana", "bia", "caio"):
+        repositorio[nome]["saldo"] += 100
+        repositorio.salvar(nome, ["saldo"])
+    repositorio.fechar()
+
+    relido = RepositorioIndexado(*arquivos)
+    assert [relido[nome]["saldo"] for nome in ("ana", "bia", "caio")] == [100, 100, 100]
+    relido.fechar()
+
+
+def test_registro_em_uso_por_uma_thread_nao_sai_do_cache(repositorio):
+    repositorio, arquivos = repositorio
+    ana = repositorio["ana"]
+    ana["saldo"] += 700
+
+    # Outra sessão enche o cache antes de "ana" ser salva
+    outra = threading.Thread(target=lambda: [repositorio[nome] for nome in ("bia", "caio", "bia", "caio")])
+    outra.start()
+    outra.join()
+
+    assert repositorio._cache["ana"] is ana
+    repositorio.salvar("ana", ["saldo"])
+    repositorio.fechar()
+    relido = RepositorioIndexado(*arquivos)
+    assert relido["ana"]["saldo"] == 700
+    relido.fechar()
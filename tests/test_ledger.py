@@ -0,0 +1,81 @@
+"""
+📒 Leitura do ledger de transações.
+"""
+
+import os
+import threading
+
+from armazenamento.ledger import Ledger
+from armazenamento.unidade_trabalho import transacao
+
+
+def test_linha_orfa_nao_aparece_na_leitura(tmp_path):
+    ledger = Ledger(str(tmp_path))
+    ledger.anexar("ana", {"n": 1})
+    arquivo_log, _ = ledger._caminhos("ana")
+    with open(arquivo_log, "ab") as log:  # Gravação interrompida antes do .idx
+        log.write(b'{"n": "orfa"}\n')
+    ledger.anexar("ana", {"n": 2})
+
+    assert ledger.contar("ana") == 2
+    assert list(ledger.ler("ana")) == [{"n": 1}, {"n": 2}]
+    assert ledger.ultimos("ana", 2) == [{"n": 1}, {"n": 2}]
+    assert ledger.ultimos("ana", 1) == [{"n": 2}]
+
+
+def test_indice_perdido_na_reescrita_e_refeito(tmp_path):
+    ledger = Ledger(str(tmp_path))
+    ledger.reescrever("ana", [{"n": numero} for numero in range(3000)])
+    os.remove(ledger._caminhos("ana")[1])  # Queda entre as trocas do .idx e do .log
+
+    assert ledger.contar("ana") == 3000
+    assert ledger.ultimos("ana", 2) == [{"n": 2998}, {"n": 2999}]
+    assert [entrada["n"] for entrada in ledger.ler("ana")] == list(range(3000))
+
+
+def test_pendencias_de_uma_thread_nao_sao_gravadas_por_outra(tmp_path):
+    ledger = Ledger(str(tmp_path))
+    ledger.anexar("ana", {"n": 1})
+    aberta = threading.Event()
+    fechar = threading.Event()
+    vistas = []
+
+    def sessao():
+        with transacao():
+            ledger.anexar("bia", {"n": "pendente"})
+            vistas.extend(ledger.ultimos("bia", 5))
+            aberta.set()
+            fechar.wait(5)
+
+    outra = threading.Thread(target=sessao)
+    outra.start()
+    assert aberta.wait(5)
+    assert vistas == [{"n": "pendente"}]
+    with transacao():
+        ledger.anexar("ana", {"n": 2})  # Commit desta thread com a outra no meio da transação
+    try:
+        assert ledger.contar("bia") == 0
+        assert list(ledger.ler("bia")) == []
+    finally:
+        fechar.set()
+        outra.join()
+
+    assert list(ledger.ler("bia")) == [{"n": "pendente"}]
+    assert list(ledger.ler("ana")) == [{"n": 1}, {"n": 2}]
+
+
+def test_leitura_junta_gravadas_e_pendentes_sem_gravar(tmp_path):
+    ledger = Ledger(str(tmp_path))
+    ledger.anexar("ana", {"n": 1})
+    ledger.anexar("ana", {"n": 2})
+    with transacao():
+        ledger.anexar("ana", {"n": 3})
+        escritas = ledger.escritas
+
+        assert ledger.contar("ana") == 3
+        assert ledger.ultimos("ana", 2) == [{"n": 2}, {"n": 3}]
+        assert ledger.ultimos("ana", 1) == [{"n": 3}]
+        assert list(ledger.ler("ana")) == [{"n": 1}, {"n": 2}, {"n": 3}]
+        assert ledger.escritas == escritas
+
+    assert ledger.ultimos("ana", 5) == [{"n": 1}, {"n": 2}, {"n": 3}]
@@ -0,0 +1,189 @@
+"""
+🖥️ Regras do servidor: quem pode chamar cada método e os valores em
+dinheiro recebidos dos clientes.
+"""
+
+import asyncio
+import builtins
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+from servidor.protocolo import codificar, decodificar
+from servidor.servidor import ServidorBanco
+
+
+class _Cliente:
+    """
+    🔌 Cliente síncrono mínimo do protocolo, uma chamada por vez.
+    """
+
+    def __init__(self, porta):
+        for _ in range(100):  # Espera o servidor começar a escutar
+            try:
+                self.conexao = socket.create_connection(("127.0.0.1", porta))
+                break
+            except ConnectionRefusedError:
+                time.sleep(0.05)
+        self.arquivo = self.conexao.makefile("rwb")
+        self._ultimo_id = 0
+
+    def enviar(self, linha, respostas=()):
+        """
+        Envia uma linha já codificada e devolve a mensagem final (com
+        "resultado" ou "erro"), respondendo as perguntas na ordem.
+        """
+        self.arquivo.write(linha)
+        self.arquivo.flush()
+        respostas = list(respostas)
+        while True:
+            mensagem = decodificar(self.arquivo.readline())
+            if "pergunta" not in mensagem:
+                return mensagem
+            self.arquivo.write(codificar({"id": mensagem["id"], "resposta": respostas.pop(0) if respostas else ""}))
+            self.arquivo.flush()
+
+    def chamar(self, manager, metodo, *args, respostas=()):
+        self._ultimo_id += 1
+        pedido = {"id": self._ultimo_id, "manager": manager, "metodo": metodo, "args": list(args)}
+        return self.enviar(codificar(pedido), respostas)
+
+    def fechar(self):
+        self.arquivo.close()
+        self.conexao.close()
+
+
+def _porta_livre():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def servidor(pasta_dados, monkeypatch):
+    """
+    🚀 Servidor numa thread, com os managers abertos na pasta temporária.
+    Devolve uma função que abre um cliente novo.
+    """
+    # O servidor troca sys.stdout e input(); voltam ao normal no fim do teste
+    monkeypatch.setattr(sys, "stdout", sys.stdout)
+    monkeypatch.setattr(builtins, "input", builtins.input)
+
+    banco = ServidorBanco(trabalhadores=4)
+    porta = _porta_livre()
+    loop = asyncio.new_event_loop()
+    tarefa = loop.create_task(banco.servir(f"127.0.0.1:{porta}"))
+
+    def rodar():
+        try:
+            loop.run_until_complete(tarefa)
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=rodar, daemon=True)
+    thread.start()
+    clientes = []
+
+    def conectar():
+        cliente = _Cliente(porta)
+        clientes.append(cliente)
+        return cliente
+
+    yield conectar
+
+    for cliente in clientes:
+        cliente.fechar()
+    loop.call_soon_threadsafe(tarefa.cancel)
+    thread.join(timeout=5)
+    loop.close()
+    banco.fechar()
+
+
+def _entrar(cliente, nome):
+    """
+    Cadastra a conta e faz login nela pela conexão.
+    """
+    cadastro = cliente.chamar("usuarios", "cadastrar", respostas=[nome, "senha123", "Cor favorita?", "azul"])
+    assert "erro" not in cadastro
+    assert cliente.chamar("usuarios", "login", respostas=[nome, "senha123"])["resultado"] == nome
+
+
+def test_conexao_so_opera_a_conta_do_proprio_login(servidor):
+    bia = servidor()
+    _entrar(bia, "bia")
+    ana = servidor()
+    _entrar(ana, "ana")
+    assert ana.chamar("usuarios", "depositar", "ana", 10000)["resultado"] is True
+
+    assert bia.chamar("usuarios", "sacar", "ana", 5000)["erro"].startswith("PermissionError")
+    assert ana.chamar("usuarios", "get_saldo", "ana")["resultado"] == 10000
+
+
+def test_conexao_sem_login_nao_opera_conta(servidor):
+    _entrar(servidor(), "ana")
+
+    assert servidor().chamar("usuarios", "get_saldo", "ana")["erro"] == "PermissionError: Faça login primeiro"
+
+
+def test_metodo_do_admin_exige_login_do_admin(servidor):
+    cliente = servidor()
+    _entrar(cliente, "ana")  # Um cliente logado não vira administrador
+
+    for manager, metodo in (("admin", "listar_usuarios"), ("auditoria", "consultar_logs")):
+        resposta = cliente.chamar(manager, metodo)
+        assert resposta["erro"] == "PermissionError: Acesso restrito ao administrador"
+
+
+def test_metodo_fora_da_lista_e_recusado(servidor):
+    cliente = servidor()
+    _entrar(cliente, "ana")
+
+    for manager, metodo, args in (("usuarios", "fechar", []), ("usuarios", "adicionar_pontos", ["ana", 1000]),
+                                  ("usuarios", "__class__", [])):
+        resposta = cliente.chamar(manager, metodo, *args)
+        assert resposta["erro"] == f"ValueError: Método não disponível: {manager}.{metodo}"
+    assert cliente.chamar("usuarios", "get_pontos", "ana")["resultado"] == 0
+
+
+def test_nan_e_infinito_sao_recusados_na_decodificacao(servidor):
+    cliente = servidor()
+    _entrar(cliente, "ana")
+
+    for constante in ("NaN", "Infinity", "-Infinity"):
+        linha = (f'{{"id": 1, "manager": "usuarios", "metodo": "depositar", '
+                 f'"args": ["ana", {constante}]}}\n').encode()
+        assert cliente.enviar(linha)["erro"] == "ValueError: mensagem inválida"
+
+    assert cliente.chamar("usuarios", "get_saldo", "ana")["resultado"] == 0
+
+
+def test_valores_que_nao_sao_centavos_inteiros_sao_recusados(servidor):
+    ana = servidor()
+    _entrar(ana, "ana")
+    _entrar(servidor(), "bia")
+    assert ana.chamar("usuarios", "depositar", "ana", 10000)["resultado"] is True
+
+    for valor in (0.4, 100.0, True, "100", -5, 0):
+        assert ana.chamar("usuarios", "depositar", "ana", valor)["erro"].startswith("ValueError")
+        assert ana.chamar("usuarios", "transferir", "ana", "bia", valor)["erro"].startswith("ValueError")
+
+    assert ana.chamar("usuarios", "get_saldo", "ana")["resultado"] == 10000
+    assert type(ana.chamar("usuarios", "get_saldo", "ana")["resultado"]) is int
+
+
+def test_manager_recusa_valor_que_nao_e_inteiro(pasta_dados, respostas):
+    from managers.usuarios import UsuarioManager
+
+    usuarios = UsuarioManager()
+    for nome in ("ana", "bia"):
+        respostas[:] = [nome, "senha123", "Cor favorita?", "azul"]
+        usuarios.cadastrar()
+    usuarios.depositar("ana", 10000)
+
+    assert not usuarios.transferir("ana", "bia", float("nan"))
+    assert not usuarios.depositar("ana", 0.4)
+    assert (usuarios.get_saldo("ana"), usuarios.get_saldo("bia")) == (10000, 0)
+    usuarios.fechar()
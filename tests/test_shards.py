@@ -0,0 +1,52 @@
+"""
+🧩 Repositório em shards usado por várias sessões (threads) ao mesmo tempo.
+"""
+
+import json
+import threading
+
+from armazenamento import shards
+from armazenamento.shards import RepositorioShards
+
+
+def test_alteracoes_esperam_a_gravacao_terminar(tmp_path):
+    repositorio = RepositorioShards(str(tmp_path / "usuarios"), num_shards=2)
+    repositorio["ana"] = {"saldo": 0}
+    feitas = []
+
+    def alterar():
+        repositorio["bia"] = {"saldo": 0}
+        del repositorio["ana"]
+        feitas.append(True)
+
+    with repositorio._trava:  # Como se outra thread estivesse no meio de descarregar()
+        sessao = threading.Thread(target=alterar)
+        sessao.start()
+        sessao.join(0.2)
+        assert feitas == []
+    sessao.join(5)
+
+    assert feitas == [True]
+    assert "bia" in repositorio and "ana" not in repositorio
+
+
+def test_gravacao_tenta_de_novo_se_um_registro_muda_no_meio(tmp_path, monkeypatch):
+    repositorio = RepositorioShards(str(tmp_path / "usuarios"), num_shards=2)
+    repositorio["ana"] = {"saldo": 0}
+    dumps = json.dumps
+    tentativas = []
+
+    def dumps_interrompido(*args, **kwargs):
+        if "indent" not in kwargs:  # Assinaturas do registro, não a gravação do arquivo
+            return dumps(*args, **kwargs)
+        tentativas.append(True)
+        if len(tentativas) == 1:
+            raise RuntimeError("dictionary changed size during iteration")
+        return dumps(*args, **kwargs)
+
+    monkeypatch.setattr(shards.json, "dumps", dumps_interrompido)
+    repositorio.salvar("ana")
+    monkeypatch.undo()
+
+    assert len(tentativas) > 1
+    assert RepositorioShards(str(tmp_path / "usuarios"))["ana"] == {"saldo": 0}
@@ -0,0 +1,88 @@
+"""
+⚙️ CONFIGURAÇÕES DO SISTEMA
+
+Este módulo reúne as opções que mudam o comportamento do sistema
+sem precisar alterar o código. Cada opção pode ser trocada por uma
+variável de ambiente, por exemplo:
+
+    SOLABANK_ARMAZENAMENTO=sqlite python main.py
+"""
+
+import os
+
+# Onde os dados de todos os managers são gravados:
+# - "json": um arquivo JSON por manager em data/, regravado inteiro a cada alteração
+# - "sqlite": uma tabela por manager no banco data/solabank.db
+# - "compartilhado": os mesmos arquivos JSON, para vários "python main.py" usando
+#   a mesma pasta data/ ao mesmo tempo (contador de versão e trava em data/<nome>.versao)
+ARMAZENAMENTO = os.environ.get("SOLABANK_ARMAZENAMENTO", "json")
+
+# Onde os logs (ex: auditoria) são gravados. Além de "json" e "sqlite", aceita:
+# - "segmentado": arquivos JSON lines em data/<nome>/, rotacionados por tamanho e tempo
+#   (um processo só por pasta: com ARMAZENAMENTO "compartilhado", use "sqlite")
+# O padrão é "sqlite" quando ARMAZENAMENTO é "sqlite" e "segmentado" nos outros casos
+ARMAZENAMENTO_LOGS = os.environ.get(
+    "SOLABANK_ARMAZENAMENTO_LOGS", "sqlite" if ARMAZENAMENTO == "sqlite" else "segmentado"
+)
+
+# Os usuários podem usar um backend diferente dos demais. Além dos
+# anteriores, aceita:
+# - "journal": anexa cada alteração em data/usuarios.journal e compacta de vez em quando
+# - "shards": espalha os usuários em vários arquivos pequenos em data/usuarios/
+# - "indexado": lê só um índice na inicialização e carrega cada usuário quando for usado
+ARMAZENAMENTO_USUARIOS = os.environ.get("SOLABANK_ARMAZENAMENTO_USUARIOS", ARMAZENAMENTO)
+
+# Arquivo do banco SQLite
+ARQUIVO_SQLITE = os.environ.get("SOLABANK_ARQUIVO_SQLITE", "data/solabank.db")
+
+# Quantos registros o journal acumula antes de ser compactado no snapshot
+JOURNAL_LIMITE_COMPACTACAO = int(os.environ.get("SOLABANK_JOURNAL_LIMITE_COMPACTACAO", "1000"))
+
+# Em quantos arquivos (shards) os registros são espalhados no modo "shards".
+# Só vale na criação: depois disso o número fica gravado no manifesto
+NUM_SHARDS = int(os.environ.get("SOLABANK_NUM_SHARDS", "16"))
+
+# Quantos registros recém-usados ficam em memória no modo "indexado"
+CACHE_REGISTROS = int(os.environ.get("SOLABANK_CACHE_REGISTROS", "1000"))
+
+# Pasta dos ledgers de histórico (um par de arquivos .log/.idx por conta)
+DIRETORIO_HISTORICO = os.environ.get("SOLABANK_DIRETORIO_HISTORICO", "data/historico")
+
+# Log segmentado: tamanho máximo (bytes) e tempo máximo (segundos) de cada segmento
+LOG_TAMANHO_SEGMENTO = int(os.environ.get("SOLABANK_LOG_TAMANHO_SEGMENTO", str(1024 * 1024)))
+LOG_DURACAO_SEGMENTO = int(os.environ.get("SOLABANK_LOG_DURACAO_SEGMENTO", "86400"))
+
+# Comprimir com gzip os segmentos fechados ("1" liga, "0" desliga)
+LOG_COMPRIMIR = os.environ.get("SOLABANK_LOG_COMPRIMIR", "1") == "1"
+
+# Por quantos dias os segmentos fechados são guardados (0 = para sempre)
+LOG_RETENCAO_DIAS = int(os.environ.get("SOLABANK_LOG_RETENCAO_DIAS", "0"))
+
+# Log assíncrono: as entradas vão para uma fila e uma thread grava em lotes
+# ("1" liga, "0" desliga)
+LOG_ASSINCRONO = os.environ.get("SOLABANK_LOG_ASSINCRONO", "0") == "1"
+
+# Quantas entradas cabem na fila, quantas são gravadas por lote e
+# quanto tempo (milissegundos) a thread espera para completar um lote
+LOG_TAMANHO_FILA = int(os.environ.get("SOLABANK_LOG_TAMANHO_FILA", "10000"))
+LOG_TAMANHO_LOTE = int(os.environ.get("SOLABANK_LOG_TAMANHO_LOTE", "100"))
+LOG_INTERVALO_MS = int(os.environ.get("SOLABANK_LOG_INTERVALO_MS", "5"))
+
+# O que fazer quando a fila enche:
+# - "bloquear": espera abrir espaço
+# - "descartar": perde a entrada
+# - "disco": grava a entrada em data/<nome>.transbordo, que entra no log depois
+LOG_FILA_CHEIA = os.environ.get("SOLABANK_LOG_FILA_CHEIA", "bloquear")
+
+# Servidor (python -m servidor.servidor): endereço "host:porta" onde ele escuta.
+# Com esta opção definida, o main.py vira um cliente: os menus chamam os
+# managers do servidor em vez de abrir os arquivos de data/
+SERVIDOR = os.environ.get("SOLABANK_SERVIDOR", "")
+
+# Quantas chamadas o servidor executa ao mesmo tempo (cada uma numa thread;
+# uma chamada esperando o usuário digitar também ocupa uma)
+SERVIDOR_TRABALHADORES = int(os.environ.get("SOLABANK_SERVIDOR_TRABALHADORES", "64"))
+
+# Segundos que o servidor espera o cliente responder uma pergunta (input):
+# depois disso a conexão é encerrada e a thread fica livre para outra chamada
+SERVIDOR_TEMPO_PERGUNTA = float(os.environ.get("SOLABANK_SERVIDOR_TEMPO_PERGUNTA", "300"))
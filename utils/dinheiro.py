@@ -0,0 +1,110 @@
+"""
+💵 DINHEIRO EM CENTAVOS
+
+Todo valor em dinheiro do banco (saldos, limites, faturas, parcelas,
+empréstimos, investimentos, histórico) é um número inteiro de centavos:
+
+    R$ 1.234,56  ->  123456
+
+Contas com inteiros são exatas: somar e subtrair nunca deixa "sobras"
+como 0.1 + 0.2 = 0.30000000000000004, e o que é gravado em disco é
+exatamente o que foi calculado. Quando uma conta envolve uma taxa (juros,
+rendimento), o resultado é arredondado para o centavo mais próximo, uma
+vez só, com multiplicar().
+
+O texto "R$ 1.234,56" só é montado na hora de mostrar, com
+utils.helpers.formatar_moeda().
+"""
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+import math
+
+UM_REAL = 100
+
+# Marca gravada nos registros já convertidos para centavos
+MARCA = "centavos"
+
+
+def para_centavos(valor):
+    """
+    🔢 Converte um valor em reais (número ou texto digitado pelo usuário,
+    como "10", "10.5" ou "10,50") em centavos, arredondando meio
+    centavo para cima. Texto inválido gera ValueError.
+    """
+    try:
+        reais = Decimal(str(valor).strip().replace(",", "."))
+    except InvalidOperation:
+        raise ValueError(f"Valor inválido: {valor!r}") from None
+    if not reais.is_finite():
+        raise ValueError(f"Valor inválido: {valor!r}")
+    return int((reais * UM_REAL).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def valor_positivo(valor):
+    """
+    ✔️ True se "valor" é uma quantia válida para uma operação: um número
+    inteiro de centavos maior que zero. Floats (inclusive NaN e infinito)
+    e booleanos são recusados.
+    """
+    return type(valor) is int and valor > 0
+
+
+def para_reais(centavos):
+    """
+    💱 Centavos em reais (float), só para contas com taxas e gráficos.
+    """
+    return centavos / UM_REAL
+
+
+def arredondar(valor):
+    """
+    Arredonda uma quantia de centavos calculada com taxa (float) para o
+    centavo inteiro mais próximo (meio centavo para cima).
+    """
+    return int(math.floor(valor + 0.5))
+
+
+def multiplicar(centavos, fator):
+    """
+    ✖️ Centavos vezes uma taxa ou fator, arredondado para o centavo.
+    """
+    return arredondar(centavos * fator)
+
+
+def dividir(centavos, partes):
+    """
+    ➗ Divide uma quantia em partes inteiras que somam exatamente o total
+    (os centavos que sobram vão para as primeiras partes):
+
+        dividir(1000, 3) -> [334, 333, 333]
+    """
+    base, sobra = divmod(centavos, partes)
+    return [base + 1 if i < sobra else base for i in range(partes)]
+
+
+def texto_reais(centavos):
+    """
+    Centavos como texto de reais com ponto e duas casas ("1234.56"),
+    o formato usado no extrato e na auditoria.
+    """
+    sinal = "-" if centavos < 0 else ""
+    reais, resto = divmod(abs(centavos), UM_REAL)
+    return f"{sinal}{reais}.{resto:02d}"
+
+
+def migrar_registros(repositorio, converter):
+    """
+    📦 Converte para centavos os registros de um repositório que ainda
+    guardam reais. converter(registro) troca os campos de dinheiro no
+    lugar; cada registro convertido recebe a marca MARCA, então a
+    migração pode ser repetida (ou retomada) sem converter nada duas vezes.
+
+    O chamador deve abrir uma transação para gravar tudo de uma vez.
+    """
+    for chave in list(repositorio):
+        registro = repositorio[chave]
+        if registro.get(MARCA):
+            continue
+        converter(registro)
+        registro[MARCA] = True
+        repositorio.salvar(chave)
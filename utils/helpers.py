@@ -1,6 +1,8 @@
 import os
 import random
 
+from utils.dinheiro import arredondar
+
 def limpar_tela():
     """
     🧹 LIMPAR TELA
@@ -32,14 +34,18 @@ def validar_cpf(cpf):
     return len(cpf) == 11 and cpf.isdigit()     # Verifica se tem 11 dígitos
 
 
-def formatar_moeda(valor):
+def formatar_moeda(centavos):
     """
     💰 FORMATAR MOEDA
     
-    Esta função formata um número para aparecer como dinheiro brasileiro.
-    Exemplo: 1234.56 vira "R$ 1.234,56"
-    """
-    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    Esta função formata uma quantia em centavos para aparecer como
+    dinheiro brasileiro. Exemplo: 123456 vira "R$ 1.234,56"
+    (valores calculados com taxas são arredondados para o centavo).
+    """
+    centavos = arredondar(centavos)
+    sinal = "-" if centavos < 0 else ""
+    reais, resto = divmod(abs(centavos), 100)
+    return f"{sinal}R$ {reais:,}".replace(",", ".") + f",{resto:02d}"
 
 
 def gerar_numero_cartao():
@@ -0,0 +1,151 @@
+"""
+🧾 REGISTROS DE TRANSAÇÃO
+
+O histórico de cada conta guarda registros estruturados em vez de
+textos prontos, por exemplo:
+
+    {"tipo": "DEPOSITO", "valor": 738000, "contraparte": None,
+     "ts": 1758836805.0, "ref": "9f1c2a7b4e0d", "detalhe": None}
+
+- tipo: um dos valores de TipoTransacao
+- valor: quantia da transação em centavos (sempre positiva; o tipo diz
+  se entrou ou saiu)
+- contraparte: o outro usuário, nas transferências
+- ts: data e hora em epoch (segundos)
+- ref: identificador da operação (id do empréstimo, investimento, cartão...)
+- detalhe: informação extra do tipo (nome do investimento, descrição do boleto...)
+
+O texto que o usuário vê ("[25/09/2025 18:46:45] DEPÓSITO: +R$ 7380.00")
+só é montado na hora de mostrar ou exportar, por formatar_registro().
+"""
+
+from datetime import datetime
+from enum import Enum
+import re
+import uuid
+
+from utils.dinheiro import arredondar, para_centavos, texto_reais
+
+
+class TipoTransacao(Enum):
+    """
+    🏷️ Tipos de transação do histórico.
+    """
+    DEPOSITO = "DEPOSITO"
+    SAQUE = "SAQUE"
+    TRANSFERENCIA_ENVIADA = "TRANSFERENCIA_ENVIADA"
+    TRANSFERENCIA_RECEBIDA = "TRANSFERENCIA_RECEBIDA"
+    PAGAMENTO_CARTAO = "PAGAMENTO_CARTAO"
+    EMPRESTIMO = "EMPRESTIMO"
+    PAGAMENTO_EMPRESTIMO = "PAGAMENTO_EMPRESTIMO"
+    QUITACAO_EMPRESTIMO = "QUITACAO_EMPRESTIMO"
+    INVESTIMENTO = "INVESTIMENTO"
+    RESGATE = "RESGATE"
+    BOLETO = "BOLETO"
+    OUTRO = "OUTRO"  # Texto antigo que não foi reconhecido na migração
+
+
+# Como cada tipo aparece no extrato (o mesmo texto de antes dos registros)
+_MODELOS = {
+    TipoTransacao.DEPOSITO: "DEPÓSITO: +R$ {valor}",
+    TipoTransacao.SAQUE: "SAQUE: -R$ {valor}",
+    TipoTransacao.TRANSFERENCIA_ENVIADA: "TRANSFERÊNCIA ENVIADA para {contraparte}: -R$ {valor}",
+    TipoTransacao.TRANSFERENCIA_RECEBIDA: "TRANSFERÊNCIA RECEBIDA de {contraparte}: +R$ {valor}",
+    TipoTransacao.PAGAMENTO_CARTAO: "PAGAMENTO CARTÃO {ref}: -R$ {valor}",
+    TipoTransacao.EMPRESTIMO: "EMPRÉSTIMO: R$ {valor} em {detalhe}x",
+    TipoTransacao.PAGAMENTO_EMPRESTIMO: "PAGAMENTO EMPRÉSTIMO: R$ {valor}",
+    TipoTransacao.QUITACAO_EMPRESTIMO: "QUITAÇÃO EMPRÉSTIMO: R$ {valor}",
+    TipoTransacao.INVESTIMENTO: "INVESTIMENTO: {detalhe} - R$ {valor}",
+    TipoTransacao.RESGATE: "RESGATE: {detalhe} - R$ {valor}",
+    TipoTransacao.BOLETO: "BOLETO: {detalhe} - R$ {valor}",
+    TipoTransacao.OUTRO: "{detalhe}",
+}
+
+_FORMATO_DATA = "%d/%m/%Y %H:%M:%S"
+
+
+def nova_referencia():
+    """
+    🔖 Gera um identificador curto para uma operação (ex: uma transferência,
+    que aparece no histórico das duas contas com a mesma referência).
+    """
+    return uuid.uuid4().hex[:12]
+
+
+def criar_registro(tipo, valor, contraparte=None, referencia=None, detalhe=None, momento=None):
+    """
+    🧾 Monta um registro de transação (valor em centavos;
+    momento = datetime, padrão: agora).
+    """
+    momento = momento or datetime.now()
+    return {
+        "tipo": TipoTransacao(tipo).value,
+        "valor": arredondar(valor),
+        "contraparte": contraparte,
+        "ts": momento.timestamp(),
+        "ref": referencia,
+        "detalhe": None if detalhe is None else str(detalhe),
+    }
+
+
+def formatar_registro(registro):
+    """
+    🖨️ Monta o texto do extrato: "[DD/MM/AAAA HH:MM:SS] DESCRIÇÃO".
+    """
+    momento = datetime.fromtimestamp(registro["ts"]).strftime(_FORMATO_DATA)
+    descricao = _MODELOS[TipoTransacao(registro["tipo"])].format(
+        valor=texto_reais(registro["valor"]),
+        contraparte=registro.get("contraparte"),
+        ref=registro.get("ref"),
+        detalhe=registro.get("detalhe"),
+    )
+    return f"[{momento}] {descricao}"
+
+
+# ----------------------------------------------------------------------
+# Migração dos textos antigos
+# ----------------------------------------------------------------------
+
+def _padrao(modelo):
+    """
+    Transforma um modelo (ex: "SAQUE: -R$ {valor}") numa expressão
+    regular que reconhece o texto gerado por ele.
+    """
+    partes = re.split(r"\{(\w+)\}", modelo)
+    expressao = ""
+    for i, parte in enumerate(partes):
+        if i % 2 == 0:
+            expressao += re.escape(parte)
+        elif parte == "valor":
+            expressao += r"(?P<valor>\d+(?:\.\d+)?)"
+        else:
+            expressao += rf"(?P<{parte}>.+)"
+    return re.compile(expressao + "$")
+
+
+_PADROES = [(tipo, _padrao(modelo)) for tipo, modelo in _MODELOS.items()
+            if tipo is not TipoTransacao.OUTRO]
+_PADRAO_DATA = re.compile(r"^\[(\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2})\] (.*)$", re.S)
+
+
+def converter_texto(texto):
+    """
+    🔄 Converte uma linha antiga do histórico ("[data] DESCRIÇÃO") num
+    registro. O que não for reconhecido vira um registro do tipo OUTRO
+    com o texto original no detalhe, para nada se perder.
+    """
+    momento = datetime.fromtimestamp(0)
+    descricao = texto
+    encontrado = _PADRAO_DATA.match(texto)
+    if encontrado:
+        momento = datetime.strptime(encontrado.group(1), _FORMATO_DATA)
+        descricao = encontrado.group(2)
+
+    for tipo, padrao in _PADROES:
+        campos = padrao.match(descricao)
+        if campos:
+            dados = campos.groupdict()
+            return criar_registro(tipo, para_centavos(dados.pop("valor")), contraparte=dados.get("contraparte"),
+                                  referencia=dados.get("ref"), detalhe=dados.get("detalhe"),
+                                  momento=momento)
+    return criar_registro(TipoTransacao.OUTRO, 0, detalhe=descricao, momento=momento)